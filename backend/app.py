@@ -1,8 +1,9 @@
 # backend/app.py
 
-from flask import Flask
+from flask import Flask, jsonify
 from dotenv import load_dotenv
 from flask_cors import CORS # Import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
 import os
 
 def create_app():
@@ -12,18 +13,70 @@ def create_app():
     # Load configuration from config.py
     app.config.from_object('config.DevelopmentConfig')
 
+    # Worker processes are forked first, while this process is still single-threaded. Export
+    # rendering and PDF extraction share one pool: starting a pool starts its manager thread, so
+    # a second pool would fork after a thread is already running.
+    from services.exports import create_process_pool
+    process_pool = create_process_pool(app.config['EXPORT_RENDER_WORKERS'] + app.config['UPLOAD_EXTRACT_WORKERS'])
+    render_pool = process_pool if app.config['EXPORT_RENDER_WORKERS'] else None
+    app.extensions['extract_pool'] = process_pool if app.config['UPLOAD_EXTRACT_WORKERS'] else None
+
     # Initialize CORS
     # For development, allow all origins. In production, restrict this.
     CORS(app)
 
+    # MAX_CONTENT_LENGTH applies to every route (uploads and JSON bodies); raised from the
+    # Content-Length header, before the body is read
+    @app.errorhandler(RequestEntityTooLarge)
+    def request_too_large(error):
+        limit_mb = app.config['MAX_CONTENT_LENGTH'] / (1024 * 1024)
+        return jsonify({"error": f"Request is too large. The maximum request size is {limit_mb:.0f} MB."}), 413
+
+    # Request IDs in responses and logs, per-stage Prometheus metrics and GET /metrics
+    from services import metrics
+    metrics.init_app(app)
+
+    # Shared Gemini result cache (in-process LRU, optionally backed by sqlite)
+    from services.cache import build_llm_cache
+    app.extensions['llm_cache'] = build_llm_cache(app.config)
+
+    # One Gemini client per process, shared by all blueprints (None until an API key is configured)
+    from services.llm import build_llm_client
+    app.extensions['llm_client'] = build_llm_client(app.config)
+
+    # Improve results by ID, so exports do not have to re-post them
+    from services.results import build_result_store
+    app.extensions['result_store'] = build_result_store(app.config)
+
+    # Rendered exports, so repeated downloads of the same content skip DOCX/PDF generation, plus
+    # optional background pre-rendering as soon as an improve result is ready
+    from services.cache import LRUCache
+    from services.exports import ExportRenderer
+    render_cache = LRUCache(max_entries=app.config['EXPORT_CACHE_MAX_ENTRIES'], ttl=app.config['EXPORT_CACHE_TTL_SECONDS'],
+                            max_bytes=app.config['EXPORT_CACHE_MAX_BYTES'], sizeof=len)
+    app.extensions['export_renderer'] = ExportRenderer(
+        render_cache, render_pool,
+        prerender_formats=app.config['EXPORT_PRERENDER_FORMATS'] if app.config['EXPORT_PRERENDER'] else (),
+        ttl=app.config['EXPORT_CACHE_TTL_SECONDS'],
+    )
+
+    # Extracted text of uploaded files by content hash
+    from services.uploads import build_upload_cache
+    app.extensions['upload_cache'] = build_upload_cache(app.config)
+
     # Register Blueprints
     from blueprints.upload import upload_bp
     from blueprints.improve import improve_bp
     from blueprints.export import export_bp
+    from blueprints.jobs import jobs_bp, start_job_queue
 
     app.register_blueprint(upload_bp, url_prefix='/api/upload')
     app.register_blueprint(improve_bp, url_prefix='/api/improve')
     app.register_blueprint(export_bp, url_prefix='/api/export')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+
+    # Background workers for /api/jobs; jobs are persisted in JOB_STORE
+    app.extensions['job_queue'] = start_job_queue(app)
 
     # Basic route for health check
     @app.route('/')
@@ -32,8 +85,9 @@ def create_app():
 
     return app
 
-app = create_app()
 
+# Importing this module must not build an app: each create_app() forks worker pools and starts
+# the job queue. `flask run` finds the factory itself; WSGI servers can use "app:create_app()".
 if __name__ == '__main__':
-    # app = create_app()
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    app = create_app()
+    app.run(debug=True, port=5000)
@@ -0,0 +1,130 @@
+# backend/benchmarks/docx_benchmark.py
+
+# Compares the streaming DOCX extractor (services/extract.extract_docx_text) against the
+# python-docx approach it replaced (Document(...).paragraphs): time, peak Python memory and
+# how much of the document's text each one finds.
+#
+# The corpus is generated in memory from the resumes in benchmarks/corpus/resumes: each resume
+# becomes a DOCX with its contact line in the page header, a skills table, a text box and a
+# footer, and is also repeated `--scale` times to show how memory grows with document size.
+#
+#   cd backend && python -m benchmarks.docx_benchmark [--iterations 20] [--scale 1 20 200] [--json]
+
+import argparse
+import io
+import json
+import statistics
+import time
+import tracemalloc
+
+from docx import Document
+from docx.oxml import parse_xml
+
+from benchmarks.parser_benchmark import load_corpus
+from services.extract import extract_docx_text
+
+_TEXT_BOX = (
+    '<w:r xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    ' xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+    ' xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape"'
+    ' xmlns:v="urn:schemas-microsoft-com:vml">'
+    '<mc:AlternateContent><mc:Choice Requires="wps"><w:drawing><wps:txbx><w:txbxContent>'
+    '<w:p><w:r><w:t>{text}</w:t></w:r></w:p>'
+    '</w:txbxContent></wps:txbx></w:drawing></mc:Choice>'
+    '<mc:Fallback><w:pict><v:textbox><w:txbxContent>'
+    '<w:p><w:r><w:t>{text}</w:t></w:r></w:p>'
+    '</w:txbxContent></v:textbox></w:pict></mc:Fallback></mc:AlternateContent></w:r>'
+)
+
+
+def python_docx_text(data):
+    """The previous extractor: body paragraphs only, via python-docx's object model."""
+    document = Document(io.BytesIO(data))
+    return ''.join(paragraph.text + "\n" for paragraph in document.paragraphs)
+
+
+def build_docx(text, scale=1):
+    """
+    A DOCX of the resume text repeated `scale` times, with text outside body paragraphs:
+    the first line in the header, a skills table, a text box and a footer. Returns the bytes
+    and the strings a complete extraction should contain (body lines plus those structures).
+    """
+    lines = [line for line in text.splitlines() if line.strip()]
+    document = Document()
+    section = document.sections[0]
+    section.header.paragraphs[0].text = f"HEADER {lines[0]}"
+    section.footer.paragraphs[0].text = "FOOTER References available on request"
+    markers = [f"HEADER {lines[0]}", "FOOTER References available on request"] + lines[1:]
+
+    for copy in range(scale):
+        for line in lines[1:]:
+            document.add_paragraph(line)
+        table = document.add_table(rows=2, cols=2)
+        for row_index, row in enumerate(table.rows):
+            for column_index, cell in enumerate(row.cells):
+                cell.text = f"CELL {copy}.{row_index}.{column_index}"
+                markers.append(cell.text)
+        anchor = document.add_paragraph()
+        anchor._p.append(parse_xml(_TEXT_BOX.format(text=f"TEXTBOX {copy}")))
+        markers.append(f"TEXTBOX {copy}")
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue(), markers
+
+
+def _measure(fn, data, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = fn(data)
+        samples.append((time.perf_counter() - started) * 1000)
+    tracemalloc.start()
+    fn(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, statistics.median(samples), peak
+
+
+EXTRACTORS = {'python_docx': python_docx_text, 'streaming': extract_docx_text}
+
+
+def run(iterations=20, scales=(1, 20, 200)):
+    rows = []
+    for name, text, _ in load_corpus():
+        for scale in scales:
+            data, markers = build_docx(text, scale)
+            row = {'resume': name, 'scale': scale, 'docx_kb': round(len(data) / 1024, 1)}
+            for label, extractor in EXTRACTORS.items():
+                output, ms, peak = _measure(extractor, data, max(1, iterations // scale))
+                row[label] = {
+                    'ms': round(ms, 3),
+                    'peak_kb': round(peak / 1024, 1),
+                    'coverage': round(sum(marker in output for marker in markers) / len(markers), 3),
+                }
+            rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Streaming vs python-docx DOCX extraction benchmark')
+    parser.add_argument('--iterations', type=int, default=20, help='runs per document at scale 1 (median is reported)')
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 20, 200], help='times each resume is repeated')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    rows = run(args.iterations, args.scale)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"{'resume':<22}{'scale':>6}{'KB':>8}{'docx ms':>10}{'stream ms':>11}"
+          f"{'docx peak KB':>14}{'stream peak KB':>16}{'docx cov':>10}{'stream cov':>12}")
+    for row in rows:
+        old, new = row['python_docx'], row['streaming']
+        print(f"{row['resume']:<22}{row['scale']:>6}{row['docx_kb']:>8}{old['ms']:>10}{new['ms']:>11}"
+              f"{old['peak_kb']:>14}{new['peak_kb']:>16}{old['coverage']:>10}{new['coverage']:>12}")
+
+
+if __name__ == '__main__':
+    main()
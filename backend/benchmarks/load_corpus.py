@@ -0,0 +1,153 @@
+# backend/benchmarks/load_corpus.py
+
+# Deterministic resume and job-description corpus for the load test (benchmarks/load_test.py):
+# every resume in benchmarks/corpus/resumes at 1, 3 and 10 pages, as PDF and DOCX, and
+# short/long JDs as TXT and PDF. Everything is generated from a seed, so runs on different
+# commits upload exactly the same bytes. Write it to disk to inspect or reuse it elsewhere:
+#
+#   cd backend && python -m benchmarks.load_corpus out/ [--pages 1 3 10] [--seed 7]
+
+import argparse
+import io
+import json
+import os
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+from docx import Document
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate
+
+from benchmarks.parser_benchmark import load_corpus
+
+# Roughly one letter-size page of 10pt text
+LINES_PER_PAGE = 50
+
+_TITLES = ['Software Engineer', 'Data Engineer', 'Product Analyst', 'Platform Engineer', 'Engineering Manager']
+_COMPANIES = ['Initech', 'Umbrella', 'Hooli', 'Vandelay Industries', 'Stark Industries', 'Wayne Enterprises']
+_VERBS = ['Built', 'Led', 'Designed', 'Migrated', 'Automated', 'Scaled', 'Reduced', 'Launched']
+_THINGS = ['the payments service', 'a reporting pipeline', 'CI/CD for 40 repositories', 'the search backend',
+           'an internal analytics dashboard', 'on-call tooling', 'the mobile API gateway', 'a data warehouse']
+_OUTCOMES = ['cutting latency by 35%', 'saving $200K a year', 'serving 3M users', 'reducing incidents by half',
+             'shortening releases from weeks to days', 'with 99.95% availability']
+_SKILLS = ['Python', 'Go', 'Java', 'SQL', 'Kubernetes', 'Docker', 'AWS', 'GCP', 'Terraform', 'Kafka', 'Spark',
+           'React', 'TypeScript', 'PostgreSQL', 'Redis', 'Airflow', 'dbt', 'Tableau', 'Machine Learning']
+
+
+def _experience_entry(rng, year):
+    lines = [f"{rng.choice(_TITLES)} | {rng.choice(_COMPANIES)} | {year - 2} - {year}"]
+    for _ in range(rng.randint(3, 6)):
+        lines.append(f"• {rng.choice(_VERBS)} {rng.choice(_THINGS)}, {rng.choice(_OUTCOMES)}")
+    return lines + ['']
+
+
+def resume_text(base_text, pages, rng):
+    """`base_text` padded with generated earlier jobs to about `pages` pages."""
+    lines = base_text.rstrip('\n').split('\n')
+    target = pages * LINES_PER_PAGE
+    if len(lines) < target:
+        lines += ['', 'ADDITIONAL EXPERIENCE']
+    year = 2016
+    while len(lines) < target:
+        lines += _experience_entry(rng, year)
+        year -= 2
+    return '\n'.join(lines) + '\n'
+
+
+def jd_text(rng, long=False):
+    """A job description; long ones add the company boilerplate real postings carry."""
+    title = rng.choice(_TITLES)
+    skills = rng.sample(_SKILLS, 8)
+    lines = [
+        f"{title} at {rng.choice(_COMPANIES)}",
+        '',
+        'About the role',
+        f"We are looking for a {title.lower()} to join a team that owns {rng.choice(_THINGS)}.",
+        '',
+        'Requirements',
+        *(f"- {years}+ years of experience with {skill}" for years, skill in zip(range(2, 6), skills[:4])),
+        '',
+        'Nice to have',
+        *(f"- Experience with {skill}" for skill in skills[4:]),
+    ]
+    if long:
+        for section in ('About us', 'Benefits', 'Equal opportunity'):
+            lines += ['', section]
+            lines += [f"{rng.choice(_VERBS)} {rng.choice(_THINGS)} together with a team {rng.choice(_OUTCOMES)}."
+                      for _ in range(15)]
+    return '\n'.join(lines) + '\n'
+
+
+def to_pdf(text):
+    buffer = io.BytesIO()
+    styles = getSampleStyleSheet()
+    # invariant: fixed document ID and timestamp, so the bytes are the same on every run
+    document = SimpleDocTemplate(buffer, pagesize=letter, invariant=True)
+    document.build([Paragraph(escape(line) or '&nbsp;', styles['Normal']) for line in text.split('\n')])
+    return buffer.getvalue()
+
+
+def to_docx(text):
+    document = Document()
+    for line in text.split('\n'):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    # python-docx stamps zip entries with the current time; rewrite them with a fixed one
+    output = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(buffer.getvalue())) as source, \
+            zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as target:
+        for item in source.infolist():
+            target.writestr(zipfile.ZipInfo(item.filename, date_time=(1980, 1, 1, 0, 0, 0)), source.read(item),
+                            compress_type=zipfile.ZIP_DEFLATED)
+    return output.getvalue()
+
+
+def build_corpus(pages=(1, 3, 10), seed=7):
+    """{'resumes': [...], 'jds': [...]}, each entry {'name', 'format', 'text', 'data'}."""
+    rng = random.Random(seed)
+    resumes, jds = [], []
+    for name, base_text, _ in load_corpus():
+        for page_count in pages:
+            text = resume_text(base_text, page_count, rng)
+            for file_format, encode in (('pdf', to_pdf), ('docx', to_docx)):
+                resumes.append({'name': f"{name}_{page_count}p.{file_format}", 'format': file_format,
+                                'text': text, 'data': encode(text)})
+    for index in range(4):
+        long = index % 2 == 1
+        text = jd_text(rng, long)
+        size = 'long' if long else 'short'
+        jds.append({'name': f"jd_{index}_{size}.txt", 'format': 'txt', 'text': text, 'data': text.encode('utf-8')})
+        jds.append({'name': f"jd_{index}_{size}.pdf", 'format': 'pdf', 'text': text, 'data': to_pdf(text)})
+    return {'resumes': resumes, 'jds': jds}
+
+
+def write_corpus(corpus, directory):
+    os.makedirs(directory, exist_ok=True)
+    manifest = {}
+    for kind, documents in corpus.items():
+        manifest[kind] = []
+        for document in documents:
+            with open(os.path.join(directory, document['name']), 'wb') as f:
+                f.write(document['data'])
+            manifest[kind].append({'name': document['name'], 'format': document['format'], 'bytes': len(document['data'])})
+    with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write the generated load-test corpus to a directory')
+    parser.add_argument('directory')
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 3, 10], help='resume lengths to generate')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.pages, args.seed)
+    write_corpus(corpus, args.directory)
+    print(f"Wrote {len(corpus['resumes'])} resumes and {len(corpus['jds'])} job descriptions to {args.directory}")
+
+
+if __name__ == '__main__':
+    main()
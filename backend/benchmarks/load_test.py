@@ -0,0 +1,297 @@
+# backend/benchmarks/load_test.py
+
+# Offline load test of the upload, improve and export endpoints. Gemini is replaced by the fake
+# backend in services/llm.py (LLM_BACKEND=fake) with a configurable latency distribution,
+# error rate and optional canned-response file, so no quota is used. Uploads come from the
+# generated corpus in benchmarks/load_corpus.py. Requests go through the Flask test client
+# from a thread pool, so the numbers cover the app, not a WSGI server or the network.
+#
+# Each endpoint is driven in turn with --requests requests at --concurrency and reports p50,
+# p95 and p99 latency, requests/sec, status counts and the process's peak RSS while it ran.
+# The JSON report records the git commit; pass an earlier report to --compare to see changes.
+#
+#   cd backend && python -m benchmarks.load_test [--endpoints upload_resume improve export_docx]
+#       [--requests 200] [--concurrency 8] [--latency 0.8] [--latency-distribution lognormal]
+#       [--error-rate 0.02] [--warm] [--output report.json] [--compare baseline.json] [--json]
+
+import argparse
+import io
+import itertools
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.load_corpus import build_corpus
+
+ENDPOINTS = ('upload_resume', 'upload_jd', 'improve', 'improve_consolidated', 'export_docx', 'export_pdf')
+
+
+def _rss_bytes():
+    """Current resident set size of this process."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # No /proc (macOS): fall back to the lifetime peak, reported in bytes there
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class RssSampler:
+    """Samples RSS on a background thread and keeps the peak since the last reset()."""
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.peak = _rss_bytes()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.peak = max(self.peak, _rss_bytes())
+
+    def reset(self):
+        self.peak = _rss_bytes()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of sorted samples."""
+    index = max(0, min(len(samples) - 1, round(fraction * len(samples) + 0.5) - 1))
+    return samples[index]
+
+
+def _environment(args, workdir):
+    """App settings for the run; applied before config.py is imported."""
+    env = {
+        'LLM_BACKEND': 'fake',
+        'FAKE_LLM_LATENCY_SECONDS': str(args.latency),
+        'FAKE_LLM_LATENCY_DISTRIBUTION': args.latency_distribution,
+        'FAKE_LLM_LATENCY_SIGMA': str(args.latency_sigma),
+        'FAKE_LLM_ERROR_RATE': str(args.error_rate),
+        # Measure the app, not the Gemini quota limiter
+        'LLM_REQUESTS_PER_MINUTE': '0',
+        'LLM_TOKENS_PER_MINUTE': '0',
+        'RESULT_STORE': 'memory',
+        'JOB_STORE': 'sqlite',
+        'JOB_SQLITE_PATH': os.path.join(workdir, 'jobs.sqlite3'),
+    }
+    if args.responses:
+        env['FAKE_LLM_RESPONSES_PATH'] = os.path.abspath(args.responses)
+    if not args.warm:
+        # Every request does the full work: no Gemini, upload or export cache hits
+        env.update({'LLM_CACHE_MAX_ENTRIES': '0', 'LLM_CACHE_SQLITE_PATH': '', 'UPLOAD_CACHE_MAX_ENTRIES': '0',
+                    'EXPORT_CACHE_MAX_ENTRIES': '0'})
+    for setting in args.env:
+        key, _, value = setting.partition('=')
+        env[key] = value
+    return env
+
+
+class Scenarios:
+    """One request function per endpoint; each takes the request number and returns the response."""
+
+    def __init__(self, client, corpus, warm):
+        self.client = client
+        self.corpus = corpus
+        self.warm = warm
+        self.result_ids = []
+
+    def _jd(self, number):
+        jd = self.corpus['jds'][number % len(self.corpus['jds'])]['text']
+        # A unique line keeps cold runs from coalescing identical in-flight prompts
+        return jd if self.warm else f"{jd}Requisition {number}\n"
+
+    def _resume(self, number):
+        return self.corpus['resumes'][number % len(self.corpus['resumes'])]
+
+    def upload_resume(self, number):
+        document = self._resume(number)
+        return self.client.post('/api/upload/resume', data={'file': (io.BytesIO(document['data']), document['name'])})
+
+    def upload_jd(self, number):
+        document = self.corpus['jds'][number % len(self.corpus['jds'])]
+        return self.client.post('/api/upload/jd', data={'file': (io.BytesIO(document['data']), document['name'])})
+
+    def improve(self, number, mode='multi'):
+        response = self.client.post('/api/improve/', json={
+            'resume_text': self._resume(number)['text'], 'jd_text': self._jd(number), 'mode': mode})
+        if response.status_code == 200 and response.get_json().get('result_id'):
+            self.result_ids.append(response.get_json()['result_id'])
+        return response
+
+    def improve_consolidated(self, number):
+        return self.improve(number, mode='consolidated')
+
+    def _export(self, number, export_format):
+        if not self.result_ids:
+            # Exports need stored results; make a few without timing them
+            for seed in range(8):
+                self.improve(seed)
+        result_id = self.result_ids[number % len(self.result_ids)]
+        return self.client.post('/api/export/', json={'format': export_format, 'result_id': result_id})
+
+    def export_docx(self, number):
+        return self._export(number, 'docx')
+
+    def export_pdf(self, number):
+        return self._export(number, 'pdf')
+
+
+def drive(scenario, requests, concurrency, sampler):
+    """Send `requests` requests through `scenario` from `concurrency` threads; returns the endpoint's stats."""
+    counter = itertools.count()
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            number = next(counter)
+            if number >= requests:
+                return
+            started = time.perf_counter()
+            try:
+                status = str(scenario(number).status_code)
+            except Exception as e:
+                status = f"exception:{type(e).__name__}"
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] = statuses.get(status, 0) + 1
+
+    sampler.reset()
+    rss_before = _rss_bytes()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    ok = sum(count for status, count in statuses.items() if status.startswith('2'))
+    return {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'statuses': statuses,
+        'error_rate': round(1 - ok / len(latencies), 4) if latencies else 0.0,
+        'rps': round(len(latencies) / wall, 2) if wall else 0.0,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99': round(percentile(latencies, 0.99) * 1000, 2),
+            'mean': round(statistics.mean(latencies) * 1000, 2),
+            'max': round(latencies[-1] * 1000, 2),
+        },
+        'peak_rss_mb': round(sampler.peak / 2 ** 20, 1),
+        'rss_growth_mb': round((sampler.peak - rss_before) / 2 ** 20, 1),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix='load-test-')
+    os.environ.update(_environment(args, workdir))
+    # Imported only now: config.py reads the environment at import time
+    from app import create_app
+
+    app = create_app()
+    # Injected failures would otherwise log a retry warning each
+    app.logger.setLevel('ERROR')
+    logging.getLogger('services').setLevel('ERROR')
+    corpus = build_corpus(args.pages, args.seed)
+    scenarios = Scenarios(app.test_client(), corpus, args.warm)
+    sampler = RssSampler()
+    report = {
+        'commit': _git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'settings': {'requests': args.requests, 'concurrency': args.concurrency, 'warm': args.warm,
+                     'latency': args.latency, 'latency_distribution': args.latency_distribution,
+                     'latency_sigma': args.latency_sigma, 'error_rate': args.error_rate, 'pages': args.pages,
+                     'seed': args.seed, 'env': args.env},
+        'endpoints': {},
+    }
+    try:
+        for endpoint in args.endpoints:
+            report['endpoints'][endpoint] = drive(getattr(scenarios, endpoint), args.requests, args.concurrency, sampler)
+    finally:
+        sampler.stop()
+        app.extensions['job_queue'].stop()
+    return report
+
+
+def compare(report, baseline):
+    """Relative change of each metric against a baseline report (positive = higher now)."""
+    changes = {}
+    for endpoint, stats in report['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(endpoint)
+        if not before:
+            continue
+        metrics = {f"{name}_ms": (stats['latency_ms'][name], before['latency_ms'][name]) for name in ('p50', 'p95', 'p99')}
+        metrics['rps'] = (stats['rps'], before['rps'])
+        metrics['peak_rss_mb'] = (stats['peak_rss_mb'], before['peak_rss_mb'])
+        changes[endpoint] = {name: round((now - then) / then * 100, 1) if then else None
+                             for name, (now, then) in metrics.items()}
+    return {'baseline_commit': baseline.get('commit'), 'percent_change': changes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline load test with a fake Gemini backend')
+    parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads')
+    parser.add_argument('--latency', type=float, default=0.8, help='mean fake Gemini latency in seconds')
+    parser.add_argument('--latency-distribution', default='lognormal',
+                        choices=('fixed', 'uniform', 'exponential', 'lognormal'))
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help='log-space spread of the lognormal latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of fake Gemini calls that fail (503)')
+    parser.add_argument('--responses', help='JSON file of {prompt substring: response} for the fake backend')
+    parser.add_argument('--warm', action='store_true', help='keep the Gemini/upload/export caches on')
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 3, 10], help='resume lengths in the corpus')
+    parser.add_argument('--seed', type=int, default=7, help='corpus seed')
+    parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE', help='extra app setting')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--compare', help='an earlier JSON report to compare against')
+    parser.add_argument('--json', action='store_true', help='print the JSON report instead of a table')
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            report['comparison'] = compare(report, json.load(f))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'endpoint':<22}{'reqs':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'peak RSS MB':>13}")
+    for endpoint, stats in report['endpoints'].items():
+        latency = stats['latency_ms']
+        print(f"{endpoint:<22}{stats['requests']:>6}{stats['rps']:>9}{latency['p50']:>10}{latency['p95']:>10}"
+              f"{latency['p99']:>10}{stats['error_rate']:>8}{stats['peak_rss_mb']:>13}")
+    for endpoint, changes in report.get('comparison', {}).get('percent_change', {}).items():
+        print(f"{endpoint:<22}" + '  '.join(f"{name} {change:+}%" for name, change in changes.items() if change is not None))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+# backend/benchmarks/parser_benchmark.py
+
+# Compares the rule-based resume parser (services/resume_parser.py) against the Gemini
+# extraction path on the corpus in benchmarks/corpus/resumes: field-level agreement and timing.
+#
+# Each corpus entry is a <name>.txt resume with a <name>.json reference extraction in the
+# shape the Gemini prompt returns, labelled by hand from the resume text (not generated by
+# either extractor, so neither scores against its own output). corpus/heldout holds resumes
+# kept out of parser tuning (--heldout). With --live (and GEMINI_API_KEY set) the Gemini path
+# is also run and timed, and its output is scored against the same reference.
+#
+#   cd backend && python -m benchmarks.parser_benchmark [--live] [--heldout] [--iterations 50] [--json]
+
+import argparse
+import glob
+import json
+import os
+import re
+import statistics
+import time
+
+from services.resume_parser import parse_resume
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), 'corpus', 'resumes')
+# Resumes kept out of parser tuning, for checking the confidence gate on formats it was not fitted
+# to: label new ones by hand before looking at the parser's output on them
+HELDOUT_DIR = os.path.join(os.path.dirname(__file__), 'corpus', 'heldout')
+
+
+def _words(text):
+    return set(re.findall(r'[a-z0-9]+', (text or '').lower()))
+
+
+def _jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _items(values):
+    return {re.sub(r'\s+', ' ', str(value)).strip().lower() for value in values}
+
+
+def _entries(parsed, reference, section, fields):
+    """Share of reference entries whose fields all match the parsed entry at the same position."""
+    parsed_entries, ref_entries = parsed.get(section, []), reference.get(section, [])
+    if not parsed_entries and not ref_entries:
+        return 1.0
+    matches = sum(all(_items([p.get(f, '')]) == _items([r.get(f, '')]) for f in fields)
+                  for p, r in zip(parsed_entries, ref_entries))
+    return matches / max(len(parsed_entries), len(ref_entries))
+
+
+def score(parsed, reference):
+    """Per-field agreement with the reference extraction, each in [0, 1]."""
+    contact, ref_contact = parsed.get('contact_info', {}), reference.get('contact_info', {})
+    fields = ('name', 'email', 'phone', 'linkedin')
+    parsed_bullets = [b for exp in parsed.get('experience', []) for b in exp.get('responsibilities', [])]
+    ref_bullets = [b for exp in reference.get('experience', []) for b in exp.get('responsibilities', [])]
+    scores = {
+        'contact': sum((contact.get(f) or '').lower() == (ref_contact.get(f) or '').lower() for f in fields) / len(fields),
+        'summary': _jaccard(_words(parsed.get('summary')), _words(reference.get('summary'))),
+        'experience': _entries(parsed, reference, 'experience', ('title', 'company')),
+        'bullets': _jaccard(_items(parsed_bullets), _items(ref_bullets)),
+        'education': _entries(parsed, reference, 'education', ('degree', 'university', 'year')),
+        'skills': _jaccard(_items(parsed.get('skills', [])), _items(reference.get('skills', []))),
+    }
+    scores['overall'] = round(statistics.mean(scores.values()), 3)
+    return scores
+
+
+def _time(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return result, statistics.median(samples)
+
+
+def load_corpus(directory=CORPUS_DIR):
+    corpus = []
+    for text_path in sorted(glob.glob(os.path.join(directory, '*.txt'))):
+        with open(text_path, encoding='utf-8') as f:
+            text = f.read()
+        with open(text_path[:-4] + '.json', encoding='utf-8') as f:
+            reference = json.load(f)
+        corpus.append((os.path.basename(text_path)[:-4], text, reference))
+    return corpus
+
+
+def _gemini_model():
+    import google.generativeai as genai
+    genai.configure(api_key=os.environ['GEMINI_API_KEY'])
+    return genai.GenerativeModel('gemini-2.5-flash')
+
+
+def run(iterations=50, live=False, threshold=0.8, heldout=False):
+    from services.pipeline import extract_resume
+
+    model = _gemini_model() if live else None
+    rows = []
+    for name, text, reference in load_corpus(HELDOUT_DIR if heldout else CORPUS_DIR):
+        (parsed, confidence), parser_ms = _time(lambda: parse_resume(text), iterations)
+        row = {
+            'resume': name,
+            'confidence': confidence,
+            'accepted': confidence >= threshold,
+            'parser_ms': round(parser_ms, 3),
+            'parser_scores': score(parsed, reference),
+        }
+        if model is not None:
+            llm_output, llm_ms = _time(lambda: extract_resume(model, text), 1)
+            row['llm_ms'] = round(llm_ms, 1)
+            row['llm_scores'] = score(llm_output, reference)
+            row['parser_vs_llm'] = score(parsed, llm_output)
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rule-based resume parser vs Gemini extraction benchmark')
+    parser.add_argument('--iterations', type=int, default=50, help='parser runs per resume (median is reported)')
+    parser.add_argument('--threshold', type=float, default=0.8, help='confidence needed to skip Gemini')
+    parser.add_argument('--live', action='store_true', help='also run the Gemini extraction (needs GEMINI_API_KEY)')
+    parser.add_argument('--heldout', action='store_true', help='use the held-out corpus instead of the tuning one')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    rows = run(args.iterations, args.live, args.threshold, args.heldout)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"{'resume':<22}{'conf':>6}{'used':>6}{'parser ms':>11}{'agreement':>11}{'llm ms':>9}{'llm agr.':>10}")
+    for row in rows:
+        llm_ms = f"{row['llm_ms']:>9}" if 'llm_ms' in row else f"{'-':>9}"
+        llm_score = f"{row['llm_scores']['overall']:>10}" if 'llm_scores' in row else f"{'-':>10}"
+        print(f"{row['resume']:<22}{row['confidence']:>6}{'yes' if row['accepted'] else 'no':>6}"
+              f"{row['parser_ms']:>11}{row['parser_scores']['overall']:>11}{llm_ms}{llm_score}")
+    accepted = [row for row in rows if row['accepted']]
+    print(f"\nParser accepted {len(accepted)}/{len(rows)} resumes; "
+          f"mean agreement on accepted: {statistics.mean(r['parser_scores']['overall'] for r in accepted) if accepted else 0:.3f}")
+
+
+if __name__ == '__main__':
+    main()
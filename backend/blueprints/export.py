@@ -1,232 +1,165 @@
 # backend/blueprints/export.py
 
-from flask import Blueprint, jsonify, send_file, request, current_app 
+from flask import Blueprint, Response, jsonify, send_file, request, current_app
 import io
-from docx import Document
-from docx.shared import Pt # Only Pt is still relevant for docx font sizes
-from docx.enum.text import WD_ALIGN_PARAGRAPH
+import json
+import re
+import zipfile
 
-# Import ReportLab components for PDF generation
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, ListFlowable, ListItem
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER, TA_JUSTIFY
-from reportlab.lib.units import inch 
+from services.metrics import EXPORT_RENDER_SECONDS, stream_with_request_id
+from services.render import DEFAULT_TEMPLATE, FORMATS, TEMPLATES, render_key
+from services.results import apply_edits, load_result
 
 export_bp = Blueprint('export', __name__)
 
+
+def _export_content(data):
+    """
+    The content to render for one export request: a stored result (by "result_id", with
+    optional "edits") or the posted result fields. Returns (content, error, status).
+    """
+    result_id = data.get('result_id')
+    if result_id:
+        stored = load_result(current_app.extensions['result_store'], result_id)
+        if stored is None:
+            return None, "Result not found (it may have expired). Please generate improvements again.", 404
+        try:
+            return apply_edits(stored, data.get('edits') or {}), None, None
+        except ValueError as e:
+            return None, str(e), 400
+    return {
+        'extracted_resume_data': data.get('original_extracted_data') or {},
+        'improved_summary': data.get('improved_summary') or '',
+        'improved_bullets': data.get('improved_bullets') or [],
+        'suggested_skills': data.get('suggested_skills') or [],
+    }, None, None
+
+
 @export_bp.route('/', methods=['POST'])
 @export_bp.route('', methods=['POST'])
 def export_resume():
+    """
+    Export a tailored resume. Either pass "result_id" from /api/improve (plus optional "edits",
+    see services.results.apply_edits), or post the full result fields as before. "template"
+    picks a layout from services.render.TEMPLATES. Responses carry an ETag of the content;
+    a matching If-None-Match gets a 304 without rendering anything.
+    """
     data = request.get_json()
     export_format = data.get('format', 'docx').lower()
-
-    original_extracted_data = data.get('original_extracted_data', {})
-    improved_summary = data.get('improved_summary', '')
-    improved_bullets = data.get('improved_bullets', [])
-    suggested_skills = data.get('suggested_skills', [])
-    match_analysis = data.get('match_analysis', '') # Not used for export to PDF but kept
-
-    def get_section_text(section_key, default_text=""):
-        return original_extracted_data.get(section_key, default_text)
-
-    name = get_section_text('contact_info', {}).get('name', 'Applicant Name')
-    email = get_section_text('contact_info', {}).get('email', '')
-    phone = get_section_text('contact_info', {}).get('phone', '')
-    linkedin = get_section_text('contact_info', {}).get('linkedin', '')
-    
-    education_entries = original_extracted_data.get('education', [])
-    skills_list = original_extracted_data.get('skills', [])
-    achievements_list = original_extracted_data.get('achievements', [])
-
-
-    if export_format == 'docx':
-        document = Document()
-        
-        # Set basic margins (optional) - for DOCX, using Inches from docx.shared is correct
-        from docx.shared import Inches # Re-import Inches just for DOCX context if needed
-        sections = document.sections
-        for section in sections:
-            section.top_margin = Inches(0.75)
-            section.bottom_margin = Inches(0.75)
-            section.left_margin = Inches(0.75)
-            section.right_margin = Inches(0.75)
-
-        # 1. Contact Info (Header-like)
-        header_para = document.add_paragraph()
-        header_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        runner = header_para.add_run(name)
-        runner.bold = True
-        runner.font.size = Pt(20)
-        
-        contact_info_para = document.add_paragraph()
-        contact_info_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        contact_parts = []
-        if email: contact_parts.append(email)
-        if phone: contact_parts.append(phone)
-        if linkedin: contact_parts.append(linkedin)
-        contact_info_para.add_run(" | ".join(contact_parts))
-        
-        document.add_paragraph().add_run().add_break()
-
-
-        # 2. Summary
-        if improved_summary:
-            document.add_heading('Summary', level=2)
-            document.add_paragraph(improved_summary)
-            document.add_paragraph().add_run().add_break()
-
-        # 3. Experience
-        if improved_bullets:
-            document.add_heading('Experience', level=2)
-            for bullet in improved_bullets:
-                p = document.add_paragraph(style='List Bullet')
-                p.add_run(bullet.lstrip('* ').strip())
-            document.add_paragraph().add_run().add_break()
-
-
-        # 4. Education (from original extracted data)
-        if education_entries:
-            document.add_heading('Education', level=2)
-            for edu in education_entries:
-                edu_para = document.add_paragraph()
-                edu_para.add_run(f"{edu.get('degree', '')}").bold = True
-                edu_para.add_run(f", {edu.get('university', '')}")
-                if edu.get('year'):
-                    edu_para.add_run(f", {edu.get('year', '')}")
-            document.add_paragraph().add_run().add_break()
-
-
-        # 5. Skills (from original extracted data, or could be a blend with suggested)
-        if skills_list:
-            all_skills = list(set(skills_list + suggested_skills))
-            document.add_heading('Skills', level=2)
-            document.add_paragraph(", ".join(all_skills))
-            document.add_paragraph().add_run().add_break()
-
-        # 6. Achievements (from original extracted data, if present)
-        if achievements_list:
-            document.add_heading('Achievements', level=2)
-            for achievement in achievements_list:
-                p = document.add_paragraph(style='List Bullet')
-                p.add_run(achievement.strip())
-            document.add_paragraph().add_run().add_break()
-
-
-        byte_io = io.BytesIO()
-        document.save(byte_io)
-        byte_io.seek(0)
-
-        return send_file(byte_io, mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-                         as_attachment=True, download_name='tailored_resume.docx')
-
-    elif export_format == 'pdf':
-        byte_io = io.BytesIO()
-        # Corrected: Use 'inch' from reportlab.lib.units for margins
-        doc = SimpleDocTemplate(byte_io, pagesize=letter,
-                                leftMargin=0.75 * inch, rightMargin=0.75 * inch,
-                                topMargin=0.75 * inch, bottomMargin=0.75 * inch)
-        styles = getSampleStyleSheet()
-        
-        name_style = ParagraphStyle(
-            'NameStyle',
-            parent=styles['h1'],
-            fontName='Helvetica-Bold',
-            fontSize=20,
-            leading=24,
-            alignment=TA_CENTER,
-            spaceAfter=6
-        )
-        contact_style = ParagraphStyle(
-            'ContactStyle',
-            parent=styles['Normal'],
-            fontName='Helvetica',
-            fontSize=10,
-            leading=12,
-            alignment=TA_CENTER,
-            spaceAfter=12
-        )
-        section_heading_style = ParagraphStyle(
-            'SectionHeading',
-            parent=styles['h2'],
-            fontName='Helvetica-Bold',
-            fontSize=14,
-            leading=16,
-            alignment=TA_LEFT,
-            spaceAfter=8,
-            spaceBefore=12
-        )
-        body_text_style = ParagraphStyle(
-            'BodyText',
-            parent=styles['Normal'],
-            fontName='Helvetica',
-            fontSize=10,
-            leading=12,
-            alignment=TA_LEFT,
-            spaceAfter=6
-        )
-        list_style = styles['Bullet']
-
-        story = []
-
-        # 1. Contact Info (Header-like)
-        story.append(Paragraph(name, name_style))
-        contact_parts = []
-        if email: contact_parts.append(email)
-        if phone: contact_parts.append(phone)
-        if linkedin: contact_parts.append(f"<link href='{linkedin}'>{linkedin}</link>")
-        story.append(Paragraph(" | ".join(contact_parts), contact_style))
-        story.append(Spacer(1, 0.15 * inch))
-
-
-        # 2. Summary
-        if improved_summary:
-            story.append(Paragraph("SUMMARY", section_heading_style))
-            story.append(Paragraph(improved_summary, body_text_style))
-            story.append(Spacer(1, 0.15 * inch))
-
-        # 3. Experience
-        if improved_bullets:
-            story.append(Paragraph("EXPERIENCE", section_heading_style))
-            bullet_items = [ListItem(Paragraph(bullet.lstrip('* ').strip(), body_text_style)) for bullet in improved_bullets]
-            story.append(ListFlowable(bullet_items, bulletType='bullet', start='bullet', leftIndent=0.2*inch))
-            story.append(Spacer(1, 0.15 * inch))
-
-        # 4. Education
-        if education_entries:
-            story.append(Paragraph("EDUCATION", section_heading_style))
-            for edu in education_entries:
-                edu_text = f"<b>{edu.get('degree', '')}</b>, {edu.get('university', '')}"
-                if edu.get('year'):
-                    edu_text += f", {edu.get('year', '')}"
-                story.append(Paragraph(edu_text, body_text_style))
-            story.append(Spacer(1, 0.15 * inch))
-
-        # 5. Skills
-        if skills_list:
-            all_skills = list(set(skills_list + suggested_skills))
-            if all_skills:
-                story.append(Paragraph("SKILLS", section_heading_style))
-                story.append(Paragraph(", ".join(all_skills), body_text_style))
-                story.append(Spacer(1, 0.15 * inch))
-
-        # 6. Achievements (from original extracted data, if present)
-        if achievements_list:
-            story.append(Paragraph("ACHIEVEMENTS", section_heading_style))
-            bullet_items = [ListItem(Paragraph(ach.strip(), body_text_style)) for ach in achievements_list]
-            story.append(ListFlowable(bullet_items, bulletType='bullet', start='bullet', leftIndent=0.2*inch))
-            story.append(Spacer(1, 0.15 * inch))
-
-
-        try:
-            doc.build(story)
-        except Exception as e:
-            current_app.logger.error(f"Error building PDF: {str(e)}")
-            return jsonify({"error": f"Error generating PDF: {str(e)}"}), 500
-
-        byte_io.seek(0)
-
-        return send_file(byte_io, mimetype='application/pdf',
-                         as_attachment=True, download_name='tailored_resume.pdf')
-    else:
-        return jsonify({"error": "Unsupported export format."}), 400
\ No newline at end of file
+    template = data.get('template') or DEFAULT_TEMPLATE
+
+    if export_format not in FORMATS:
+        return jsonify({"error": "Unsupported export format."}), 400
+    if template not in TEMPLATES:
+        return jsonify({"error": f"Unsupported template. Use one of: {', '.join(TEMPLATES)}."}), 400
+
+    content, error, status = _export_content(data)
+    if error:
+        return jsonify({"error": error}), status
+
+    key = render_key(export_format, template, content)
+    if request.if_none_match.contains(key):
+        response = Response(status=304)
+        response.set_etag(key)
+        return response
+
+    try:
+        with EXPORT_RENDER_SECONDS.labels(export_format, template).time():
+            document = current_app.extensions['export_renderer'].render(export_format, template, content, key)
+    except Exception as e:
+        current_app.logger.error(f"Error building {export_format.upper()}: {str(e)}")
+        return jsonify({"error": f"Error generating {export_format.upper()}: {str(e)}"}), 500
+
+    mimetype, download_name = FORMATS[export_format]
+    response = send_file(io.BytesIO(document), mimetype=mimetype, as_attachment=True,
+                         download_name=download_name, etag=False)
+    response.set_etag(key)
+    # Let clients keep the file but revalidate with If-None-Match before reusing it
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+class _ZipStream(io.RawIOBase):
+    """Write-only, unseekable sink for zipfile; drain() hands back what was written so far."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _slug(text):
+    return re.sub(r'[^A-Za-z0-9]+', '_', text).strip('_')[:60] or 'resume'
+
+
+@export_bp.route('/batch', methods=['POST'])
+def export_batch():
+    """
+    Render several resumes in several formats/templates at once, in parallel on the render
+    process pool, streamed back as one ZIP. Body: {"items": [<export_resume body without
+    format>, ...], "formats": ["docx", "pdf"], "templates": ["classic"]}; each item may carry
+    an "id" used for its folder name. Files are added as they finish, and manifest.json at
+    the end lists every file and any render errors.
+    """
+    data = request.get_json()
+    items = data.get('items') or []
+    formats = [export_format.lower() for export_format in data.get('formats') or ['docx']]
+    templates = data.get('templates') or [DEFAULT_TEMPLATE]
+
+    if not items:
+        return jsonify({"error": "A non-empty list of items is required."}), 400
+    if any(export_format not in FORMATS for export_format in formats):
+        return jsonify({"error": f"Unsupported export format. Use any of: {', '.join(FORMATS)}."}), 400
+    if any(template not in TEMPLATES for template in templates):
+        return jsonify({"error": f"Unsupported template. Use any of: {', '.join(TEMPLATES)}."}), 400
+    max_files = current_app.config['EXPORT_BATCH_MAX_FILES']
+    if len(items) * len(formats) * len(templates) > max_files:
+        return jsonify({"error": f"At most {max_files} files per batch export."}), 400
+
+    jobs = []
+    for index, item in enumerate(items):
+        content, error, status = _export_content(item)
+        if error:
+            return jsonify({"error": f"Item {index}: {error}", "index": index}), status
+        name = str(item.get('id') or (content['extracted_resume_data'] or {}).get('contact_info', {}).get('name') or '')
+        folder = f"{index + 1:03d}_{_slug(name)}"
+        for export_format in formats:
+            for template in templates:
+                jobs.append((f"{folder}/tailored_resume_{template}.{export_format}", export_format, template, content))
+
+    results = current_app.extensions['export_renderer'].render_many(jobs)
+
+    def generate():
+        sink = _ZipStream()
+        manifest = {"files": [], "errors": {}}
+        # DOCX and PDF are already compressed; storing them keeps the ZIP step cheap
+        with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for path, document, error in results:
+                if error is not None:
+                    current_app.logger.error(f"Batch export of {path} failed: {error}")
+                    manifest["errors"][path] = str(error)
+                else:
+                    archive.writestr(path, document)
+                    manifest["files"].append(path)
+                yield sink.drain()
+            archive.writestr('manifest.json', json.dumps(manifest, indent=2))
+        yield sink.drain()
+
+    return Response(stream_with_request_id(generate()), mimetype='application/zip',
+                    headers={'Content-Disposition': 'attachment; filename=tailored_resumes.zip'})
+
+
+@export_bp.route('/cache/stats', methods=['GET'])
+def render_cache_stats():
+    """Render cache counters plus how many pre-renders were used, joined or wasted."""
+    return jsonify(current_app.extensions['export_renderer'].stats()), 200
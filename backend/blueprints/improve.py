@@ -1,200 +1,387 @@
 # backend/blueprints/improve.py
 
-from flask import Blueprint, request, jsonify, current_app
-import google.generativeai as genai
-import os
-import json # For JSON parsing of Gemini output
-import re
+from flask import Blueprint, Response, request, jsonify, current_app
+import json
+from pydantic import ValidationError
+
+from services.llm import CircuitOpenError
+from services.metrics import stream_with_request_id
+from services.scheduler import BATCH, SchedulerOverloaded
+from services.matcher import match_resume, resume_text_from_extracted
+from services.incremental import run_incremental, same_input
+from services.results import load_result, save_result
+from services.pipeline import (EMPTY_RESULTS, ExtractionError, TailoringOptions, extract_resume, stream_tailoring,
+                               run_batch, run_consolidated, run_pipelined, get_executor)
+
+PIPELINE_MODES = ('multi', 'consolidated')
+MATCH_MODES = ('llm', 'local')
 
 improve_bp = Blueprint('improve', __name__)
 
-import re
 
-def clean_gemini_output(text):
-    """Clean Gemini/LLM markdown-like output for plain text extraction."""
-    if not text:
-        return ""
+def _tailoring_options(data):
+    """Tailoring settings from the app config, with per-request overrides. Returns (options, error)."""
+    match_mode = data.get('match_mode') or current_app.config['MATCH_ANALYSIS_MODE']
+    if match_mode not in MATCH_MODES:
+        return None, f"Unsupported match mode. Use one of: {', '.join(MATCH_MODES)}."
+    return TailoringOptions(
+        match_mode=match_mode,
+        bullet_top_k=current_app.config['BULLET_RANK_TOP_K'],
+        bullet_min_similarity=current_app.config['BULLET_RANK_MIN_SIMILARITY'],
+        compact_jd=current_app.config['JD_COMPACTION'],
+        prompt_token_budget=current_app.config['PROMPT_TOKEN_BUDGET'],
+    ), None
+
+
+def _unavailable(error):
+    """503 with Retry-After while the Gemini circuit breaker is open, 429 when the call queue is full."""
+    response = jsonify({"error": str(error)})
+    response.headers['Retry-After'] = str(int(error.retry_after + 0.5))
+    return response, 429 if isinstance(error, SchedulerOverloaded) else 503
+
+
+def improve_inputs(data):
+    """
+    The resume text, JD text and previous result of an improve request body, with texts an
+    incremental request ("previous_result_id") left out taken from the previous result.
+    Returns (raw_resume_text, jd_text, previous, error) where error is (body, status) or None.
+    """
+    raw_resume_text = data.get('resume_text') # This is now just raw text
+    jd_text = data.get('jd_text')
 
-    # Remove markdown bold/italic markers
-    text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)  # bold
-    text = re.sub(r'\*(.*?)\*', r'\1', text)      # italic
+    previous = None
+    if data.get('previous_result_id'):
+        previous = load_result(current_app.extensions['result_store'], data['previous_result_id'])
+        if previous is None:
+            return None, None, None, ({"error": "Previous result not found (it may have expired). Please generate improvements again."}, 404)
+        previous_inputs = previous.get('inputs') or {}
+        raw_resume_text = raw_resume_text or previous_inputs.get('resume_text')
+        jd_text = jd_text or previous_inputs.get('jd_text')
+        if data.get('extracted_resume_data') is not None and not isinstance(data['extracted_resume_data'], dict):
+            return None, None, None, ({"error": "extracted_resume_data must be an object."}, 400)
+
+    if not (raw_resume_text or (previous and data.get('extracted_resume_data'))) or not jd_text:
+        return None, None, None, ({"error": "Resume and Job Description text are required"}, 400)
+    return raw_resume_text, jd_text, previous, None
+
+
+def improve_result(data):
+    """
+    The full improve pipeline for one request body, outside of any HTTP response so the job
+    queue can run it too. Returns (body, status code, retry_after); retry_after is set when
+    the request was turned away for capacity and can be retried later.
+
+    With "previous_result_id" the request is incremental: omitted texts default to those of
+    the previous result, and only sections (and bullets) whose inputs changed are re-tailored.
+    An edited "extracted_resume_data" may be sent instead of resume text to skip extraction.
+    """
+    raw_resume_text, jd_text, previous, error = improve_inputs(data)
+    if error:
+        return (*error, None)
+
+    model = current_app.extensions.get('llm_client')
+    if model is None:
+        return {"error": "Gemini API Key not configured."}, 500, None
+
+    mode = data.get('mode') or current_app.config['IMPROVE_PIPELINE_MODE']
+    if mode not in PIPELINE_MODES:
+        return {"error": f"Unsupported pipeline mode. Use one of: {', '.join(PIPELINE_MODES)}."}, 400, None
+    options, error = _tailoring_options(data)
+    if error:
+        return {"error": error}, 400, None
+
+    cache = current_app.extensions['llm_cache']
+
+    try:
+        model.check_capacity()
+
+        # --- Incremental: reuse everything of the previous result whose inputs did not change ---
+        if previous is not None:
+            return _improve_incremental(model, previous, data, raw_resume_text, jd_text, cache, options)
+
+        # --- Consolidated mode: one schema-constrained call for extraction plus all tailored sections ---
+        if mode == 'consolidated':
+            try:
+                result = run_consolidated(model, raw_resume_text, jd_text, cache, options)
+                result["result_id"] = save_result(current_app.extensions['result_store'], result, raw_resume_text, jd_text,
+                                                  options)
+                current_app.extensions['export_renderer'].prerender(result)
+                return {"message": "Resume improvement generated successfully!", **result}, 200, None
+            except (ExtractionError, ValidationError) as e:
+                # Only a malformed structured response falls back to the multi-call path
+                current_app.logger.warning(f"Consolidated Gemini output failed validation, falling back to multi-call: {e}")
+
+        # --- Extraction, streamed into the tailoring calls (summary, bullets, skills, match analysis) ---
+        # Each tailoring call starts as soon as the extracted fields it needs have arrived
+        executor = get_executor(current_app.config['GEMINI_MAX_CONCURRENCY'], scheduler=model.scheduler)
+        try:
+            extracted_resume_data, tailored, errors, stats = run_pipelined(
+                model, raw_resume_text, jd_text, executor, cache, options,
+                current_app.config['LOCAL_PARSER_MIN_CONFIDENCE'])
+        except ExtractionError as e:
+            current_app.logger.error(f"Failed to parse JSON from Gemini resume extraction: {e}. Raw response: {e.raw_text}")
+            return {"error": "AI failed to extract structured resume data correctly. Please try a different resume or provide clearer text."}, 500, None
+
+    except (CircuitOpenError, SchedulerOverloaded) as e:
+        return {"error": str(e)}, 429 if isinstance(e, SchedulerOverloaded) else 503, e.retry_after
+    except Exception as e:
+        current_app.logger.error(f"Gemini API or processing error: {str(e)}")
+        return {"error": f"AI processing failed: {str(e)}"}, 500, None
 
-    # Remove inline code backticks
-    text = re.sub(r'`{1,3}(.*?)`{1,3}', r'\1', text)
+    for section, error in errors.items():
+        current_app.logger.error(f"Gemini tailoring call for {section} failed: {error}")
+    return _improve_response(extracted_resume_data, tailored, errors, stats, raw_resume_text, jd_text, options)
 
-    # Remove fenced code blocks (```json, ```python, etc.)
-    text = re.sub(r'```[\w]*\n(.*?)\n```', r'\1', text, flags=re.DOTALL)
 
-    # Remove leading/trailing markdown headers or horizontal lines
-    text = re.sub(r'^#+\s*', '', text, flags=re.MULTILINE)
-    text = re.sub(r'^-{2,}|^_{2,}', '', text, flags=re.MULTILINE)
+def _improve_response(extracted_resume_data, tailored, errors, stats, raw_resume_text, jd_text, options):
+    """The improve response for tailored sections, stored under a new result ID. Returns (body, status, retry_after)."""
+    if len(errors) == len(tailored):
+        return {"error": f"AI processing failed: {next(iter(errors.values()))}"}, 500, None
 
-    # Remove extra spacing and newlines
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    text = re.sub(r'[ \t]{2,}', ' ', text)
+    response = {
+        "message": "Resume improvement generated successfully!",
+        "extracted_resume_data": extracted_resume_data,
+        **tailored,
+    }
+    if errors:
+        # Partial success: the sections listed here fell back to empty values
+        response["errors"] = errors
+    if stats:
+        response["stats"] = stats
+    # Lets /api/export take this ID instead of the whole result
+    response["result_id"] = save_result(current_app.extensions['result_store'], response, raw_resume_text, jd_text,
+                                        options)
+    # The user's likely next step is an export; get it rendering now (if EXPORT_PRERENDER is on)
+    current_app.extensions['export_renderer'].prerender(response)
+    return response, 200, None
+
+
+def _improve_incremental(model, previous, data, raw_resume_text, jd_text, cache, options):
+    """
+    Re-tailor from a previous result: its extraction is reused when the resume text is
+    unchanged (or the client sent edited extracted data), then only changed sections and
+    bullets go to Gemini (services.incremental). Returns (body, status, retry_after).
+    """
+    previous_resume_text = (previous.get('inputs') or {}).get('resume_text')
+    if data.get('extracted_resume_data'):
+        extracted_resume_data = data['extracted_resume_data']
+    elif previous_resume_text and same_input(previous_resume_text, raw_resume_text):
+        extracted_resume_data = previous['extracted_resume_data']
+    else:
+        try:
+            extracted_resume_data = extract_resume(model, raw_resume_text, cache,
+                                                   current_app.config['LOCAL_PARSER_MIN_CONFIDENCE'])
+        except ExtractionError as e:
+            current_app.logger.error(f"Failed to parse JSON from Gemini resume extraction: {e}. Raw response: {e.raw_text}")
+            return {"error": "AI failed to extract structured resume data correctly. Please try a different resume or provide clearer text."}, 500, None
 
-    return text.strip()
+    executor = get_executor(current_app.config['GEMINI_MAX_CONCURRENCY'], scheduler=model.scheduler)
+    tailored, errors, stats = run_incremental(model, previous, extracted_resume_data, jd_text, executor, cache, options)
+    for section, error in errors.items():
+        current_app.logger.error(f"Gemini tailoring call for {section} failed: {error}")
+    return _improve_response(extracted_resume_data, tailored, errors, stats, raw_resume_text, jd_text, options)
 
 
 @improve_bp.route('/', methods=['POST'])
 @improve_bp.route('', methods=['POST'])
 def improve_resume():
+    body, status, retry_after = improve_result(request.get_json())
+    response = jsonify(body)
+    if retry_after is not None:
+        response.headers['Retry-After'] = str(int(retry_after + 0.5))
+    return response, status
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@improve_bp.route('/stream', methods=['POST'])
+def improve_resume_stream():
+    """
+    Server-Sent Events variant of improve_resume. Emits 'extracted_resume_data', then one
+    'bullet' event per rewritten bullet and one event per finished section
+    ('improved_summary', 'improved_bullets', 'suggested_skills', 'match_analysis') in
+    completion order, 'error' for any failed step, and finally 'done' with the stored result_id.
+    Stage statistics such as 'bullet_ranking' are sent as their own events before the sections.
+    """
     data = request.get_json()
-    raw_resume_text = data.get('resume_text') # This is now just raw text
+    raw_resume_text = data.get('resume_text')
     jd_text = data.get('jd_text')
 
     if not raw_resume_text or not jd_text:
         return jsonify({"error": "Resume and Job Description text are required"}), 400
 
-    gemini_api_key = current_app.config.get('GEMINI_API_KEY')
-    if not gemini_api_key:
+    model = current_app.extensions.get('llm_client')
+    if model is None:
         return jsonify({"error": "Gemini API Key not configured."}), 500
 
+    options, error = _tailoring_options(data)
+    if error:
+        return jsonify({"error": error}), 400
+
     try:
-        genai.configure(api_key=gemini_api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash')
-
-        # --- NEW: Gemini for Initial Resume Parsing/Extraction ---  
-        # Ask Gemini to extract key sections into a structured JSON format.
-        # This replaces pyresparser.
-        resume_extraction_prompt = f"""
-        Extract the following information from the resume text below and format it as a JSON object.
-        If a section is not found, use an empty string or empty list as appropriate.
-
-        Resume Text:
-        {raw_resume_text}
-
-        JSON Structure:
-        {{
-            "summary": "...",
-            "experience": [
-                {{"title": "...", "company": "...", "duration": "...", "responsibilities": ["...", "..."]}},
-                // more experience entries
-            ],
-            "education": [
-                {{"degree": "...", "university": "...", "year": "..."}},
-                // more education entries
-            ],
-            "skills": ["skill1", "skill2", "..."],
-            "achievements": ["...", "..."],
-            "contact_info": {{"name": "...", "email": "...", "phone": "...", "linkedin": "..."}}
-        }}
-        
-        Ensure the output is a valid JSON string.
-        """
-        
-        extracted_resume_response = model.generate_content(resume_extraction_prompt)
-        
-        # Robustly parse the JSON from Gemini's response
+        model.check_capacity()
+    except SchedulerOverloaded as e:
+        return _unavailable(e)
+
+    cache = current_app.extensions['llm_cache']
+    executor = get_executor(current_app.config['GEMINI_MAX_CONCURRENCY'], scheduler=model.scheduler)
+
+    def generate():
         try:
-            # Gemini might add markdown ```json ``` block
-            json_str = extracted_resume_response.text.strip()
-            if json_str.startswith('```json') and json_str.endswith('```'):
-                json_str = json_str[7:-3].strip()
-            extracted_resume_data = json.loads(json_str)
-        except json.JSONDecodeError as e:
-            current_app.logger.error(f"Failed to parse JSON from Gemini resume extraction: {e}. Raw response: {extracted_resume_response.text}")
-            return jsonify({"error": "AI failed to extract structured resume data correctly. Please try a different resume or provide clearer text."}), 500
-
-        # Now use the extracted_resume_data for tailoring
-        current_summary = extracted_resume_data.get('summary', '')
-        current_experience_bullets = []
-        for exp in extracted_resume_data.get('experience', []):
-            if 'responsibilities' in exp and isinstance(exp['responsibilities'], list):
-                current_experience_bullets.extend(exp['responsibilities'])
-            elif 'description' in exp: # Sometimes it might be a single description string
-                current_experience_bullets.append(exp['description'])
-        
-        current_skills = extracted_resume_data.get('skills', [])
-
-        # --- Prompt Templates for Gemini (now using extracted data) ---
-
-        # 1. Summary Tailoring
-        summary_prompt = f"""
-        You are an expert resume writer. Rewrite the following resume summary to be highly tailored for the provided job description.
-        Focus on aligning the summary with the key requirements, skills, and overall tone of the job description.
-        
-        Current Resume Summary:
-        {current_summary}
-
-        Job Description:
-        {jd_text}
-
-        Rewrite the summary concisely and powerfully, focusing on relevant experience and skills mentioned in the JD.
-        """
-        response_summary = model.generate_content(summary_prompt)
-        improved_summary = clean_gemini_output(response_summary.text)
-
-        # 2. Bullet Point Rewriting
-        # We'll send the extracted bullets and ask Gemini to rewrite them
-        bullets_prompt = f"""
-        You are an expert resume writer. Given the following resume experience bullet points and job description,
-        rewrite *each* bullet point to better highlight achievements and skills relevant to the job description.
-        Use strong action verbs and quantifiable results where possible.
-        Return each rewritten bullet point on a new line, starting with an asterisk (*).
-
-        Current Resume Bullet Points:
-        {'- ' + '\n- '.join(current_experience_bullets)} 
-
-        Job Description:
-        {jd_text}
-        """
-        response_bullets = model.generate_content(bullets_prompt)
-        # Parse bullet points, assuming Gemini returns them with asterisks
-        improved_bullets = [line.strip() for line in response_bullets.text.split('\n') if line.strip().startswith('*')]
-        if not improved_bullets: # Fallback if Gemini doesn't use asterisks for some reason
-            improved_bullets = [line.strip() for line in response_bullets.text.split('\n') if line.strip()]
-
-
-        # 3. Skill Gap Filler / Suggestion
-        skills_prompt = f"""
-        You are an expert career coach. Based on the provided job description and the skills currently present in the resume,
-        identify any crucial technical or soft skills that are prominent in the job description but seem
-        missing or under-represented in the resume. Suggest 3-5 such skills that the applicant should consider adding
-        or highlighting.
-
-        Current Resume Skills:
-        {', '.join(current_skills)}
-
-        Job Description:
-        {jd_text}
-
-        List the suggested skills, separated by commas.
-        """
-        response_skills = model.generate_content(skills_prompt)
-        suggested_skills_raw = response_skills.text.strip()
-        suggested_skills = [s.strip() for s in suggested_skills_raw.split(',') if s.strip()]
-
-
-        # 4. JD vs Resume Matcher Analysis
-        match_analysis_prompt = f"""
-        Analyze the alignment between the provided resume and job description.
-        Identify 2-3 key areas where the resume strongly matches the JD, and 2-3 areas where there might be a "keyword gap" or where the resume could be strengthened to better align.
-        
-        Resume Content (Summary, Experience, Skills):
-        Summary: {current_summary}
-        Experience: {current_experience_bullets}
-        Skills: {', '.join(current_skills)}
-
-        Job Description:
-        {jd_text}
-
-        Provide your analysis in two distinct sections: "Strong Matches:" and "Areas for Improvement:".
-        Finally don't mention the key changes and why they were made. That is Irrelevant.
-        """
-        response_match_analysis = model.generate_content(match_analysis_prompt)
-        match_analysis_text = clean_gemini_output(response_match_analysis.text)
+            try:
+                extracted_resume_data = extract_resume(model, raw_resume_text, cache,
+                                                       current_app.config['LOCAL_PARSER_MIN_CONFIDENCE'])
+            except ExtractionError as e:
+                current_app.logger.error(f"Failed to parse JSON from Gemini resume extraction: {e}. Raw response: {e.raw_text}")
+                yield _sse('error', {"section": "extracted_resume_data", "error": "AI failed to extract structured resume data correctly. Please try a different resume or provide clearer text."})
+                return
+            yield _sse('extracted_resume_data', extracted_resume_data)
+
+            result = {"extracted_resume_data": extracted_resume_data, **EMPTY_RESULTS}
+            for event, payload in stream_tailoring(model, extracted_resume_data, jd_text, executor, cache, options):
+                if event == 'error':
+                    current_app.logger.error(f"Gemini tailoring call for {payload['section']} failed: {payload['error']}")
+                elif event in result:
+                    result[event] = payload
+                yield _sse(event, payload)
+            result_id = save_result(current_app.extensions['result_store'], result, raw_resume_text, jd_text, options)
+            current_app.extensions['export_renderer'].prerender(result)
+
+        except Exception as e:
+            current_app.logger.error(f"Gemini API or processing error: {str(e)}")
+            yield _sse('error', {"section": None, "error": f"AI processing failed: {str(e)}"})
+            return
+        yield _sse('done', {"message": "Resume improvement generated successfully!", "result_id": result_id})
+
+    return Response(stream_with_request_id(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def _batch_entry(jd, index, results, errors, stats):
+    entry = {"index": index, "jd_id": jd.get('id', index), **results}
+    if not errors:
+        entry["status"] = "ok"
+    elif len(errors) == len(results):
+        entry["status"] = "error"
+    else:
+        entry["status"] = "partial"
+    if errors:
+        entry["errors"] = errors
+    if stats:
+        entry["stats"] = stats
+    return entry
+
+
+@improve_bp.route('/batch', methods=['POST'])
+def improve_resume_batch():
+    """
+    Match one resume against many job descriptions. The resume is extracted once and the per-JD
+    tailoring runs through a bounded pool (BATCH_MAX_CONCURRENCY JDs in flight). Each JD gets a
+    status of 'ok', 'partial' or 'error'; with "stream": true results are sent as NDJSON lines
+    in completion order instead of one JSON payload in input order.
+    """
+    data = request.get_json()
+    raw_resume_text = data.get('resume_text')
+    # Each JD is either a plain string or {"id": ..., "text": ...}
+    jds = [jd if isinstance(jd, dict) else {"text": jd} for jd in data.get('jds') or []]
 
+    if not raw_resume_text or not jds or not all(jd.get('text') for jd in jds):
+        return jsonify({"error": "Resume text and a non-empty list of Job Description texts are required"}), 400
+    if len(jds) > current_app.config['BATCH_MAX_JDS']:
+        return jsonify({"error": f"At most {current_app.config['BATCH_MAX_JDS']} job descriptions per batch."}), 400
 
+    client = current_app.extensions.get('llm_client')
+    if client is None:
+        return jsonify({"error": "Gemini API Key not configured."}), 500
+    # Batch calls queue behind interactive ones and are turned away first under load
+    model = client.with_priority(BATCH)
+
+    options, error = _tailoring_options(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    cache = current_app.extensions['llm_cache']
+    # Batch calls get their own pool, so a large batch never queues ahead of interactive calls
+    executor = get_executor(current_app.config['BATCH_GEMINI_MAX_CONCURRENCY'], 'gemini-batch', client.scheduler)
+    max_in_flight = current_app.config['BATCH_MAX_CONCURRENCY']
+    batch_executor = get_executor(max_in_flight, name='batch')
+
+    try:
+        client.check_capacity(BATCH)
+        extracted_resume_data = extract_resume(model, raw_resume_text, cache,
+                                               current_app.config['LOCAL_PARSER_MIN_CONFIDENCE'])
+    except ExtractionError as e:
+        current_app.logger.error(f"Failed to parse JSON from Gemini resume extraction: {e}. Raw response: {e.raw_text}")
+        return jsonify({"error": "AI failed to extract structured resume data correctly. Please try a different resume or provide clearer text."}), 500
+    except (CircuitOpenError, SchedulerOverloaded) as e:
+        return _unavailable(e)
     except Exception as e:
         current_app.logger.error(f"Gemini API or processing error: {str(e)}")
         return jsonify({"error": f"AI processing failed: {str(e)}"}), 500
 
+    results = run_batch(model, extracted_resume_data, [jd['text'] for jd in jds],
+                        executor, batch_executor, max_in_flight, cache, options)
+
+    def entries():
+        for index, tailored, errors, stats in results:
+            for section, error in errors.items():
+                current_app.logger.error(f"Gemini tailoring call for {section} (JD {index}) failed: {error}")
+            entry = _batch_entry(jds[index], index, tailored, errors, stats)
+            if entry["status"] != "error":
+                entry["result_id"] = save_result(current_app.extensions['result_store'],
+                                                 {"extracted_resume_data": extracted_resume_data, **tailored},
+                                                 raw_resume_text, jds[index]['text'], options)
+            yield entry
+
+    if data.get('stream'):
+        def generate():
+            yield json.dumps({"type": "extracted_resume_data", "extracted_resume_data": extracted_resume_data}) + "\n"
+            counts = {"ok": 0, "partial": 0, "error": 0}
+            for entry in entries():
+                counts[entry["status"]] += 1
+                yield json.dumps({"type": "result", **entry}) + "\n"
+            yield json.dumps({"type": "done", "counts": counts}) + "\n"
+
+        return Response(stream_with_request_id(generate()), mimetype='application/x-ndjson')
+
+    batch = sorted(entries(), key=lambda entry: entry["index"])
+    counts = {status: sum(1 for entry in batch if entry["status"] == status) for status in ("ok", "partial", "error")}
     return jsonify({
-        "message": "Resume improvement generated successfully!",
+        "message": "Batch resume improvement completed.",
         "extracted_resume_data": extracted_resume_data,
-        "improved_summary": improved_summary,
-        "improved_bullets": improved_bullets,
-        "suggested_skills": suggested_skills,
-        "match_analysis": match_analysis_text
-    }), 200
\ No newline at end of file
+        "results": batch,
+        "counts": counts,
+    }), 200
+
+
+@improve_bp.route('/match', methods=['POST'])
+def match_keywords():
+    """
+    Local ATS-style keyword match, no Gemini call. Takes raw "resume_text" or
+    "extracted_resume_data", and either one "jd_text" or a list of "jd_texts" for pre-screening.
+    """
+    data = request.get_json()
+    resume_text = data.get('resume_text')
+    if not resume_text and data.get('extracted_resume_data'):
+        resume_text = resume_text_from_extracted(data['extracted_resume_data'])
+    jd_texts = data.get('jd_texts')
+
+    if not resume_text or not (data.get('jd_text') or jd_texts):
+        return jsonify({"error": "Resume and Job Description text are required"}), 400
+
+    if jd_texts:
+        return jsonify({"results": [match_resume(resume_text, jd_text) for jd_text in jd_texts]}), 200
+    return jsonify(match_resume(resume_text, data['jd_text'])), 200
+
+
+@improve_bp.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(current_app.extensions['llm_cache'].stats()), 200
+
+
+@improve_bp.route('/llm/stats', methods=['GET'])
+def llm_stats():
+    model = current_app.extensions.get('llm_client')
+    return jsonify(model.stats() if model is not None else {}), 200
@@ -0,0 +1,75 @@
+# backend/blueprints/jobs.py
+
+from flask import Blueprint, request, jsonify, current_app, url_for
+
+from blueprints.improve import MATCH_MODES, PIPELINE_MODES, improve_inputs, improve_result
+from services.jobs import IdempotencyConflict, JobQueueFull, UnsafeWebhookURL, build_job_queue, public_job
+
+# Request fields passed through to the improve pipeline
+JOB_FIELDS = ('resume_text', 'jd_text', 'mode', 'match_mode', 'previous_result_id', 'extracted_resume_data')
+
+jobs_bp = Blueprint('jobs', __name__)
+
+
+def start_job_queue(app):
+    """Create the app's job queue and start its background workers."""
+    def runner(payload):
+        with app.app_context():
+            return improve_result(payload)
+
+    return build_job_queue(app.config, runner).start()
+
+
+@jobs_bp.route('/', methods=['POST'])
+@jobs_bp.route('', methods=['POST'])
+def submit_job():
+    """
+    Queue an improve request (same body as /api/improve) and return its job ID at once.
+    An "Idempotency-Key" header makes retried submissions return the original job, and an
+    optional "webhook_url" receives the finished job as a JSON POST (public hosts only, or
+    those in JOB_WEBHOOK_ALLOWED_HOSTS).
+    """
+    data = request.get_json()
+    # Same inputs as /api/improve; an incremental job may send only what changed
+    _, _, _, error = improve_inputs(data)
+    if error:
+        body, status = error
+        return jsonify(body), status
+    if data.get('mode') and data['mode'] not in PIPELINE_MODES:
+        return jsonify({"error": f"Unsupported pipeline mode. Use one of: {', '.join(PIPELINE_MODES)}."}), 400
+    if data.get('match_mode') and data['match_mode'] not in MATCH_MODES:
+        return jsonify({"error": f"Unsupported match mode. Use one of: {', '.join(MATCH_MODES)}."}), 400
+
+    webhook_url = data.get('webhook_url')
+    if webhook_url:
+        try:
+            current_app.extensions['job_queue'].check_webhook(webhook_url)
+        except UnsafeWebhookURL as e:
+            return jsonify({"error": str(e)}), 400
+
+    payload = {field: data[field] for field in JOB_FIELDS if data.get(field)}
+    idempotency_key = request.headers.get('Idempotency-Key') or data.get('idempotency_key')
+
+    try:
+        job, created = current_app.extensions['job_queue'].submit(payload, idempotency_key, webhook_url)
+    except IdempotencyConflict as e:
+        return jsonify({"error": str(e)}), 409
+    except JobQueueFull as e:
+        response = jsonify({"error": str(e)})
+        response.headers['Retry-After'] = str(int(e.retry_after + 0.5))
+        return response, 429
+    except Exception as e:
+        current_app.logger.error(f"Failed to queue improve job: {str(e)}")
+        return jsonify({"error": f"Failed to queue job: {str(e)}"}), 500
+
+    response = jsonify(public_job(job))
+    response.headers['Location'] = url_for('jobs.get_job', job_id=job['id'])
+    return response, 202 if created else 200
+
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = current_app.extensions['job_queue'].get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found (it may have expired)."}), 404
+    return jsonify(public_job(job)), 200
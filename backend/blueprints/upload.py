@@ -1,17 +1,106 @@
 # backend/blueprints/upload.py
 
 from flask import Blueprint, request, jsonify, current_app
-from pdfminer.high_level import extract_text as extract_text_from_pdf
-from docx import Document
-import os
-import tempfile # Still useful for safe file handling, even if not parsing with pyresparser
+
+from services.extract import extract_docx_text, extract_pdf_text
+from services.metrics import UPLOAD_PARSE_SECONDS, UPLOADS, size_class
+from services.uploads import content_hash, load_upload, save_upload, valid_hash
 
 upload_bp = Blueprint('upload', __name__)
 
+
+def _extract_pdf(data):
+    """PDF text with the configured layout mode, page cap and parallelism. Returns (text, info)."""
+    config = current_app.config
+    text, pages, total_pages = extract_pdf_text(
+        data,
+        layout=config['UPLOAD_PDF_LAYOUT'],
+        max_pages=config['UPLOAD_PDF_MAX_PAGES'],
+        pool=current_app.extensions.get('extract_pool'),
+        workers=config['UPLOAD_EXTRACT_WORKERS'],
+        parallel_min_pages=config['UPLOAD_PDF_PARALLEL_MIN_PAGES'],
+    )
+    info = {"pages": pages}
+    if pages < total_pages:
+        info["truncated"] = True
+        info["total_pages"] = total_pages
+    return text, info
+
+
+def _extract_txt(data):
+    return data.decode('utf-8'), {}
+
+
+EXTRACTORS = {
+    'pdf': _extract_pdf,
+    'docx': lambda data: (extract_docx_text(data), {}),
+    'txt': _extract_txt,
+}
+
+
+def _extract_upload(data, file_type, filename):
+    """
+    The upload cache entry for these bytes, extracting them only if they have not been seen
+    before (as this file type). Returns (entry, sha256, cached).
+    """
+    cache = current_app.extensions['upload_cache']
+    digest = content_hash(data)
+    entry = load_upload(cache, digest)
+    if entry is not None and entry['file_type'] == file_type:
+        UPLOADS.labels(file_type, 'cache').inc()
+        return entry, digest, True
+    with UPLOAD_PARSE_SECONDS.labels(file_type, size_class(len(data))).time():
+        text, info = EXTRACTORS[file_type](data)
+    UPLOADS.labels(file_type, 'parsed').inc()
+    entry = {"file_type": file_type, "filename": filename, "text": text, **info}
+    save_upload(cache, digest, entry)
+    return entry, digest, False
+
+
+def _requested_upload(file_types):
+    """
+    A previous upload referenced by "sha256" (form field or JSON body) instead of a file.
+    Returns (entry, sha256, error response); all None when no hash was sent.
+    """
+    digest = request.form.get('sha256') or (request.get_json(silent=True) or {}).get('sha256')
+    if not digest:
+        return None, None, None
+    digest = str(digest).lower()
+    if not valid_hash(digest):
+        return None, None, (jsonify({"error": "sha256 must be a hex SHA-256 digest."}), 400)
+    entry = load_upload(current_app.extensions['upload_cache'], digest)
+    if entry is None:
+        return None, None, (jsonify({"error": "No upload with this sha256 (it may have expired). Please upload the file."}), 404)
+    if entry['file_type'] not in file_types:
+        return None, None, (jsonify({"error": f"This upload is a {entry['file_type'].upper()} file, which is not supported here."}), 400)
+    UPLOADS.labels(entry['file_type'], 'reference').inc()
+    return entry, digest, None
+
+
+def _info(entry):
+    return {field: value for field, value in entry.items() if field not in ('file_type', 'filename', 'text')}
+
+
 @upload_bp.route('/resume', methods=['POST'])
 def upload_resume():
+    """
+    Extract the text of a PDF or DOCX resume. The response includes the file's "sha256";
+    posting {"sha256": ...} instead of a file returns the same extraction without re-uploading.
+    """
     if 'file' not in request.files:
-        return jsonify({"error": "No file part"}), 400
+        entry, digest, error = _requested_upload(('pdf', 'docx'))
+        if error:
+            return error
+        if entry is None:
+            return jsonify({"error": "No file part"}), 400
+        return jsonify({
+            "message": "Resume text loaded from a previous upload.",
+            "filename": entry['filename'],
+            "extracted_text": entry['text'],
+            "sha256": digest,
+            "cached": True,
+            **_info(entry),
+        }), 200
     file = request.files['file']
     if file.filename == '':
         return jsonify({"error": "No selected file"}), 400
@@ -19,44 +108,46 @@ def upload_resume():
     if file:
         filename = file.filename
         file_extension = filename.split('.')[-1].lower()
+        if file_extension not in ('pdf', 'docx'):
+            return jsonify({"error": "Unsupported file type. Please upload PDF or DOCX."}), 400
 
-        text_content = ""
-        # Create a temporary file to save the uploaded resume for robust extraction
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_filepath = os.path.join(temp_dir, filename)
-            file.save(temp_filepath) # Save the uploaded file temporarily
-
-            try:
-                if file_extension == 'pdf':
-                    with open(temp_filepath, 'rb') as f:
-                        text_content = extract_text_from_pdf(f)
-                elif file_extension == 'docx':
-                    document = Document(temp_filepath)
-                    for paragraph in document.paragraphs:
-                        text_content += paragraph.text + "\n"
-                else:
-                    return jsonify({"error": "Unsupported file type. Please upload PDF or DOCX."}), 400
-
-            except Exception as e:
-                current_app.logger.error(f"Error extracting text from resume: {str(e)}")
-                return jsonify({"error": f"Error processing resume: {str(e)}"}), 500
+        # Extract straight from the uploaded bytes (nothing is written to disk), or reuse the
+        # text of an earlier upload of the same file
+        try:
+            entry, digest, cached = _extract_upload(file.read(), file_extension, filename)
+        except Exception as e:
+            current_app.logger.error(f"Error extracting text from resume: {str(e)}")
+            return jsonify({"error": f"Error processing resume: {str(e)}"}), 500
 
         # Now, instead of 'parsed_data', we return just the raw extracted text.
         return jsonify({
             "message": "Resume uploaded and text extracted successfully!",
             "filename": filename,
-            "extracted_text": text_content # Raw text for Gemini to parse and improve
+            "extracted_text": entry['text'], # Raw text for Gemini to parse and improve
+            "sha256": digest,
+            "cached": cached,
+            **_info(entry),
         }), 200
     return jsonify({"error": "Something went wrong"}), 500
 
 
 @upload_bp.route('/jd', methods=['POST'])
 def upload_jd():
-    if 'file' not in request.files and 'text' not in request.form:
+    """
+    Extract a PDF or TXT job description, or take pasted "text". File uploads return their
+    "sha256", which can be posted later instead of the file.
+    """
+    entry, digest, error = None, None, None
+    if 'file' not in request.files:
+        entry, digest, error = _requested_upload(('pdf', 'txt'))
+        if error:
+            return error
+    if 'file' not in request.files and 'text' not in request.form and entry is None:
         return jsonify({"error": "No file or text provided"}), 400
 
     jd_content = ""
     filename = "pasted_text" # Default for pasted text
+    info = {}
 
     if 'file' in request.files:
         file = request.files['file']
@@ -66,20 +157,19 @@ def upload_jd():
         filename = file.filename
         file_extension = filename.split('.')[-1].lower()
 
-        if file_extension == 'pdf':
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_filepath = os.path.join(temp_dir, filename)
-                file.save(temp_filepath)
-                try:
-                    with open(temp_filepath, 'rb') as f:
-                        jd_content = extract_text_from_pdf(f)
-                except Exception as e:
-                    current_app.logger.error(f"Error parsing PDF JD: {str(e)}")
-                    return jsonify({"error": f"Error parsing PDF: {str(e)}"}), 500
-        elif file_extension == 'txt':
-            jd_content = file.stream.read().decode('utf-8')
-        else:
+        if file_extension not in ('pdf', 'txt'):
             return jsonify({"error": "Unsupported file type for JD. Please upload PDF or TXT."}), 400
+        try:
+            entry, digest, cached = _extract_upload(file.read(), file_extension, filename)
+        except Exception as e:
+            current_app.logger.error(f"Error parsing {file_extension.upper()} JD: {str(e)}")
+            return jsonify({"error": f"Error parsing {file_extension.upper()}: {str(e)}"}), 500
+        jd_content = entry['text']
+        info = {**_info(entry), "sha256": digest, "cached": cached}
+    elif entry is not None:
+        jd_content = entry['text']
+        filename = entry['filename']
+        info = {**_info(entry), "sha256": digest, "cached": True}
     elif 'text' in request.form:
         jd_content = request.form['text']
 
@@ -87,6 +177,7 @@ def upload_jd():
         return jsonify({
             "message": "Job Description uploaded/pasted and processed successfully!",
             "content": jd_content, # Full content for Gemini
-            "filename": filename
+            "filename": filename,
+            **info,
         }), 200
-    return jsonify({"error": "Something went wrong"}), 500
\ No newline at end of file
+    return jsonify({"error": "Something went wrong"}), 500
@@ -6,11 +6,136 @@ class Config:
     """Base configuration."""
     # SECRET_KEY = os.environ.get('SECRET_KEY') or 'your_super_secret_key_change_this_in_production'
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
+    GEMINI_MODEL = os.environ.get('GEMINI_MODEL', 'gemini-2.5-flash')
     MONGO_URI = os.environ.get('MONGO_URI') or 'mongodb://localhost:27017/resume_improver_db'
+    # Shared Gemini client (services/llm.py). LLM_BACKEND='fake' swaps in an offline backend
+    # with canned responses, configurable latency and an injected error rate.
+    LLM_BACKEND = os.environ.get('LLM_BACKEND', 'gemini')
+    FAKE_LLM_LATENCY_SECONDS = float(os.environ.get('FAKE_LLM_LATENCY_SECONDS', 0.0))
+    # Latency per fake call: 'fixed', 'uniform', 'exponential' or 'lognormal' around the mean above
+    FAKE_LLM_LATENCY_DISTRIBUTION = os.environ.get('FAKE_LLM_LATENCY_DISTRIBUTION', 'fixed')
+    FAKE_LLM_LATENCY_SIGMA = float(os.environ.get('FAKE_LLM_LATENCY_SIGMA', 0.5))
+    FAKE_LLM_ERROR_RATE = float(os.environ.get('FAKE_LLM_ERROR_RATE', 0.0))
+    # JSON file of {prompt substring: response} overriding the built-in canned responses
+    FAKE_LLM_RESPONSES_PATH = os.environ.get('FAKE_LLM_RESPONSES_PATH')
+    LLM_TIMEOUT_SECONDS = float(os.environ.get('LLM_TIMEOUT_SECONDS', 60))
+    LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', 3))
+    LLM_BACKOFF_BASE_SECONDS = float(os.environ.get('LLM_BACKOFF_BASE_SECONDS', 0.5))
+    LLM_BACKOFF_MAX_SECONDS = float(os.environ.get('LLM_BACKOFF_MAX_SECONDS', 8))
+    # Send a duplicate request when a call is slower than this; 0 disables hedging
+    LLM_HEDGE_AFTER_SECONDS = float(os.environ.get('LLM_HEDGE_AFTER_SECONDS', 0))
+    # Fail fast for LLM_BREAKER_RESET_SECONDS after this many consecutive failed calls
+    LLM_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('LLM_BREAKER_FAILURE_THRESHOLD', 5))
+    LLM_BREAKER_RESET_SECONDS = float(os.environ.get('LLM_BREAKER_RESET_SECONDS', 30))
+    # Gemini quota shared by the whole process (0 disables that limit). Token usage is estimated
+    # as prompt length / 4 plus LLM_OUTPUT_TOKENS_ESTIMATE per call.
+    LLM_REQUESTS_PER_MINUTE = int(os.environ.get('LLM_REQUESTS_PER_MINUTE', 1000))
+    LLM_TOKENS_PER_MINUTE = int(os.environ.get('LLM_TOKENS_PER_MINUTE', 1000000))
+    LLM_OUTPUT_TOKENS_ESTIMATE = int(os.environ.get('LLM_OUTPUT_TOKENS_ESTIMATE', 512))
+    # Calls waiting for quota beyond these depths are rejected with 429; batch work hits its limit first
+    LLM_MAX_QUEUE_DEPTH = int(os.environ.get('LLM_MAX_QUEUE_DEPTH', 64))
+    LLM_MAX_BATCH_QUEUE_DEPTH = int(os.environ.get('LLM_MAX_BATCH_QUEUE_DEPTH', 32))
+
+    # Upper bound on Gemini calls in flight at once across the process (tailoring fan-out pool size)
+    GEMINI_MAX_CONCURRENCY = int(os.environ.get('GEMINI_MAX_CONCURRENCY', 8))
+    # Separate pool for batch tailoring calls (/api/improve/batch), so batches never hold up the one above
+    BATCH_GEMINI_MAX_CONCURRENCY = int(os.environ.get('BATCH_GEMINI_MAX_CONCURRENCY', 4))
+    # 'multi' runs extraction then four tailoring prompts; 'consolidated' asks for everything in one
+    # schema-constrained call. Requests can override this with a "mode" field.
+    IMPROVE_PIPELINE_MODE = os.environ.get('IMPROVE_PIPELINE_MODE', 'multi')
+    # The rule-based resume parser is tried before Gemini extraction; its result is used when its
+    # confidence (0-1) reaches this threshold. Set above 1 to always extract with Gemini.
+    LOCAL_PARSER_MIN_CONFIDENCE = float(os.environ.get('LOCAL_PARSER_MIN_CONFIDENCE', 0.8))
+    # 'llm' asks Gemini for the match analysis; 'local' uses the keyword matcher (no Gemini call).
+    # Requests can override this with a "match_mode" field.
+    MATCH_ANALYSIS_MODE = os.environ.get('MATCH_ANALYSIS_MODE', 'llm')
+    # Opt-in: only the K experience bullets most similar to the JD are sent for rewriting (0, the
+    # default, rewrites all); bullets below the cosine-similarity cutoff are never rewritten. The
+    # rest pass through unchanged.
+    BULLET_RANK_TOP_K = int(os.environ.get('BULLET_RANK_TOP_K', 0))
+    BULLET_RANK_MIN_SIMILARITY = float(os.environ.get('BULLET_RANK_MIN_SIMILARITY', 0.0))
+    # JDs are compacted before they go into prompts: boilerplate sections (about us, benefits, EEO),
+    # repeated lines and extra whitespace are removed. With a budget, the JD is also cut so each
+    # prompt stays within about that many tokens, least relevant lines first (0: no budget). The JD
+    # always keeps a quarter of the budget, so prompts for very long resumes can go over it.
+    JD_COMPACTION = os.environ.get('JD_COMPACTION', 'true').lower() in ('1', 'true', 'yes')
+    PROMPT_TOKEN_BUDGET = int(os.environ.get('PROMPT_TOKEN_BUDGET', 4000))
+    # Batch matching (/api/improve/batch): JDs tailored at once, and the largest accepted batch
+    BATCH_MAX_CONCURRENCY = int(os.environ.get('BATCH_MAX_CONCURRENCY', 4))
+    BATCH_MAX_JDS = int(os.environ.get('BATCH_MAX_JDS', 100))
+
+    # Cache of Gemini extraction/tailoring results, keyed by a hash of the prompt inputs
+    LLM_CACHE_MAX_ENTRIES = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 2048))
+    LLM_CACHE_MAX_BYTES = int(os.environ.get('LLM_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    LLM_CACHE_TTL_SECONDS = int(os.environ.get('LLM_CACHE_TTL_SECONDS', 24 * 60 * 60))
+    # Set to a file path to keep cached results across restarts and share them between workers
+    LLM_CACHE_SQLITE_PATH = os.environ.get('LLM_CACHE_SQLITE_PATH')
+
+    # Asynchronous improve jobs (/api/jobs). JOB_STORE is 'mongo' (the MONGO_URI database),
+    # 'sqlite' (JOB_SQLITE_PATH) or 'mongomock' for in-memory local runs.
+    JOB_STORE = os.environ.get('JOB_STORE', 'mongo')
+    JOB_SQLITE_PATH = os.environ.get('JOB_SQLITE_PATH', 'jobs.sqlite3')
+    JOB_MAX_WORKERS = int(os.environ.get('JOB_MAX_WORKERS', 4))
+    # New jobs are rejected with 429 while this many are queued or running
+    JOB_MAX_PENDING = int(os.environ.get('JOB_MAX_PENDING', 500))
+    # Running jobs whose worker stops renewing the lease for this long are requeued (crash recovery)
+    JOB_LEASE_SECONDS = int(os.environ.get('JOB_LEASE_SECONDS', 60))
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+    # Finished jobs and their results are deleted after this long
+    JOB_TTL_SECONDS = int(os.environ.get('JOB_TTL_SECONDS', 24 * 60 * 60))
+    JOB_WEBHOOK_TIMEOUT_SECONDS = float(os.environ.get('JOB_WEBHOOK_TIMEOUT_SECONDS', 10))
+    JOB_WEBHOOK_RETRIES = int(os.environ.get('JOB_WEBHOOK_RETRIES', 3))
+    # Comma-separated hosts (subdomains included) webhooks may call. When empty, any host that
+    # resolves only to public addresses is allowed; loopback, private and link-local never are.
+    JOB_WEBHOOK_ALLOWED_HOSTS = [host.strip().lower() for host in os.environ.get('JOB_WEBHOOK_ALLOWED_HOSTS', '').split(',')
+                                 if host.strip()]
+
+    # Improve results kept server-side so /api/export can take a result_id. RESULT_STORE is
+    # 'mongo' (MONGO_URI), 'sqlite' (RESULT_SQLITE_PATH), 'mongomock' or 'memory', always
+    # fronted by an in-process LRU.
+    RESULT_STORE = os.environ.get('RESULT_STORE', 'mongo')
+    RESULT_SQLITE_PATH = os.environ.get('RESULT_SQLITE_PATH', 'results.sqlite3')
+    RESULT_TTL_SECONDS = int(os.environ.get('RESULT_TTL_SECONDS', 7 * 24 * 60 * 60))
+    RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('RESULT_CACHE_MAX_ENTRIES', 1024))
+    RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+
+    # Rendered DOCX/PDF bytes keyed by a hash of (format, template, content); LRU by total size
+    EXPORT_CACHE_MAX_ENTRIES = int(os.environ.get('EXPORT_CACHE_MAX_ENTRIES', 512))
+    EXPORT_CACHE_MAX_BYTES = int(os.environ.get('EXPORT_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    EXPORT_CACHE_TTL_SECONDS = int(os.environ.get('EXPORT_CACHE_TTL_SECONDS', 60 * 60))
+    # Processes for CPU-bound DOCX/PDF rendering (0 renders in the request thread only); added to
+    # UPLOAD_EXTRACT_WORKERS to size the one process pool both share
+    EXPORT_RENDER_WORKERS = int(os.environ.get('EXPORT_RENDER_WORKERS', 2))
+    # Start rendering these formats in the background as soon as an improve result is ready;
+    # a pre-render not exported within EXPORT_CACHE_TTL_SECONDS counts as wasted
+    EXPORT_PRERENDER = os.environ.get('EXPORT_PRERENDER', 'false').lower() in ('1', 'true', 'yes')
+    EXPORT_PRERENDER_FORMATS = os.environ.get('EXPORT_PRERENDER_FORMATS', 'docx,pdf').split(',')
+    # Requests (uploads and JSON bodies) larger than this are rejected with 413 before the body is read
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 10 * 1024 * 1024))
+    # PDF text extraction: 'accurate' (pdfminer's default layout analysis) or 'fast'; only the
+    # first UPLOAD_PDF_MAX_PAGES pages are read (0 for all), and PDFs with at least
+    # UPLOAD_PDF_PARALLEL_MIN_PAGES pages are split across UPLOAD_EXTRACT_WORKERS processes
+    UPLOAD_PDF_LAYOUT = os.environ.get('UPLOAD_PDF_LAYOUT', 'accurate')
+    UPLOAD_PDF_MAX_PAGES = int(os.environ.get('UPLOAD_PDF_MAX_PAGES', 20))
+    UPLOAD_PDF_PARALLEL_MIN_PAGES = int(os.environ.get('UPLOAD_PDF_PARALLEL_MIN_PAGES', 8))
+    UPLOAD_EXTRACT_WORKERS = int(os.environ.get('UPLOAD_EXTRACT_WORKERS', 2))
+    # Extracted upload text keyed by the SHA-256 of the file, so re-uploads skip parsing and
+    # clients can send {"sha256": ...} instead of the file. LRU by entries and total size; set
+    # UPLOAD_CACHE_SQLITE_PATH to also keep entries on disk across restarts.
+    UPLOAD_CACHE_MAX_ENTRIES = int(os.environ.get('UPLOAD_CACHE_MAX_ENTRIES', 1024))
+    UPLOAD_CACHE_MAX_BYTES = int(os.environ.get('UPLOAD_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    UPLOAD_CACHE_TTL_SECONDS = int(os.environ.get('UPLOAD_CACHE_TTL_SECONDS', 7 * 24 * 60 * 60))
+    UPLOAD_CACHE_SQLITE_PATH = os.environ.get('UPLOAD_CACHE_SQLITE_PATH')
+
+    # Largest /api/export/batch request, counted as items x formats x templates
+    EXPORT_BATCH_MAX_FILES = int(os.environ.get('EXPORT_BATCH_MAX_FILES', 300))
 
 class DevelopmentConfig(Config):
     """Development configuration."""
     DEBUG = True
+    # No MongoDB needed locally
+    JOB_STORE = os.environ.get('JOB_STORE', 'sqlite')
+    RESULT_STORE = os.environ.get('RESULT_STORE', 'sqlite')
     # CORS will be handled by Flask-CORS extension in app.py
     # CORS_HEADERS = 'Content-Type' # This line is no longer strictly needed if using Flask-CORS with default setup
 
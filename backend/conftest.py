@@ -0,0 +1,5 @@
+# backend/conftest.py
+
+# Puts backend/ on sys.path (pytest's rootdir-relative import of this file), so the tests'
+# `services`, `config` and `benchmarks` imports resolve however pytest is started, e.g.
+# `python -m pytest backend/tests` from the repository root.
@@ -0,0 +1,257 @@
+# backend/services/cache.py
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+# Returned by get() when a key is absent or expired (cached values may legitimately be '' or []).
+MISS = object()
+
+
+def _normalize(part):
+    if isinstance(part, str):
+        return re.sub(r'\s+', ' ', part).strip()
+    if isinstance(part, (list, tuple)):
+        return [_normalize(p) for p in part]
+    if isinstance(part, dict):
+        return {k: _normalize(v) for k, v in part.items()}
+    return part
+
+
+def cache_key(namespace, *parts):
+    """Content-addressed key: SHA-256 of the whitespace-normalized inputs."""
+    payload = json.dumps([namespace, _normalize(list(parts))], sort_keys=True, ensure_ascii=False)
+    return f"{namespace}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+def approx_size(value):
+    """Rough in-memory footprint used for byte-based eviction."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    return len(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+
+
+class LRUCache:
+    """Thread-safe in-process LRU with a per-entry TTL and entry-count / byte-size eviction."""
+
+    def __init__(self, max_entries=1024, ttl=3600, max_bytes=None, sizeof=approx_size):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._data = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=MISS):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at, size = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        size = self.sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # Would evict everything else and still not fit
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+            while self._data and (len(self._data) > self.max_entries
+                                  or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def _remove(self, key):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._data),
+                "bytes": self._bytes,
+            }
+
+
+class SQLiteCache:
+    """Persistent JSON-value cache in a local sqlite file, shared across workers and restarts."""
+
+    def __init__(self, path, ttl=86400, max_entries=100000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, expires_at REAL)"
+        )
+        self._conn.commit()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=MISS):
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None or (row[1] is not None and row[1] < time.time()):
+                self.misses += 1
+                return default
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now + ttl if ttl else None),
+            )
+            self._writes += 1
+            # Prune expired rows and enforce the size cap every so often rather than on every write
+            if self._writes % 100 == 0:
+                self._conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN ("
+                    " SELECT key FROM cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+
+class MongoCache:
+    """Persistent JSON-value cache in a MongoDB collection; a TTL index removes expired documents."""
+
+    def __init__(self, collection, ttl=86400):
+        self._docs = collection
+        self.ttl = ttl
+        self._docs.create_index('expires_at', expireAfterSeconds=0)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _now():
+        # pymongo stores and returns naive UTC datetimes
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
+    def get(self, key, default=MISS):
+        document = self._docs.find_one({'_id': key})
+        # The TTL monitor only runs once a minute, so check expiry here too
+        if document is None or (document.get('expires_at') and document['expires_at'] < self._now()):
+            self.misses += 1
+            return default
+        self.hits += 1
+        return document['value']
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        now = self._now()
+        self._docs.replace_one(
+            {'_id': key},
+            {'_id': key, 'value': value, 'created_at': now, 'expires_at': now + timedelta(seconds=ttl) if ttl else None},
+            upsert=True,
+        )
+
+    def delete(self, key):
+        self._docs.delete_one({'_id': key})
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": self._docs.estimated_document_count()}
+
+
+class TieredCache:
+    """In-process LRU in front of an optional persistent tier; persistent hits are promoted."""
+
+    def __init__(self, memory, persistent=None):
+        self.memory = memory
+        self.persistent = persistent
+
+    def get(self, key, default=MISS):
+        value = self.memory.get(key)
+        if value is not MISS:
+            return value
+        if self.persistent is not None:
+            value = self.persistent.get(key)
+            if value is not MISS:
+                self.memory.set(key, value)
+                return value
+        return default
+
+    def set(self, key, value, ttl=None):
+        self.memory.set(key, value, ttl)
+        if self.persistent is not None:
+            self.persistent.set(key, value, ttl)
+
+    def delete(self, key):
+        self.memory.delete(key)
+        if self.persistent is not None:
+            self.persistent.delete(key)
+
+    def stats(self):
+        stats = {"memory": self.memory.stats()}
+        if self.persistent is not None:
+            stats["persistent"] = self.persistent.stats()
+        return stats
+
+
+def build_llm_cache(config):
+    """Create the Gemini result cache described by the app config."""
+    memory = LRUCache(
+        max_entries=config['LLM_CACHE_MAX_ENTRIES'],
+        ttl=config['LLM_CACHE_TTL_SECONDS'],
+        max_bytes=config['LLM_CACHE_MAX_BYTES'],
+    )
+    persistent = None
+    if config.get('LLM_CACHE_SQLITE_PATH'):
+        persistent = SQLiteCache(config['LLM_CACHE_SQLITE_PATH'], ttl=config['LLM_CACHE_TTL_SECONDS'])
+    return TieredCache(memory, persistent)
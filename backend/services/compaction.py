@@ -0,0 +1,161 @@
+# backend/services/compaction.py
+
+# Prompt compaction. Every tailoring prompt carries the whole job description, and postings
+# pad the requirements with company boilerplate (about us, benefits, EEO statements), copied
+# blocks and stray whitespace. compact_jd() strips those once per JD text (memoized, so the
+# four prompts of a request, and a batch of them, share the work), and fit_jd() cuts the
+# compacted JD to a prompt's token budget, dropping the least useful lines first.
+
+import logging
+import re
+from functools import lru_cache
+
+from services.ranking import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Headings of sections that say nothing about the job itself
+_BOILERPLATE_HEADING = re.compile(
+    r"^(about (us|the company|the organi[sz]ation|(?!the |our |this |you)[A-Z][\w&.'-]*( [A-Z][\w&.'-]*)*)"
+    r"|who we are|our (company|story|mission|values|culture)|life at .*|why (join|work)( .*)?"
+    r"|.*\b(benefits|perks)\b.*|what we offer|we offer|compensation|salary( range)?|pay range"
+    r"|equal (employment )?opportunit.*|eeo.*|diversity.*|accommodations?|privacy.*|how to apply)$",
+    re.IGNORECASE)
+# Boilerplate sentences that also show up inside other sections
+_BOILERPLATE_LINE = re.compile(
+    r'equal opportunity employer|regardless of (race|color|religion|sex|gender|age)|without regard to (race|color)'
+    r'|reasonable accommodation|e-verify', re.IGNORECASE)
+# Sections whose lines are kept longest when a JD has to be cut to a budget
+_CORE_HEADING = re.compile(
+    r'requirement|qualification|responsibilit|what you.?ll (do|bring|need)|you have|must have|skills|experience'
+    r'|key duties|the role|what we.?re looking for', re.IGNORECASE)
+_BULLET = re.compile(r'^([-*•·▪◦]|\d+[.)])\s*')
+
+# Part of the tailoring cache key: bump it whenever the rules above change what prompts contain,
+# so tailoring made from differently compacted JDs is not served from the cache
+COMPACTION_VERSION = 1
+
+# Share of a prompt's token budget the JD keeps however long the rest of the prompt is, so a long
+# resume cannot cut the JD down to its title and leave nothing to tailor against
+MIN_JD_SHARE = 0.25
+
+# Line priorities for fit_jd: the lowest go first
+_CONTEXT, _CORE, _KEEP = 1, 2, 3
+
+
+def compact_whitespace(text):
+    """`text` with runs of spaces collapsed, lines trimmed and blank lines squeezed to one."""
+    lines = [' '.join(line.split()) for line in (text or '').splitlines()]
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip()
+
+
+def _heading_text(line):
+    return _BULLET.sub('', line).strip('#*_ ').rstrip(':?').strip()
+
+
+def _is_heading(line, after_blank):
+    if not line or len(line) > 60:
+        return False
+    if line.rstrip('*_ ').endswith(':'):
+        return True
+    text = _heading_text(line)
+    return (after_blank and not _BULLET.match(line) and 0 < len(text.split()) <= 6
+            and text[-1] not in '.!,;')
+
+
+def _lines(jd_text):
+    """(line, is_heading) pairs of the whitespace-compacted JD."""
+    previous = ''
+    for line in compact_whitespace(jd_text).split('\n'):
+        yield line, _is_heading(line, not previous)
+        previous = line
+
+
+@lru_cache(maxsize=256)
+def compact_jd(jd_text):
+    """
+    The JD without boilerplate sections and sentences, repeated lines or extra whitespace.
+    Memoized by text, so it is computed once however many prompts include the JD.
+    """
+    kept, seen = [], set()
+    skipping = False
+    for line, heading in _lines(jd_text):
+        if heading:
+            skipping = bool(_BOILERPLATE_HEADING.match(_heading_text(line)))
+            if skipping:
+                continue
+        if skipping or _BOILERPLATE_LINE.search(line):
+            continue
+        if line and not heading:
+            normalized = _BULLET.sub('', line).lower()
+            if normalized in seen:
+                continue
+            seen.add(normalized)
+        kept.append(line)
+    return compact_whitespace('\n'.join(kept))
+
+
+def _priorities(lines):
+    priorities = []
+    core = False
+    for index, (line, heading) in enumerate(lines):
+        if heading:
+            core = bool(_CORE_HEADING.search(line))
+        if index == 0 or heading or not line:
+            priorities.append(_KEEP)  # The title, headings and spacing; headings left empty are removed below
+        else:
+            priorities.append(_CORE if core else _CONTEXT)
+    return priorities
+
+
+def fit_jd(jd_text, max_tokens):
+    """
+    Cut `jd_text` to about `max_tokens`: context lines go first, then requirement and
+    responsibility lines, later lines before earlier ones; the title and headings stay.
+    """
+    if estimate_tokens(jd_text) <= max_tokens:
+        return jd_text
+    lines = list(_lines(jd_text))
+    priorities = _priorities(lines)
+    dropped = set()
+    tokens = estimate_tokens(jd_text)
+    for index in sorted(range(len(lines)), key=lambda i: (priorities[i], -i)):
+        if priorities[index] == _KEEP or tokens <= max_tokens:
+            break
+        dropped.add(index)
+        tokens -= estimate_tokens(lines[index][0] + '\n')
+
+    kept = []
+    for index, (line, heading) in enumerate(lines):
+        if index in dropped:
+            continue
+        if heading and index > 0:
+            # Drop a heading whose lines were all cut
+            following = next((j for j in range(index + 1, len(lines)) if j not in dropped and lines[j][0]), None)
+            if following is None or lines[following][1]:
+                continue
+        kept.append(line)
+    return compact_whitespace('\n'.join(kept))
+
+
+def prepare_prompt(build, jd_text, compact=True, token_budget=0):
+    """
+    build(jd) with the JD compacted and, given a token budget, cut so the whole prompt fits it
+    (the rest of the prompt is never cut). The JD keeps at least MIN_JD_SHARE of the budget, so
+    a prompt whose resume part alone is near or over the budget goes out over it instead.
+    Returns (prompt, report) with the prompt's estimated tokens and the tokens saved against
+    the full JD.
+    """
+    jd = compact_jd(jd_text) if compact else jd_text
+    if token_budget:
+        jd_budget = token_budget - estimate_tokens(build(''))
+        if jd_budget < token_budget * MIN_JD_SHARE:
+            logger.warning("Prompt without the JD is %d tokens against a budget of %d; keeping %d tokens of JD",
+                           token_budget - jd_budget, token_budget, int(token_budget * MIN_JD_SHARE))
+            jd_budget = int(token_budget * MIN_JD_SHARE)
+        jd = fit_jd(jd, jd_budget)
+    prompt = build(jd)
+    return prompt, {
+        'prompt_tokens': estimate_tokens(prompt),
+        'tokens_saved': estimate_tokens(jd_text) - estimate_tokens(jd),
+    }
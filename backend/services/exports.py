@@ -0,0 +1,183 @@
+# backend/services/exports.py
+
+# Export rendering on top of services/render.py: the byte cache, a process pool for CPU-bound
+# renders, speculative pre-rendering right after an improve completes, and joining a render
+# that is already in flight instead of starting a duplicate.
+
+import logging
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from services.cache import MISS
+from services.metrics import EXPORT_RENDERS
+from services.render import DEFAULT_TEMPLATE, render_key, render_resume
+
+logger = logging.getLogger(__name__)
+
+
+def create_process_pool(max_workers):
+    """
+    Process pool for CPU-bound work (renders, PDF extraction). Workers are forked immediately,
+    so call this while the process is still single-threaded (app start-up); forking later could
+    copy locks held by other threads. Returns None if processes cannot be started, in which
+    case callers do the work in their own thread.
+    """
+    if max_workers <= 0:
+        return None
+    try:
+        pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('fork'))
+        # With the fork context every worker is started on the first submit
+        pool.submit(int).result()
+        return pool
+    except (OSError, ValueError) as e:
+        logger.warning(f"Process pool unavailable, running work in-thread: {e}")
+        return None
+
+
+class ExportRenderer:
+    """
+    Serves rendered exports from `cache`, joining in-flight renders. prerender() starts the
+    renders a user is likely to ask for next; a pre-render counts as used if an export
+    request is served from it (or joins it) and as wasted if nobody asks for it within `ttl`.
+    """
+
+    def __init__(self, cache, pool=None, prerender_formats=(), ttl=3600):
+        self.cache = cache
+        self.pool = pool
+        self.prerender_formats = tuple(prerender_formats)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> Future
+        self._unused_prerenders = OrderedDict()  # key -> time the pre-render was started
+        self.counters = {'rendered': 0, 'cache_hits': 0, 'joined': 0, 'prerenders': 0, 'prerender_failures': 0,
+                         'prerenders_used': 0, 'prerenders_wasted': 0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def _mark_used(self, key):
+        with self._lock:
+            if self._unused_prerenders.pop(key, None) is not None:
+                self.counters['prerenders_used'] += 1
+
+    def _expire_unused(self):
+        cutoff = time.monotonic() - self.ttl
+        with self._lock:
+            while self._unused_prerenders and next(iter(self._unused_prerenders.values())) < cutoff:
+                self._unused_prerenders.popitem(last=False)
+                self.counters['prerenders_wasted'] += 1
+
+    def _store(self, key, future):
+        with self._lock:
+            self._inflight.pop(key, None)
+        if future.exception() is not None:
+            self._count('prerender_failures')
+            logger.error(f"Export pre-render failed: {future.exception()}")
+            with self._lock:
+                self._unused_prerenders.pop(key, None)
+            return
+        self.cache.set(key, future.result())
+
+    def prerender(self, content, template=DEFAULT_TEMPLATE):
+        """Start background renders of `content` in each pre-render format (no-op without a pool)."""
+        if self.pool is None:
+            return
+        self._expire_unused()
+        for export_format in self.prerender_formats:
+            key = render_key(export_format, template, content)
+            with self._lock:
+                if key in self._inflight or key in self._unused_prerenders:
+                    continue
+                try:
+                    future = self.pool.submit(render_resume, export_format, template, content)
+                except Exception as e:
+                    # A broken pool must not fail the improve request that triggered the pre-render
+                    self.counters['prerender_failures'] += 1
+                    logger.error(f"Could not start export pre-render: {e}")
+                    return
+                self._inflight[key] = future
+                self._unused_prerenders[key] = time.monotonic()
+                self.counters['prerenders'] += 1
+            future.add_done_callback(lambda done, key=key: self._store(key, done))
+
+    def render(self, export_format, template, content, key=None):
+        """Rendered bytes: from the cache, by joining an in-flight render, or rendered now."""
+        key = key or render_key(export_format, template, content)
+        document = self.cache.get(key)
+        if document is not MISS:
+            self._count('cache_hits')
+            EXPORT_RENDERS.labels(export_format, 'cache').inc()
+            self._mark_used(key)
+            return document
+
+        with self._lock:
+            future = self._inflight.get(key)
+        if future is not None:
+            self._count('joined')
+            self._mark_used(key)
+            try:
+                document = future.result()
+                EXPORT_RENDERS.labels(export_format, 'joined').inc()
+                return document
+            except Exception as e:
+                # The pre-render failed; fall through and render in this thread
+                logger.warning(f"Joined export render failed, rendering again: {e}")
+
+        document = render_resume(export_format, template, content)
+        self._count('rendered')
+        EXPORT_RENDERS.labels(export_format, 'rendered').inc()
+        self.cache.set(key, document)
+        return document
+
+    def render_many(self, jobs):
+        """
+        Render (tag, format, template, content) jobs in parallel on the pool, yielding
+        (tag, bytes, error) as each finishes. Cached and in-flight renders are reused, but
+        new renders are not cached so a large batch does not flush interactive exports.
+        """
+        ready = []
+        pending = {}  # future -> tags waiting on it
+        submitted = {}  # key -> future, so duplicate jobs in the batch render once
+        for tag, export_format, template, content in jobs:
+            key = render_key(export_format, template, content)
+            document = self.cache.get(key)
+            if document is not MISS:
+                self._count('cache_hits')
+                ready.append((tag, document, None))
+                continue
+            with self._lock:
+                future = submitted.get(key) or self._inflight.get(key)
+            if future is not None:
+                self._count('joined')
+            elif self.pool is not None:
+                try:
+                    future = self.pool.submit(render_resume, export_format, template, content)
+                except Exception as e:
+                    ready.append((tag, None, e))
+                    continue
+                submitted[key] = future
+                self._count('rendered')
+            else:
+                try:
+                    ready.append((tag, render_resume(export_format, template, content), None))
+                except Exception as e:
+                    ready.append((tag, None, e))
+                self._count('rendered')
+                continue
+            pending.setdefault(future, []).append(tag)
+
+        yield from ready
+        for future in as_completed(pending):
+            error = future.exception()
+            for tag in pending[future]:
+                yield tag, None if error else future.result(), error
+
+    def stats(self):
+        self._expire_unused()
+        with self._lock:
+            return {**self.counters, 'in_flight': len(self._inflight),
+                    'prerenders_pending': len(self._unused_prerenders), 'cache': self.cache.stats()}
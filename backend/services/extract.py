@@ -0,0 +1,147 @@
+# backend/services/extract.py
+
+# Text extraction from uploaded resumes and JDs, straight from the in-memory upload (no temp
+# files). Long PDFs are split into page ranges that are extracted in parallel on a process
+# pool and stitched back together in page order. DOCX files are read by streaming their XML
+# parts out of the zip rather than building python-docx's object model.
+
+import io
+import re
+import zipfile
+from xml.etree import ElementTree
+
+from pdfminer.high_level import extract_text
+from pdfminer.layout import LAParams
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+
+# 'accurate' is pdfminer's default layout analysis. 'fast' skips the hierarchical text-box
+# grouping (boxes_flow=None) and vertical-text detection, which dominate extraction time on
+# dense pages; reading order is still top-to-bottom, left-to-right within each column.
+LAYOUTS = {
+    'accurate': LAParams(),
+    'fast': LAParams(line_margin=0.5, char_margin=2.0, word_margin=0.1, boxes_flow=None,
+                     detect_vertical=False, all_texts=False),
+}
+
+
+def count_pdf_pages(data):
+    document = PDFDocument(PDFParser(io.BytesIO(data)))
+    return sum(1 for _ in PDFPage.create_pages(document))
+
+
+def extract_pdf_pages(data, page_numbers, layout='accurate'):
+    """Text of the given zero-based pages. Top-level so it can run in a worker process."""
+    return extract_text(io.BytesIO(data), page_numbers=page_numbers, laparams=LAYOUTS[layout])
+
+
+def extract_pdf_text(data, layout='accurate', max_pages=0, pool=None, workers=1, parallel_min_pages=8):
+    """
+    Text of a PDF given as bytes. Returns (text, pages extracted, total pages). Only the first
+    max_pages pages are read (0 for all). PDFs with at least parallel_min_pages pages are
+    split into one contiguous page range per worker of `pool`.
+    """
+    total_pages = count_pdf_pages(data)
+    pages = min(total_pages, max_pages) if max_pages else total_pages
+
+    if pool is None or workers < 2 or pages < parallel_min_pages:
+        return extract_pdf_pages(data, list(range(pages)), layout), pages, total_pages
+
+    chunk = -(-pages // workers)
+    ranges = [list(range(start, min(start + chunk, pages))) for start in range(0, pages, chunk)]
+    futures = [pool.submit(extract_pdf_pages, data, page_range, layout) for page_range in ranges]
+    return ''.join(future.result() for future in futures), pages, total_pages
+
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+# Text boxes are stored twice (DrawingML and a VML fallback); only the first copy is read
+_MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+
+def _docx_part_text(stream, emit):
+    """
+    Stream one WordprocessingML part, calling emit() with each line in document order:
+    paragraphs, table rows (cells joined with ' | ') and text-box paragraphs. Elements are
+    dropped from the tree as soon as they close, so memory stays flat however long the part.
+    """
+    open_elements = []
+    paragraphs = []  # text fragments of each open paragraph (text boxes nest inside paragraphs)
+    rows = []  # cell texts of each open table row
+    cells = []  # paragraph texts of each open table cell
+    skipping = 0
+    for event, element in ElementTree.iterparse(stream, events=('start', 'end')):
+        tag = element.tag
+        if event == 'start':
+            open_elements.append(element)
+            if skipping or tag == _MC_FALLBACK:
+                skipping += 1
+            elif tag == f'{_W}p':
+                paragraphs.append([])
+            elif tag == f'{_W}tr':
+                rows.append([])
+            elif tag == f'{_W}tc':
+                cells.append([])
+            continue
+
+        open_elements.pop()
+        if open_elements:
+            open_elements[-1].remove(element)
+        if skipping:
+            skipping -= 1
+            continue
+
+        if tag == f'{_W}t' and paragraphs:
+            paragraphs[-1].append(element.text or '')
+        elif tag == f'{_W}tab' and paragraphs:
+            paragraphs[-1].append('\t')
+        elif tag in (f'{_W}br', f'{_W}cr') and paragraphs:
+            paragraphs[-1].append('\n')
+        elif tag == f'{_W}p':
+            text = ''.join(paragraphs.pop())
+            if cells:
+                cells[-1].append(text)
+            else:
+                emit(text)
+        elif tag == f'{_W}tc':
+            text = ' '.join(part for part in cells.pop() if part)
+            if rows:
+                rows[-1].append(text)
+        elif tag == f'{_W}tr':
+            text = ' | '.join(cell for cell in rows.pop() if cell)
+            if cells:
+                cells[-1].append(text)  # nested table
+            elif text:
+                emit(text)
+
+
+def _part_number(name):
+    match = re.search(r'(\d+)\.xml$', name)
+    return int(match.group(1)) if match else 0
+
+
+def extract_docx_text(data):
+    """
+    Text of a DOCX given as bytes, one paragraph or table row per line: header text first
+    (where templates often put contact details), then the body, then footers. Identical
+    headers or footers (first-page/even/default variants) are included once.
+    """
+    lines = []
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        names = archive.namelist()
+        headers = sorted((name for name in names if re.fullmatch(r'word/header\d*\.xml', name)), key=_part_number)
+        footers = sorted((name for name in names if re.fullmatch(r'word/footer\d*\.xml', name)), key=_part_number)
+
+        seen_parts = set()
+        for name in headers + ['word/document.xml'] + footers:
+            part_lines = []
+            with archive.open(name) as stream:
+                _docx_part_text(stream, part_lines.append)
+            if name != 'word/document.xml':
+                part_lines = [line for line in part_lines if line.strip()]
+                key = tuple(part_lines)
+                if not part_lines or key in seen_parts:
+                    continue
+                seen_parts.add(key)
+            lines.extend(part_lines)
+    return ''.join(line + "\n" for line in lines)
@@ -0,0 +1,151 @@
+# backend/services/incremental.py
+
+# Incremental re-tailoring. Users iterate on a result: they tweak a bullet or paste a slightly
+# edited JD and submit again. Given the stored earlier result, only the sections whose inputs
+# changed go back to Gemini, and within the experience section only the bullets that are new
+# or edited. Sections made with different tailoring settings (match mode, JD compaction) are
+# re-run too. Bullet rewrites are memoized one by one, keyed by the bullet and the JD: from the
+# earlier result, and in the shared LLM cache for any later request.
+
+import copy
+import re
+from contextvars import copy_context
+
+from functools import partial
+
+from services.cache import MISS, cache_key
+from services.compaction import prepare_prompt
+from services.pipeline import (EMPTY_RESULTS, TailoringOptions, build_bullets_prompt, flatten_resume,
+                               generate_and_parse, parse_bullets, plan_tailoring, section_cache_key,
+                               tailoring_inputs)
+
+
+def _normalized(text):
+    return re.sub(r'\s+', ' ', text or '').strip()
+
+
+def same_input(a, b):
+    """Whether two section inputs (or texts) are equal up to whitespace."""
+    return cache_key('input', a) == cache_key('input', b)
+
+
+def bullet_key(bullet, jd_text, options):
+    return section_cache_key('bullet', bullet, jd_text, options)
+
+
+def previous_rewrites(previous):
+    """
+    {original bullet: rewritten bullet} from a stored result. Only usable when the rewritten
+    list lines up with the extracted bullets; bullets that were passed through unchanged
+    (not selected for rewriting) are left out.
+    """
+    _, originals, _ = flatten_resume(previous.get('extracted_resume_data') or {})
+    rewritten = previous.get('improved_bullets') or []
+    if len(originals) != len(rewritten):
+        return {}
+    return {_normalized(original): bullet for original, bullet in zip(originals, rewritten)
+            if _normalized(bullet.lstrip('* ')) != _normalized(original)}
+
+
+def _rewrite_bullets(model, prompt, bullet_count, fallback_prompt, parse):
+    """
+    Rewrite just the bullets of `prompt`. If Gemini's answer does not line up one-to-one, rewrite
+    the whole section with the regular prompt instead (returns (None, full section) in that case).
+    """
+    rewritten = generate_and_parse(model, prompt, parse_bullets, 'improved_bullets')
+    if len(rewritten) == bullet_count:
+        return rewritten, None
+    return None, generate_and_parse(model, fallback_prompt, parse, 'improved_bullets')
+
+
+def run_incremental(model, previous, extracted_resume_data, jd_text, executor, cache=None, options=None):
+    """
+    Like run_tailoring, but reuses every section of `previous` (a stored result) whose inputs
+    and settings are unchanged, and rewrites only new or edited bullets. Returns (results, errors, stats);
+    stats['incremental'] lists the reused and re-run sections and the bullet counts.
+    """
+    options = options or TailoringOptions()
+    plan = plan_tailoring(extracted_resume_data, jd_text, options)
+    previous_inputs = previous.get('inputs') or {}
+    jd_changed = not same_input(previous_inputs.get('jd_text'), jd_text)
+    # Results stored without settings predate them and are treated as made with other settings
+    old_settings = previous_inputs.get('settings') or {}
+    settings = options.section_settings()
+    changed = {key for key in settings if jd_changed or not same_input(old_settings.get(key), settings[key])}
+    old_inputs = tailoring_inputs(previous.get('extracted_resume_data') or {})
+    new_inputs = tailoring_inputs(extracted_resume_data)
+
+    results = dict(plan.local)
+    errors, futures, keys = {}, {}, {}
+    report = {'reused': [], 'rerun': []}
+
+    for key, (prompt, parse, inputs) in plan.prompts.items():
+        if key == 'improved_bullets':
+            continue
+        # An empty earlier value may be a failed call, so it is only reused for an empty input
+        if (key not in changed and same_input(old_inputs[key], new_inputs[key])
+                and (previous.get(key) or not new_inputs[key])):
+            results[key] = previous[key]
+            report['reused'].append(key)
+            continue
+        keys[key] = section_cache_key(key, inputs, jd_text, options)
+        cached = cache.get(keys[key]) if cache is not None else MISS
+        if cached is not MISS:
+            results[key] = cached
+            report['reused'].append(key)
+            continue
+        report['rerun'].append(key)
+        futures[key] = executor.submit(copy_context().run, generate_and_parse, model, prompt, parse, key)
+
+    # Bullets: look each one up before sending only the missing ones to Gemini
+    _, bullets, _ = flatten_resume(extracted_resume_data)
+    rewrites = {} if 'improved_bullets' in changed else previous_rewrites(previous)
+    rewritten, missing = {}, []
+    if 'improved_bullets' in plan.prompts:
+        for index in plan.rewrite_indices:
+            bullet = rewrites.get(_normalized(bullets[index]), MISS)
+            if bullet is MISS and cache is not None:
+                bullet = cache.get(bullet_key(bullets[index], jd_text, options))
+            if bullet is MISS:
+                missing.append(index)
+            else:
+                rewritten[index] = bullet
+        prompt, parse, _ = plan.prompts['improved_bullets']
+        if missing:
+            report['rerun'].append('improved_bullets')
+            # Only the missing bullets are sent, so the prompt's size report is redone for them
+            missing_prompt, plan.stats['prompt_compaction']['improved_bullets'] = prepare_prompt(
+                partial(build_bullets_prompt, [bullets[i] for i in missing]), jd_text, options.compact_jd,
+                options.prompt_token_budget)
+            futures['improved_bullets'] = executor.submit(
+                copy_context().run, _rewrite_bullets, model, missing_prompt, len(missing), prompt, parse)
+        else:
+            report['reused'].append('improved_bullets')
+    report['bullets'] = {'total': len(bullets), 'reused': len(rewritten), 'rewritten': len(missing)}
+
+    for key, future in futures.items():
+        try:
+            value = future.result()
+        except Exception as e:
+            errors[key] = str(e)
+            results[key] = copy.copy(EMPTY_RESULTS[key])
+            continue
+        if key != 'improved_bullets':
+            results[key] = value
+            if cache is not None:
+                cache.set(keys[key], value)
+            continue
+        new_bullets, full_section = value
+        if full_section is not None:
+            results[key] = full_section
+            report['bullets']['fallback'] = True
+            continue
+        for index, bullet in zip(missing, new_bullets):
+            rewritten[index] = bullet
+            if cache is not None:
+                cache.set(bullet_key(bullets[index], jd_text, options), bullet)
+
+    if 'improved_bullets' in plan.prompts and 'improved_bullets' not in results:
+        # Same layout as merge_ranked_bullets: bullets not selected for rewriting pass through
+        results['improved_bullets'] = [rewritten.get(i, f"* {bullet}") for i, bullet in enumerate(bullets)]
+    return results, errors, {**plan.stats, 'incremental': report}
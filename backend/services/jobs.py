@@ -0,0 +1,519 @@
+# backend/services/jobs.py
+
+# Persistent queue of resume-improvement jobs. Clients submit a job and poll for its result
+# instead of holding a request (and a server worker) open for the whole Gemini pipeline.
+# Jobs live in MongoDB (MONGO_URI) or a local sqlite file, so they survive restarts: workers
+# hold a renewable lease on each running job, and jobs whose lease runs out (the process
+# died) are put back in the queue.
+
+import ipaddress
+import json
+import logging
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+import requests
+
+from services.metrics import request_id
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+class JobQueueFull(Exception):
+    """Too many jobs are waiting; the client should retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Too many jobs are queued; retry in {retry_after:.0f}s.")
+        self.retry_after = retry_after
+
+
+class IdempotencyConflict(Exception):
+    """The idempotency key was already used for a job with a different payload."""
+
+
+class UnsafeWebhookURL(ValueError):
+    """The webhook URL is not http(s), or points at a host the server must not call."""
+
+
+def _host_allowed(host, allowed_hosts):
+    return any(host == allowed or host.endswith('.' + allowed) for allowed in allowed_hosts)
+
+
+def validate_webhook_url(url, allowed_hosts=()):
+    """
+    Raise UnsafeWebhookURL unless `url` is an http(s) URL whose host may be called: in
+    `allowed_hosts` (or a subdomain of one) when that list is set, and otherwise resolving only
+    to public addresses, so a webhook cannot reach loopback, private, link-local (cloud
+    metadata) or reserved addresses.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        raise UnsafeWebhookURL("webhook_url must be an http(s) URL.")
+    host = parsed.hostname.lower().rstrip('.')
+    if allowed_hosts:
+        if not _host_allowed(host, allowed_hosts):
+            raise UnsafeWebhookURL("webhook_url host is not allowed.")
+        return
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, parsed.port or 443, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, UnicodeError, ValueError):
+        raise UnsafeWebhookURL("webhook_url host could not be resolved.")
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split('%', 1)[0])
+        if not ip.is_global or ip.is_multicast:
+            raise UnsafeWebhookURL("webhook_url must point to a public address.")
+
+
+def new_job(payload, idempotency_key=None, webhook_url=None, now=None):
+    now = time.time() if now is None else now
+    return {
+        "id": uuid.uuid4().hex,
+        "status": QUEUED,
+        "payload": payload,
+        "idempotency_key": idempotency_key,
+        "webhook_url": webhook_url,
+        "attempts": 0,
+        "created_at": now,
+        "updated_at": now,
+        "run_after": now,
+        "lease_expires_at": None,
+        "result": None,
+        "error": None,
+        "http_status": None,
+        "expires_at": None,
+    }
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp else None
+
+
+def public_job(job):
+    """The job as returned to clients (and posted to webhooks)."""
+    view = {
+        "job_id": job["id"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "created_at": _iso(job["created_at"]),
+        "updated_at": _iso(job["updated_at"]),
+    }
+    if job["status"] == SUCCEEDED:
+        view["result"] = job["result"]
+    elif job["status"] == FAILED:
+        view["error"] = job["error"]
+        view["http_status"] = job["http_status"]
+    return view
+
+
+# --- Stores ---
+
+class SQLiteJobStore:
+    """Jobs in a local sqlite file; safe to share between worker processes on one machine."""
+
+    _JSON_FIELDS = ('payload', 'result')
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL, idempotency_key TEXT UNIQUE,"
+            " webhook_url TEXT, attempts INTEGER NOT NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL,"
+            " run_after REAL NOT NULL, lease_expires_at REAL, result TEXT, error TEXT, http_status INTEGER,"
+            " expires_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_run_after ON jobs (status, run_after)")
+
+    def _row(self, row):
+        if row is None:
+            return None
+        job = dict(row)
+        for field in self._JSON_FIELDS:
+            job[field] = json.loads(job[field]) if job[field] is not None else None
+        return job
+
+    def _one(self, query, params):
+        return self._row(self._conn.execute(query, params).fetchone())
+
+    def insert(self, job):
+        """Store a new job. Returns (stored job, created); an existing idempotency key returns that job."""
+        values = dict(job, **{field: json.dumps(job[field]) if job[field] is not None else None
+                              for field in self._JSON_FIELDS})
+        columns = ', '.join(values)
+        with self._lock:
+            try:
+                self._conn.execute(f"INSERT INTO jobs ({columns}) VALUES ({', '.join('?' * len(values))})",
+                                   tuple(values.values()))
+                return job, True
+            except sqlite3.IntegrityError:
+                if job["idempotency_key"] is None:
+                    raise
+        return self.find_by_idempotency_key(job["idempotency_key"]), False
+
+    def get(self, job_id):
+        with self._lock:
+            return self._one("SELECT * FROM jobs WHERE id = ?", (job_id,))
+
+    def find_by_idempotency_key(self, key):
+        with self._lock:
+            return self._one("SELECT * FROM jobs WHERE idempotency_key = ?", (key,))
+
+    def count_pending(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)).fetchone()[0]
+
+    def claim_next(self, lease_seconds, now):
+        """Atomically move the oldest runnable queued job to running, or return None."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? AND run_after <= ? ORDER BY created_at LIMIT 1",
+                    (QUEUED, now),
+                ).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_expires_at = ?, updated_at = ?"
+                    " WHERE id = ?",
+                    (RUNNING, now + lease_seconds, now, row[0]),
+                )
+                return self._one("SELECT * FROM jobs WHERE id = ?", (row[0],))
+            finally:
+                self._conn.execute("COMMIT")
+
+    def renew_leases(self, job_ids, lease_expires_at):
+        if not job_ids:
+            return
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET lease_expires_at = ? WHERE status = ? AND id IN ({', '.join('?' * len(job_ids))})",
+                (lease_expires_at, RUNNING, *job_ids),
+            )
+
+    def finish(self, job_id, status, now, expires_at, result=None, error=None, http_status=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, http_status = ?, updated_at = ?,"
+                " lease_expires_at = NULL, expires_at = ? WHERE id = ? AND status = ?",
+                (status, json.dumps(result) if result is not None else None, error, http_status, now, expires_at,
+                 job_id, RUNNING),
+            )
+            return self._one("SELECT * FROM jobs WHERE id = ?", (job_id,))
+
+    def requeue(self, job_id, run_after, now):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, run_after = ?, updated_at = ?, lease_expires_at = NULL"
+                " WHERE id = ? AND status = ?",
+                (QUEUED, run_after, now, job_id, RUNNING),
+            )
+
+    def recover_expired(self, now, max_attempts, expires_at):
+        """Requeue running jobs whose lease ran out; fail those already out of attempts. Returns the count."""
+        with self._lock:
+            failed = self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, http_status = 500, updated_at = ?, lease_expires_at = NULL,"
+                " expires_at = ? WHERE status = ? AND lease_expires_at < ? AND attempts >= ?",
+                (FAILED, "Job was interrupted too many times.", now, expires_at, RUNNING, now, max_attempts),
+            ).rowcount
+            requeued = self._conn.execute(
+                "UPDATE jobs SET status = ?, run_after = ?, updated_at = ?, lease_expires_at = NULL"
+                " WHERE status = ? AND lease_expires_at < ?",
+                (QUEUED, now, now, RUNNING, now),
+            ).rowcount
+            return failed + requeued
+
+    def purge_expired(self, now):
+        with self._lock:
+            return self._conn.execute("DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at < ?", (now,)).rowcount
+
+
+class MongoJobStore:
+    """Jobs in the `jobs` collection of the MONGO_URI database (or a mongomock client locally)."""
+
+    def __init__(self, collection):
+        import pymongo
+        self._pymongo = pymongo
+        self._jobs = collection
+        # Sparse, so jobs without a key do not collide on null
+        self._jobs.create_index('idempotency_key', unique=True, sparse=True)
+        self._jobs.create_index([('status', 1), ('run_after', 1)])
+        self._jobs.create_index('expires_at', sparse=True)
+
+    @classmethod
+    def from_uri(cls, uri):
+        import pymongo
+        return cls(pymongo.MongoClient(uri).get_default_database()['jobs'])
+
+    @staticmethod
+    def _job(document):
+        if document is None:
+            return None
+        job = dict(document)
+        job["id"] = job.pop("_id")
+        job.setdefault("idempotency_key", None)
+        return job
+
+    def insert(self, job):
+        document = {("_id" if field == "id" else field): value for field, value in job.items()
+                    if not (field == "idempotency_key" and value is None)}
+        try:
+            self._jobs.insert_one(document)
+            return job, True
+        except self._pymongo.errors.DuplicateKeyError:
+            if job["idempotency_key"] is None:
+                raise
+            return self.find_by_idempotency_key(job["idempotency_key"]), False
+
+    def get(self, job_id):
+        return self._job(self._jobs.find_one({"_id": job_id}))
+
+    def find_by_idempotency_key(self, key):
+        return self._job(self._jobs.find_one({"idempotency_key": key}))
+
+    def count_pending(self):
+        return self._jobs.count_documents({"status": {"$in": [QUEUED, RUNNING]}})
+
+    def claim_next(self, lease_seconds, now):
+        return self._job(self._jobs.find_one_and_update(
+            {"status": QUEUED, "run_after": {"$lte": now}},
+            {"$set": {"status": RUNNING, "lease_expires_at": now + lease_seconds, "updated_at": now},
+             "$inc": {"attempts": 1}},
+            sort=[("created_at", 1)],
+            return_document=self._pymongo.ReturnDocument.AFTER,
+        ))
+
+    def renew_leases(self, job_ids, lease_expires_at):
+        if job_ids:
+            self._jobs.update_many({"_id": {"$in": list(job_ids)}, "status": RUNNING},
+                                   {"$set": {"lease_expires_at": lease_expires_at}})
+
+    def finish(self, job_id, status, now, expires_at, result=None, error=None, http_status=None):
+        return self._job(self._jobs.find_one_and_update(
+            {"_id": job_id, "status": RUNNING},
+            {"$set": {"status": status, "result": result, "error": error, "http_status": http_status,
+                      "updated_at": now, "lease_expires_at": None, "expires_at": expires_at}},
+            return_document=self._pymongo.ReturnDocument.AFTER,
+        ))
+
+    def requeue(self, job_id, run_after, now):
+        self._jobs.update_one({"_id": job_id, "status": RUNNING},
+                              {"$set": {"status": QUEUED, "run_after": run_after, "updated_at": now,
+                                        "lease_expires_at": None}})
+
+    def recover_expired(self, now, max_attempts, expires_at):
+        expired = {"status": RUNNING, "lease_expires_at": {"$lt": now}}
+        failed = self._jobs.update_many(
+            {**expired, "attempts": {"$gte": max_attempts}},
+            {"$set": {"status": FAILED, "error": "Job was interrupted too many times.", "http_status": 500,
+                      "updated_at": now, "lease_expires_at": None, "expires_at": expires_at}},
+        ).modified_count
+        requeued = self._jobs.update_many(
+            expired,
+            {"$set": {"status": QUEUED, "run_after": now, "updated_at": now, "lease_expires_at": None}},
+        ).modified_count
+        return failed + requeued
+
+    def purge_expired(self, now):
+        return self._jobs.delete_many({"expires_at": {"$ne": None, "$lt": now}}).deleted_count
+
+
+# --- Queue ---
+
+class JobQueue:
+    """
+    Runs stored jobs on a bounded thread pool. `runner(payload)` returns (body, http status,
+    retry_after); a failure with retry_after set (rate limit, open circuit) is requeued until
+    max_attempts is reached. Finished jobs are kept for `ttl` seconds.
+    """
+
+    def __init__(self, store, runner, max_workers=4, max_pending=500, lease_seconds=60, max_attempts=3,
+                 ttl=86400, poll_interval=1.0, webhook_timeout=10.0, webhook_retries=3, webhook_allowed_hosts=()):
+        self.store = store
+        self.runner = runner
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.webhook_timeout = webhook_timeout
+        self.webhook_retries = webhook_retries
+        self.webhook_allowed_hosts = tuple(webhook_allowed_hosts)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job-worker')
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._running = set()
+        self._running_lock = threading.Lock()
+        self._dispatcher = None
+
+    def start(self):
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(target=self._dispatch, name='job-dispatcher', daemon=True)
+            self._dispatcher.start()
+        return self
+
+    def stop(self, wait=True):
+        self._stopped.set()
+        self._wakeup.set()
+        self._pool.shutdown(wait=wait)
+
+    def submit(self, payload, idempotency_key=None, webhook_url=None):
+        """Queue a job. Returns (job, created); resubmitting an idempotency key returns the original job."""
+        if idempotency_key is not None:
+            existing = self.store.find_by_idempotency_key(idempotency_key)
+            if existing is not None:
+                return self._check_replay(existing, payload), False
+
+        if self.store.count_pending() >= self.max_pending:
+            raise JobQueueFull(retry_after=max(1.0, self.lease_seconds / 2))
+        job, created = self.store.insert(new_job(payload, idempotency_key, webhook_url))
+        if not created:
+            # Lost a race with a concurrent submit using the same key
+            return self._check_replay(job, payload), False
+        self._wakeup.set()
+        return job, True
+
+    @staticmethod
+    def _check_replay(job, payload):
+        if job["payload"] != payload:
+            raise IdempotencyConflict("Idempotency key was already used with a different request.")
+        return job
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def _maintain(self, now):
+        self.store.renew_leases(self._running_ids(), now + self.lease_seconds)
+        recovered = self.store.recover_expired(now, self.max_attempts, now + self.ttl)
+        if recovered:
+            logger.warning(f"Recovered {recovered} job(s) whose worker stopped renewing its lease")
+        self.store.purge_expired(now)
+
+    def _running_ids(self):
+        with self._running_lock:
+            return list(self._running)
+
+    def _dispatch(self):
+        next_maintenance = 0.0
+        while not self._stopped.is_set():
+            try:
+                now = time.time()
+                if now >= next_maintenance:
+                    self._maintain(now)
+                    next_maintenance = now + self.lease_seconds / 3
+
+                if not self._slots.acquire(timeout=self.poll_interval):
+                    continue
+                job = self.store.claim_next(self.lease_seconds, time.time())
+                if job is None:
+                    self._slots.release()
+                    self._wakeup.wait(self.poll_interval)
+                    self._wakeup.clear()
+                    continue
+                with self._running_lock:
+                    self._running.add(job["id"])
+                self._pool.submit(self._run, job)
+            except Exception as e:
+                logger.error(f"Job dispatcher error: {e}")
+                self._stopped.wait(self.poll_interval)
+
+    def _run(self, job):
+        try:
+            try:
+                # Log lines of the job carry its ID in place of a request ID
+                with request_id(f"job-{job['id']}"):
+                    body, status, retry_after = self.runner(job["payload"])
+            except Exception as e:
+                logger.error(f"Job {job['id']} crashed: {e}")
+                body, status, retry_after = {"error": f"AI processing failed: {str(e)}"}, 500, None
+
+            now = time.time()
+            if status < 400:
+                finished = self.store.finish(job["id"], SUCCEEDED, now, now + self.ttl, result=body, http_status=status)
+            elif retry_after is not None and job["attempts"] < self.max_attempts:
+                logger.warning(f"Job {job['id']} deferred for {retry_after:.0f}s: {body.get('error')}")
+                self.store.requeue(job["id"], now + retry_after, now)
+                return
+            else:
+                finished = self.store.finish(job["id"], FAILED, now, now + self.ttl,
+                                             error=body.get("error"), http_status=status)
+
+            if finished is not None and finished.get("webhook_url"):
+                self._notify(finished)
+        finally:
+            with self._running_lock:
+                self._running.discard(job["id"])
+            self._slots.release()
+            self._wakeup.set()
+
+    def check_webhook(self, url):
+        """Raise UnsafeWebhookURL if the queue would refuse to call `url`."""
+        validate_webhook_url(url, self.webhook_allowed_hosts)
+
+    def _notify(self, job):
+        """POST the finished job to its webhook, retrying transient failures with backoff."""
+        for attempt in range(self.webhook_retries + 1):
+            try:
+                # Checked again before every attempt: the host's DNS may have changed since submission
+                self.check_webhook(job["webhook_url"])
+            except UnsafeWebhookURL as e:
+                logger.error(f"Webhook for job {job['id']} not sent: {e}")
+                return
+            try:
+                # Redirects are not followed, so a public URL cannot bounce the POST to an internal one
+                response = requests.post(job["webhook_url"], json=public_job(job), timeout=self.webhook_timeout,
+                                         allow_redirects=False)
+                if response.status_code < 500:
+                    return
+                error = f"HTTP {response.status_code}"
+            except requests.RequestException as e:
+                error = str(e)
+            if attempt < self.webhook_retries:
+                time.sleep(min(30.0, 2 ** attempt))
+        logger.error(f"Webhook for job {job['id']} failed after {self.webhook_retries + 1} attempts: {error}")
+
+
+def build_job_store(config):
+    """The job store named by JOB_STORE: 'mongo' (MONGO_URI), 'mongomock' or 'sqlite' (JOB_SQLITE_PATH)."""
+    kind = config['JOB_STORE']
+    if kind == 'mongo':
+        return MongoJobStore.from_uri(config['MONGO_URI'])
+    if kind == 'mongomock':
+        import mongomock
+        return MongoJobStore(mongomock.MongoClient()['resume_improver_db']['jobs'])
+    if kind == 'sqlite':
+        return SQLiteJobStore(config['JOB_SQLITE_PATH'])
+    raise ValueError(f"Unsupported JOB_STORE {kind!r}; use 'mongo', 'mongomock' or 'sqlite'.")
+
+
+def build_job_queue(config, runner):
+    return JobQueue(
+        build_job_store(config),
+        runner,
+        max_workers=config['JOB_MAX_WORKERS'],
+        max_pending=config['JOB_MAX_PENDING'],
+        lease_seconds=config['JOB_LEASE_SECONDS'],
+        max_attempts=config['JOB_MAX_ATTEMPTS'],
+        ttl=config['JOB_TTL_SECONDS'],
+        webhook_timeout=config['JOB_WEBHOOK_TIMEOUT_SECONDS'],
+        webhook_retries=config['JOB_WEBHOOK_RETRIES'],
+        webhook_allowed_hosts=config['JOB_WEBHOOK_ALLOWED_HOSTS'],
+    )
@@ -0,0 +1,174 @@
+# backend/services/jsonstream.py
+
+# Tolerant JSON for Gemini responses. Gemini does not always return bare JSON: it wraps it in
+# a ```json fence, adds a sentence before or after it, or copies the "// more entries" comments
+# of the prompt's example structure. StreamingJSONParser reads a streamed response chunk by
+# chunk and hands out each top-level field of the JSON object as soon as its value is complete,
+# so work that depends on one field can start while Gemini is still writing the rest.
+# recover_json() parses a complete response the same way.
+
+import json
+import re
+
+_TRAILING_COMMA = re.compile(r',(\s*[}\]])')
+
+
+def _strip_comments(text):
+    """`text` without // line comments outside of strings."""
+    out = []
+    in_string = escape = False
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif text.startswith('//', i):
+            newline = text.find('\n', i)
+            if newline == -1:
+                break
+            i = newline
+            continue
+        out.append(char)
+        i += 1
+    return ''.join(out)
+
+
+def loads_tolerant(text):
+    """json.loads, retried without // comments and trailing commas. Raises json.JSONDecodeError."""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(_TRAILING_COMMA.sub(r'\1', _strip_comments(text)))
+
+
+class StreamingJSONParser:
+    """
+    Incremental parser for one JSON object somewhere in a stream of text. feed() returns the
+    (key, value) pairs of the object's top-level fields completed by that chunk; anything
+    before the opening brace (prose, a code fence) is skipped. Fields whose value does not
+    parse are left out rather than raising. Once the object is closed, `done` is set and
+    `span` holds its (start, end) offsets in the text fed so far.
+    """
+
+    def __init__(self):
+        self.text = ''
+        self.done = False
+        self.span = None
+        self._pos = 0
+        self._start = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._key = None
+        self._value_start = None
+
+    def feed(self, chunk):
+        self.text += chunk
+        fields = []
+        text = self.text
+        while self._pos < len(text) and not self.done:
+            i = self._pos
+            char = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._string_closed(i, fields)
+                self._pos += 1
+                continue
+
+            if self._start is None:
+                if char == '{':
+                    self._start = i
+                    self._depth = 1
+                self._pos += 1
+                continue
+
+            if char == '/':
+                if i + 1 == len(text):
+                    break  # Might be the start of a comment; wait for the next chunk
+                if text[i + 1] == '/':
+                    newline = text.find('\n', i)
+                    if newline == -1:
+                        break
+                    self._pos = newline
+                    continue
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 1 and self._value_start is not None:
+                    self._emit(text[self._value_start:i + 1], fields)
+                elif self._depth == 0:
+                    self._literal_end(i, fields)
+                    self.done = True
+                    self.span = (self._start, i + 1)
+            elif self._depth == 1:
+                if char == ':':
+                    self._value_start = i + 1
+                elif char == ',':
+                    self._literal_end(i, fields)
+            self._pos += 1
+        return fields
+
+    def _string_closed(self, end, fields):
+        if self._value_start is None:
+            try:
+                self._key = json.loads(self.text[self._string_start:end + 1])
+            except json.JSONDecodeError:
+                self._key = None
+        else:
+            self._emit(self.text[self._value_start:end + 1], fields)
+
+    def _literal_end(self, end, fields):
+        # Numbers, true/false/null: complete only once the next delimiter is seen
+        if self._value_start is not None:
+            self._emit(self.text[self._value_start:end], fields)
+
+    def _emit(self, value_text, fields):
+        key, self._key, self._value_start = self._key, None, None
+        if key is None or not value_text.strip():
+            return
+        try:
+            fields.append((key, loads_tolerant(value_text)))
+        except json.JSONDecodeError:
+            pass
+
+
+def recover_json(text):
+    """
+    The JSON object in a model response: bare JSON, fenced JSON, or JSON surrounded by prose,
+    with // comments and trailing commas tolerated. Raises json.JSONDecodeError if there is none.
+    """
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        error = e
+    start = text.find('{')
+    while start != -1:
+        parser = StreamingJSONParser()
+        parser.feed(text[start:])
+        if parser.done:
+            try:
+                value = loads_tolerant(parser.text[slice(*parser.span)])
+                if isinstance(value, dict):
+                    return value
+            except json.JSONDecodeError:
+                pass
+        start = text.find('{', start + 1)
+    raise error
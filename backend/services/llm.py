@@ -0,0 +1,456 @@
+# backend/services/llm.py
+
+# Process-wide Gemini client shared by all blueprints. It wraps a backend (the real Gemini
+# model, or an offline fake) with rate-limit-aware scheduling, coalescing of identical
+# in-flight prompts, per-call timeouts, jittered exponential backoff, optional hedged requests
+# and a circuit breaker. It exposes generate_content() like a genai.GenerativeModel, so the
+# pipeline code can use either.
+
+import json
+import logging
+import math
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from google.api_core import exceptions as google_exceptions
+
+from services.cache import cache_key
+from services.metrics import LLM_RETRIES, current_stage, observe_llm_call
+from services.ranking import estimate_tokens
+from services.scheduler import BATCH, INTERACTIVE, Scheduler, SchedulerOverloaded, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Upstream errors worth retrying; anything else (bad request, auth, safety blocks) fails at once.
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.BadGateway,
+    google_exceptions.GatewayTimeout,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.Aborted,
+    TimeoutError,
+    ConnectionError,
+)
+
+
+class CircuitOpenError(Exception):
+    """The upstream is failing; calls are rejected without being attempted until retry_after passes."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Gemini is temporarily unavailable; retry in {retry_after:.0f}s.")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failed calls and rejects calls for `reset_timeout`
+    seconds. After that a single trial call is let through (half-open); success closes it again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half-open'
+            return 'open'
+
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if remaining > 0 or self._trial_in_flight:
+                raise CircuitOpenError(max(remaining, 1.0))
+            self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def release(self):
+        """Give back a half-open trial slot for a call that was never sent upstream."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._trial_in_flight:
+                    logger.warning(f"Gemini circuit breaker opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+# --- Backends ---
+
+class GeminiBackend:
+    """The real Gemini API. One GenerativeModel (and its underlying channel) is reused for every call."""
+
+    def __init__(self, api_key, model_name):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self._model = genai.GenerativeModel(model_name)
+
+    def generate_content(self, prompt, generation_config=None, stream=False, timeout=None):
+        request_options = {'timeout': timeout} if timeout else None
+        return self._model.generate_content(prompt, generation_config=generation_config, stream=stream,
+                                            request_options=request_options)
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+def canned_response(prompt, generation_config=None):
+    """Plausible output for each of the pipeline's prompts, so the whole app runs offline."""
+    extracted = {
+        "summary": "Software engineer with experience building web services.",
+        "experience": [{"title": "Software Engineer", "company": "Example Corp", "duration": "2020 - Present",
+                        "responsibilities": ["Built REST APIs in Python", "Improved test coverage to 90%"]}],
+        "education": [{"degree": "B.S. Computer Science", "university": "Example University", "year": "2019"}],
+        "skills": ["Python", "Flask", "SQL"],
+        "achievements": [],
+        "contact_info": {"name": "Alex Example", "email": "alex@example.com", "phone": "", "linkedin": ""},
+    }
+    if generation_config is not None:
+        return json.dumps({
+            "extracted_resume_data": extracted,
+            "improved_summary": "Software engineer who ships reliable Python web services.",
+            "improved_bullets": ["* Built REST APIs in Python serving 1M requests a day",
+                                 "* Raised test coverage to 90%, cutting regressions by half"],
+            "suggested_skills": ["Docker", "Kubernetes", "AWS"],
+            "match_analysis": "Strong Matches:\nPython\n\nAreas for Improvement:\nCloud experience",
+        })
+    if 'Extract the following information' in prompt:
+        return f"```json\n{json.dumps(extracted)}\n```"
+    if 'rewrite *each* bullet point' in prompt:
+        # Only the resume's bullets: a JD's own "- " lines come after them
+        block = prompt.split('Current Resume Bullet Points:', 1)[-1].split('Job Description:', 1)[0]
+        bullets = [line.strip()[2:] for line in block.split('\n') if line.strip().startswith('- ')]
+        return '\n'.join(f"* Delivered: {bullet}" for bullet in bullets)
+    if 'Suggest 3-5 such skills' in prompt:
+        return "Docker, Kubernetes, AWS"
+    if 'Analyze the alignment' in prompt:
+        return "Strong Matches:\n- Python\n\nAreas for Improvement:\n- Cloud experience"
+    return "Software engineer who ships reliable Python web services."
+
+
+def file_responder(path):
+    """
+    Canned responses from a JSON file mapping a prompt substring to the response text (strings
+    are used as-is, anything else is serialized as JSON); the first matching key wins, and
+    prompts matching none get canned_response().
+    """
+    with open(path, encoding='utf-8') as f:
+        responses = json.load(f)
+
+    def respond(prompt, generation_config=None):
+        for marker, response in responses.items():
+            if marker in prompt:
+                return response if isinstance(response, str) else json.dumps(response)
+        return canned_response(prompt, generation_config)
+    return respond
+
+
+def latency_sampler(distribution, mean, sigma=0.5, seed=None):
+    """
+    Per-call latency in seconds for FakeBackend, averaging `mean`: 'fixed', 'uniform' (0 to
+    2 x mean), 'exponential' or 'lognormal' (with log-space standard deviation `sigma`, for
+    the long tail real API latencies have).
+    """
+    rng = random.Random(seed)
+    if distribution == 'fixed' or mean <= 0:
+        return mean
+    if distribution == 'uniform':
+        return lambda: rng.uniform(0, 2 * mean)
+    if distribution == 'exponential':
+        return lambda: rng.expovariate(1 / mean)
+    if distribution == 'lognormal':
+        mu = math.log(mean) - sigma ** 2 / 2
+        return lambda: rng.lognormvariate(mu, sigma)
+    raise ValueError(f"Unsupported latency distribution {distribution!r}; use fixed, uniform, exponential or lognormal.")
+
+
+class FakeBackend:
+    """
+    Offline stand-in for Gemini. `responder(prompt, generation_config)` produces the text,
+    `latency` is seconds (or a callable returning seconds) per call, and `error_rate` is the
+    probability of a ServiceUnavailable error.
+    """
+
+    def __init__(self, responder=canned_response, latency=0.0, error_rate=0.0, seed=None):
+        self.responder = responder
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def generate_content(self, prompt, generation_config=None, stream=False, timeout=None):
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.error_rate
+        delay = self.latency() if callable(self.latency) else self.latency
+        if timeout and delay > timeout:
+            time.sleep(timeout)
+            raise google_exceptions.DeadlineExceeded("Fake Gemini call timed out")
+        time.sleep(delay)
+        if fail:
+            raise google_exceptions.ServiceUnavailable("Fake Gemini backend injected failure")
+
+        text = self.responder(prompt, generation_config)
+        if not stream:
+            return FakeResponse(text)
+        # Stream line by line, like Gemini's chunked responses
+        return iter([FakeResponse(line) for line in text.splitlines(keepends=True)] or [FakeResponse('')])
+
+
+# --- Client ---
+
+class LLMClient:
+    """Reusable Gemini client with scheduling, coalescing, timeouts, retries, hedging and a circuit breaker."""
+
+    def __init__(self, backend, timeout=60.0, max_retries=3, backoff_base=0.5, backoff_max=8.0,
+                 hedge_after=None, breaker=None, hedge_workers=8, scheduler=None, output_tokens_estimate=0):
+        self.backend = backend
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self.breaker = breaker or CircuitBreaker()
+        self.scheduler = scheduler or Scheduler()
+        # Added to the prompt's token estimate when charging the TPM bucket
+        self.output_tokens_estimate = output_tokens_estimate
+        self._singleflight = SingleFlight()
+        self._hedge_pool = ThreadPoolExecutor(max_workers=hedge_workers, thread_name_prefix='llm-hedge') if hedge_after else None
+        # Idle hedge pool workers: calls are only handed to the pool when one is free, never queued
+        self._hedge_slots = threading.BoundedSemaphore(hedge_workers)
+        self._lock = threading.Lock()
+        self.counters = {'calls': 0, 'retries': 0, 'failures': 0, 'hedges': 0, 'hedge_wins': 0, 'rejected': 0,
+                         'overloaded': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _admit(self, prompt, priority):
+        """Wait for a slot in the RPM/TPM budget; every request actually sent upstream needs one."""
+        self.scheduler.acquire(estimate_tokens(prompt) + self.output_tokens_estimate, priority)
+
+    def _call(self, prompt, generation_config, priority):
+        self._admit(prompt, priority)
+        return self.backend.generate_content(prompt, generation_config=generation_config, timeout=self.timeout)
+
+    def _submit_to_hedge_pool(self, prompt, generation_config, priority):
+        """A future for the call on an idle hedge pool worker, or None if every worker is busy."""
+        if not self._hedge_slots.acquire(blocking=False):
+            return None
+        future = self._hedge_pool.submit(self._call, prompt, generation_config, priority)
+        future.add_done_callback(lambda _: self._hedge_slots.release())
+        return future
+
+    def _hedged_call(self, prompt, generation_config, priority):
+        """
+        Send a duplicate request if the first is slower than hedge_after; the first success wins.
+        When the hedge pool is busy the call is made unhedged from the caller's thread instead of
+        waiting for a worker, so the pool never adds latency or caps concurrency.
+        """
+        primary = self._submit_to_hedge_pool(prompt, generation_config, priority)
+        if primary is None:
+            return self._call(prompt, generation_config, priority)
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done:
+            return primary.result()
+
+        try:
+            self.scheduler.check_capacity(BATCH)
+        except SchedulerOverloaded:
+            # No headroom for a duplicate; just wait for the original
+            return primary.result()
+        hedge = self._submit_to_hedge_pool(prompt, generation_config, priority)
+        if hedge is None:
+            return primary.result()
+        self._count('hedges')
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count('hedge_wins')
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def check_capacity(self, priority=INTERACTIVE):
+        """Raise SchedulerOverloaded up front if a request of this priority would be turned away."""
+        try:
+            self.scheduler.check_capacity(priority)
+        except SchedulerOverloaded:
+            self._count('overloaded')
+            raise
+
+    def with_priority(self, priority):
+        """A view of this client whose calls are scheduled at `priority` (e.g. BATCH)."""
+        return PrioritizedClient(self, priority)
+
+    def generate_content(self, prompt, generation_config=None, stream=False, priority=INTERACTIVE):
+        """
+        Same call shape as genai.GenerativeModel.generate_content. Identical concurrent
+        non-streaming calls share one upstream request. Streaming calls are not coalesced,
+        retried or hedged, since chunks may already have been consumed when an error surfaces.
+        """
+        if stream:
+            return self._generate(prompt, generation_config, True, priority)
+        key = cache_key('inflight', prompt, repr(generation_config))
+        return self._singleflight.do(key, lambda: self._generate(prompt, generation_config, False, priority))
+
+    def _generate(self, prompt, generation_config, stream, priority):
+        """One logical call (with its retries), timed and token-counted under the current pipeline stage."""
+        stage = current_stage()
+        started = time.perf_counter()
+        outcome, response = 'error', None
+        try:
+            response = self._send(prompt, generation_config, stream, priority, stage)
+            # A stream's latency is the time to open it; its tokens are not counted
+            outcome = 'stream' if stream else 'ok'
+            return response
+        except SchedulerOverloaded:
+            outcome = 'overloaded'
+            raise
+        except CircuitOpenError:
+            outcome = 'rejected'
+            raise
+        finally:
+            observe_llm_call(stage, outcome, time.perf_counter() - started, prompt, response)
+
+    def _send(self, prompt, generation_config, stream, priority, stage):
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self._count('rejected')
+            raise
+        self._count('calls')
+
+        if stream:
+            try:
+                self._admit(prompt, priority)
+            except SchedulerOverloaded:
+                self._count('overloaded')
+                self.breaker.release()
+                raise
+            try:
+                response = self.backend.generate_content(prompt, generation_config=generation_config,
+                                                         stream=True, timeout=self.timeout)
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            self.breaker.record_success()
+            return response
+
+        attempt = 0
+        while True:
+            try:
+                if self._hedge_pool is not None:
+                    response = self._hedged_call(prompt, generation_config, priority)
+                else:
+                    response = self._call(prompt, generation_config, priority)
+            except SchedulerOverloaded:
+                # Rejected locally before reaching Gemini; says nothing about upstream health
+                self._count('overloaded')
+                self.breaker.release()
+                raise
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    self._count('failures')
+                    self.breaker.record_failure()
+                    raise
+                delay = self._backoff(attempt)
+                attempt += 1
+                self._count('retries')
+                LLM_RETRIES.labels(stage).inc()
+                logger.warning(f"Gemini call failed ({e}); retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+            except Exception:
+                # Not an availability problem (bad request, safety block...): the upstream answered
+                self._count('failures')
+                self.breaker.record_success()
+                raise
+            self.breaker.record_success()
+            return response
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        return {**counters, 'coalesced': self._singleflight.coalesced, 'circuit': self.breaker.state,
+                'scheduler': self.scheduler.stats()}
+
+
+class PrioritizedClient:
+    """LLMClient view that schedules every call at a fixed priority; used for batch work."""
+
+    def __init__(self, client, priority):
+        self._client = client
+        self.priority = priority
+
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        return self._client.generate_content(prompt, generation_config, stream, priority=self.priority)
+
+
+def build_llm_client(config):
+    """Create the shared client described by the app config; None if Gemini has no API key."""
+    if config['LLM_BACKEND'] == 'fake':
+        backend = FakeBackend(
+            responder=file_responder(config['FAKE_LLM_RESPONSES_PATH']) if config.get('FAKE_LLM_RESPONSES_PATH') else canned_response,
+            latency=latency_sampler(config['FAKE_LLM_LATENCY_DISTRIBUTION'], config['FAKE_LLM_LATENCY_SECONDS'],
+                                    config['FAKE_LLM_LATENCY_SIGMA']),
+            error_rate=config['FAKE_LLM_ERROR_RATE'],
+        )
+    elif config.get('GEMINI_API_KEY'):
+        backend = GeminiBackend(config['GEMINI_API_KEY'], config['GEMINI_MODEL'])
+    else:
+        return None
+
+    return LLMClient(
+        backend,
+        timeout=config['LLM_TIMEOUT_SECONDS'],
+        max_retries=config['LLM_MAX_RETRIES'],
+        backoff_base=config['LLM_BACKOFF_BASE_SECONDS'],
+        backoff_max=config['LLM_BACKOFF_MAX_SECONDS'],
+        hedge_after=config['LLM_HEDGE_AFTER_SECONDS'] or None,
+        # A primary and a hedge for every call the interactive and batch executors can have in flight
+        hedge_workers=2 * (config['GEMINI_MAX_CONCURRENCY'] + config['BATCH_GEMINI_MAX_CONCURRENCY']),
+        breaker=CircuitBreaker(config['LLM_BREAKER_FAILURE_THRESHOLD'], config['LLM_BREAKER_RESET_SECONDS']),
+        scheduler=Scheduler(
+            requests_per_minute=config['LLM_REQUESTS_PER_MINUTE'],
+            tokens_per_minute=config['LLM_TOKENS_PER_MINUTE'],
+            max_queue_depth={INTERACTIVE: config['LLM_MAX_QUEUE_DEPTH'], BATCH: config['LLM_MAX_BATCH_QUEUE_DEPTH']},
+        ),
+        output_tokens_estimate=config['LLM_OUTPUT_TOKENS_ESTIMATE'],
+    )
@@ -0,0 +1,177 @@
+# backend/services/matcher.py
+
+# Local ATS-style keyword matching between a resume and a JD, without an LLM call.
+# The skill vocabulary is compiled once into a token-level Aho-Corasick automaton, so a
+# single pass over each text finds every known term (including multi-word ones).
+
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from functools import lru_cache
+
+VOCABULARY_PATH = os.path.join(os.path.dirname(__file__), 'data', 'skill_vocabulary.txt')
+
+# Keeps technical tokens like "c++", "c#", "node.js", ".net" and "ci/cd" in one piece
+TOKEN_RE = re.compile(r"\.?[a-z0-9][a-z0-9+#]*(?:[./\-][a-z0-9+#]+)*")
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+
+def _load_nlp():
+    """spaCy pipeline used only for lemmas; None when spaCy or the model is not installed."""
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                try:
+                    import spacy
+                    _nlp = spacy.load('en_core_web_sm', disable=['parser', 'ner'])
+                except (ImportError, OSError):
+                    _nlp = False
+    return _nlp or None
+
+
+@lru_cache(maxsize=65536)
+def _lemma(word):
+    nlp = _load_nlp()
+    if nlp is None:
+        # Crude plural stripping keeps "databases"/"database" together without spaCy
+        return word[:-1] if len(word) > 3 and word.endswith('s') and not word.endswith('ss') else word
+    return nlp(word)[0].lemma_.lower()
+
+
+def tokenize(text):
+    """Lowercased tokens, with plain words reduced to their lemma."""
+    return [_lemma(token) if token.isalpha() else token for token in TOKEN_RE.findall(text.lower())]
+
+
+class TermMatcher:
+    """Aho-Corasick automaton over token sequences, mapping every alias to its canonical term."""
+
+    def __init__(self, terms):
+        # terms: {canonical: [token tuple, ...]}
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for canonical, variants in terms.items():
+            for tokens in variants:
+                self._insert(tokens, canonical)
+        self._build_failure_links()
+
+    def _insert(self, tokens, canonical):
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        if canonical not in self._output[state]:
+            self._output[state].append(canonical)
+
+    def _build_failure_links(self):
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for token, next_state in self._goto[state].items():
+                pending.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(token, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, tokens):
+        """Count occurrences of each canonical term in the token stream."""
+        counts = Counter()
+        state = 0
+        for token in tokens:
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for canonical in self._output[state]:
+                counts[canonical] += 1
+        return counts
+
+
+def load_vocabulary(path=VOCABULARY_PATH):
+    terms = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            names = [name.strip() for name in line.split('|') if name.strip()]
+            terms[names[0]] = [tuple(tokenize(name)) for name in names]
+    return terms
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_matcher():
+    """The vocabulary automaton, compiled on first use and shared by all requests."""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = TermMatcher(load_vocabulary())
+    return _matcher
+
+
+def resume_text_from_extracted(extracted_resume_data):
+    """Flatten the extracted resume JSON into the text the matcher scans."""
+    parts = [extracted_resume_data.get('summary', '')]
+    for exp in extracted_resume_data.get('experience', []):
+        parts.append(exp.get('title', ''))
+        parts.extend(exp.get('responsibilities', []) or [])
+        parts.append(exp.get('description', ''))
+    parts.extend(extracted_resume_data.get('skills', []))
+    parts.extend(extracted_resume_data.get('achievements', []))
+    return '\n'.join(part for part in parts if isinstance(part, str))
+
+
+def match_resume(resume_text, jd_text):
+    """
+    Score how well the resume covers the vocabulary terms found in the JD.
+    Terms the JD repeats weigh more (1 + ln(count)); the score is the covered share of that weight, 0-100.
+    """
+    started = time.perf_counter()
+    matcher = get_matcher()
+    jd_terms = matcher.find(tokenize(jd_text))
+    resume_terms = matcher.find(tokenize(resume_text))
+
+    weights = {term: 1 + math.log(count) for term, count in jd_terms.items()}
+    ranked = sorted(weights, key=lambda term: (-weights[term], term))
+    matched = [term for term in ranked if term in resume_terms]
+    missing = [term for term in ranked if term not in resume_terms]
+
+    total = sum(weights.values())
+    score = round(100 * sum(weights[term] for term in matched) / total, 1) if total else 0.0
+    return {
+        "score": score,
+        "matched_terms": matched,
+        "missing_terms": missing,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def format_match_analysis(result):
+    """Render a local match result in the same two-section shape as the Gemini match analysis."""
+    strong = ', '.join(result['matched_terms']) or 'No JD keywords found in the resume.'
+    gaps = ', '.join(result['missing_terms']) or 'None - the resume covers every JD keyword found.'
+    return (
+        f"Strong Matches:\n{strong}\n\n"
+        f"Areas for Improvement:\nKeywords in the JD missing from the resume: {gaps}\n\n"
+        f"Keyword match score: {result['score']}/100"
+    )
@@ -0,0 +1,172 @@
+# backend/services/metrics.py
+
+# Prometheus metrics for each stage of a request (upload parsing, Gemini calls, JSON parsing,
+# export rendering), served by the /metrics route, plus a request ID that is attached to every
+# log line. Gemini calls are labelled with the pipeline stage that made them through
+# llm_stage(), a context variable, so the pipeline's generate_content() calls keep the same
+# shape as genai.GenerativeModel's. Context variables do not follow work onto pool threads on
+# their own; submit with contextvars.copy_context().run to carry the request ID along.
+
+import logging
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import Response, g, request, stream_with_context
+from flask.logging import default_handler
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+from services.ranking import estimate_tokens
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'Time to produce a response (headers, for streamed responses)',
+    ['method', 'endpoint', 'status'], buckets=_LATENCY_BUCKETS)
+UPLOAD_PARSE_SECONDS = Histogram(
+    'upload_parse_duration_seconds', 'Text extraction time of uploaded files',
+    ['format', 'size'], buckets=_LATENCY_BUCKETS)
+UPLOADS = Counter(
+    'uploads_total', 'Uploaded documents by how their text was obtained (parsed, cache, reference)',
+    ['format', 'source'])
+LLM_CALL_SECONDS = Histogram(
+    'llm_call_duration_seconds', 'Gemini call latency including retries, by pipeline stage and outcome',
+    ['stage', 'outcome'], buckets=_LATENCY_BUCKETS)
+LLM_TOKENS = Counter(
+    'llm_tokens_total', 'Gemini tokens by stage; usage metadata when the response has it, else estimated',
+    ['stage', 'kind'])
+LLM_RETRIES = Counter('llm_retries_total', 'Gemini calls retried after a retryable error', ['stage'])
+LLM_JSON_PARSE_FAILURES = Counter(
+    'llm_json_parse_failures_total', 'Gemini responses that could not be parsed as the expected JSON', ['stage'])
+EXPORT_RENDER_SECONDS = Histogram(
+    'export_render_duration_seconds', 'Time to get the rendered bytes of an export',
+    ['format', 'template'], buckets=_LATENCY_BUCKETS)
+EXPORT_RENDERS = Counter(
+    'export_renders_total', 'Exports by where the bytes came from (cache, joined, rendered)', ['format', 'source'])
+
+_request_id = ContextVar('request_id', default='-')
+_llm_stage = ContextVar('llm_stage', default='other')
+
+
+def size_class(size):
+    """Coarse size label for upload histograms (keeps label cardinality fixed)."""
+    if size < 64 * 1024:
+        return '<64KB'
+    if size < 1024 * 1024:
+        return '64KB-1MB'
+    return '>=1MB'
+
+
+@contextmanager
+def llm_stage(stage):
+    """Label the Gemini calls made inside this block with `stage`."""
+    token = _llm_stage.set(stage)
+    try:
+        yield
+    finally:
+        _llm_stage.reset(token)
+
+
+def current_stage():
+    return _llm_stage.get()
+
+
+@contextmanager
+def request_id(value):
+    """Log lines inside this block carry `value` as their request ID (used for background jobs)."""
+    token = _request_id.set(value)
+    try:
+        yield
+    finally:
+        _request_id.reset(token)
+
+
+def stream_with_request_id(generator):
+    """
+    stream_with_context() that also keeps the request ID: a streamed body is generated after
+    the view has returned, outside the context the ID was set in.
+    """
+    value = _request_id.get()
+
+    def generate():
+        with request_id(value):
+            yield from generator
+
+    return stream_with_context(generate())
+
+
+def observe_llm_call(stage, outcome, seconds, prompt, response=None):
+    LLM_CALL_SECONDS.labels(stage, outcome).observe(seconds)
+    if outcome != 'ok':
+        return
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is not None and getattr(usage, 'prompt_token_count', None):
+        LLM_TOKENS.labels(stage, 'prompt').inc(usage.prompt_token_count)
+        LLM_TOKENS.labels(stage, 'response').inc(usage.candidates_token_count or 0)
+        return
+    LLM_TOKENS.labels(stage, 'prompt').inc(estimate_tokens(prompt))
+    if response is not None:
+        try:
+            LLM_TOKENS.labels(stage, 'response').inc(estimate_tokens(response.text))
+        except Exception:
+            pass  # Blocked responses have no text
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = _request_id.get()
+        return True
+
+
+def _incoming_request_id():
+    value = request.headers.get(REQUEST_ID_HEADER, '')
+    # Reuse a caller's ID (e.g. from a proxy) only if it is safe to echo into logs and headers
+    if re.fullmatch(r'[A-Za-z0-9._-]{1,128}', value):
+        return value
+    return uuid.uuid4().hex
+
+
+def init_app(app):
+    """Request IDs and per-request timing for every route, request IDs in logs, and GET /metrics."""
+    request_id_filter = RequestIdFilter()
+    default_handler.addFilter(request_id_filter)
+    default_handler.setFormatter(logging.Formatter(
+        '[%(asctime)s] %(levelname)s in %(module)s [%(request_id)s]: %(message)s'))
+    # The services' module loggers log through the same handler
+    services_logger = logging.getLogger('services')
+    if default_handler not in services_logger.handlers:
+        services_logger.addHandler(default_handler)
+        services_logger.propagate = False
+
+    @app.before_request
+    def start_request():
+        g.request_id = _incoming_request_id()
+        g.request_id_token = _request_id.set(g.request_id)
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def finish_request(response):
+        if 'request_id' not in g:
+            return response
+        response.headers[REQUEST_ID_HEADER] = g.request_id
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        HTTP_REQUEST_SECONDS.labels(request.method, endpoint, response.status_code).observe(
+            time.perf_counter() - g.request_started)
+        return response
+
+    @app.teardown_request
+    def reset_request_id(error=None):
+        token = g.pop('request_id_token', None)
+        if token is not None:
+            try:
+                _request_id.reset(token)
+            except ValueError:
+                pass  # Torn down from another context (e.g. after a streamed response)
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
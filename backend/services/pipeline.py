@@ -0,0 +1,741 @@
+# backend/services/pipeline.py
+
+import copy
+import json
+import logging
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable
+
+import google.generativeai as genai
+from pydantic import ValidationError
+
+from services.cache import MISS, cache_key
+from services.compaction import COMPACTION_VERSION, compact_jd, compact_whitespace, prepare_prompt
+from services.jsonstream import StreamingJSONParser, recover_json
+from services.matcher import format_match_analysis, match_resume, resume_text_from_extracted
+from services.metrics import LLM_JSON_PARSE_FAILURES, llm_stage
+from services.ranking import merge_ranked_bullets, rank_bullets
+from services.resume_parser import parse_resume
+from services.scheduler import SchedulerExecutor
+from services.schemas import ConsolidatedResult
+
+logger = logging.getLogger(__name__)
+
+
+def clean_gemini_output(text):
+    """Clean Gemini/LLM markdown-like output for plain text extraction."""
+    if not text:
+        return ""
+
+    # Remove markdown bold/italic markers
+    text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)  # bold
+    text = re.sub(r'\*(.*?)\*', r'\1', text)      # italic
+
+    # Remove inline code backticks
+    text = re.sub(r'`{1,3}(.*?)`{1,3}', r'\1', text)
+
+    # Remove fenced code blocks (```json, ```python, etc.)
+    text = re.sub(r'```[\w]*\n(.*?)\n```', r'\1', text, flags=re.DOTALL)
+
+    # Remove leading/trailing markdown headers or horizontal lines
+    text = re.sub(r'^#+\s*', '', text, flags=re.MULTILINE)
+    text = re.sub(r'^-{2,}|^_{2,}', '', text, flags=re.MULTILINE)
+
+    # Remove extra spacing and newlines
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = re.sub(r'[ \t]{2,}', ' ', text)
+
+    return text.strip()
+
+
+# --- Resume Extraction ---
+
+def build_extraction_prompt(raw_resume_text):
+    # Ask Gemini to extract key sections into a structured JSON format.
+    # This replaces pyresparser.
+    return f"""
+        Extract the following information from the resume text below and format it as a JSON object.
+        If a section is not found, use an empty string or empty list as appropriate.
+
+        Resume Text:
+        {compact_whitespace(raw_resume_text)}
+
+        JSON Structure:
+        {{
+            "summary": "...",
+            "experience": [
+                {{"title": "...", "company": "...", "duration": "...", "responsibilities": ["...", "..."]}},
+                // more experience entries
+            ],
+            "education": [
+                {{"degree": "...", "university": "...", "year": "..."}},
+                // more education entries
+            ],
+            "skills": ["skill1", "skill2", "..."],
+            "achievements": ["...", "..."],
+            "contact_info": {{"name": "...", "email": "...", "phone": "...", "linkedin": "..."}}
+        }}
+
+        Ensure the output is a valid JSON string.
+        """
+
+
+def parse_extraction(text):
+    """
+    Parse the extraction response, recovering the JSON from a markdown fence or surrounding
+    prose. Raises json.JSONDecodeError on bad output.
+    """
+    return recover_json(text)
+
+
+class ExtractionError(ValueError):
+    """Gemini's extraction response could not be parsed as JSON."""
+
+    def __init__(self, message, raw_text):
+        super().__init__(message)
+        self.raw_text = raw_text
+
+
+def _extraction_without_gemini(raw_resume_text, cache, local_parser_min_confidence):
+    """The cached extraction, or the local parser's if it is confident enough; MISS otherwise."""
+    # The same resume is usually matched against many JDs, so extraction is cached by resume text.
+    if cache is not None:
+        extracted_resume_data = cache.get(cache_key('extraction', raw_resume_text))
+        if extracted_resume_data is not MISS:
+            return extracted_resume_data
+
+    if local_parser_min_confidence is not None:
+        extracted_resume_data, confidence = parse_resume(raw_resume_text)
+        if confidence >= local_parser_min_confidence:
+            logger.debug(f"Local resume parser accepted (confidence {confidence})")
+            return extracted_resume_data
+        logger.debug(f"Local resume parser confidence {confidence} below threshold, using Gemini")
+    return MISS
+
+
+def _parse_extraction_response(text):
+    try:
+        extracted_resume_data = parse_extraction(text)
+        if not isinstance(extracted_resume_data, dict):
+            raise json.JSONDecodeError('Expected a JSON object', text, 0)
+    except json.JSONDecodeError as e:
+        LLM_JSON_PARSE_FAILURES.labels('extraction').inc()
+        raise ExtractionError(str(e), text) from e
+    return extracted_resume_data
+
+
+def extract_resume(model, raw_resume_text, cache=None, local_parser_min_confidence=None):
+    """
+    Structured extraction of the resume, reused from the cache when the same text was seen before.
+    When local_parser_min_confidence is set, the rule-based parser is tried first and Gemini is
+    only called if its confidence falls below that threshold.
+    """
+    extracted_resume_data = _extraction_without_gemini(raw_resume_text, cache, local_parser_min_confidence)
+    if extracted_resume_data is not MISS:
+        return extracted_resume_data
+
+    with llm_stage('extraction'):
+        response = model.generate_content(build_extraction_prompt(raw_resume_text))
+    extracted_resume_data = _parse_extraction_response(response.text)
+
+    if cache is not None:
+        cache.set(cache_key('extraction', raw_resume_text), extracted_resume_data)
+    return extracted_resume_data
+
+
+def flatten_resume(extracted_resume_data):
+    """Pull the summary, experience bullets and skills out of the extracted data."""
+    current_summary = extracted_resume_data.get('summary', '')
+    current_experience_bullets = []
+    for exp in extracted_resume_data.get('experience', []):
+        if 'responsibilities' in exp and isinstance(exp['responsibilities'], list):
+            current_experience_bullets.extend(exp['responsibilities'])
+        elif 'description' in exp: # Sometimes it might be a single description string
+            current_experience_bullets.append(exp['description'])
+
+    current_skills = extracted_resume_data.get('skills', [])
+    return current_summary, current_experience_bullets, current_skills
+
+
+# --- Prompt Templates for Gemini (using extracted data) ---
+
+# 1. Summary Tailoring
+def build_summary_prompt(current_summary, jd_text):
+    return f"""
+        You are an expert resume writer. Rewrite the following resume summary to be highly tailored for the provided job description.
+        Focus on aligning the summary with the key requirements, skills, and overall tone of the job description.
+
+        Current Resume Summary:
+        {current_summary}
+
+        Job Description:
+        {jd_text}
+
+        Rewrite the summary concisely and powerfully, focusing on relevant experience and skills mentioned in the JD.
+        """
+
+
+def parse_summary(text):
+    return clean_gemini_output(text)
+
+
+# 2. Bullet Point Rewriting
+def build_bullets_prompt(current_experience_bullets, jd_text):
+    bullet_lines = '- ' + '\n- '.join(current_experience_bullets)
+    return f"""
+        You are an expert resume writer. Given the following resume experience bullet points and job description,
+        rewrite *each* bullet point to better highlight achievements and skills relevant to the job description.
+        Use strong action verbs and quantifiable results where possible.
+        Return each rewritten bullet point on a new line, starting with an asterisk (*).
+
+        Current Resume Bullet Points:
+        {bullet_lines}
+
+        Job Description:
+        {jd_text}
+        """
+
+
+def parse_bullets(text):
+    # Parse bullet points, assuming Gemini returns them with asterisks
+    improved_bullets = [line.strip() for line in text.split('\n') if line.strip().startswith('*')]
+    if not improved_bullets: # Fallback if Gemini doesn't use asterisks for some reason
+        improved_bullets = [line.strip() for line in text.split('\n') if line.strip()]
+    return improved_bullets
+
+
+# 3. Skill Gap Filler / Suggestion
+def build_skills_prompt(current_skills, jd_text):
+    return f"""
+        You are an expert career coach. Based on the provided job description and the skills currently present in the resume,
+        identify any crucial technical or soft skills that are prominent in the job description but seem
+        missing or under-represented in the resume. Suggest 3-5 such skills that the applicant should consider adding
+        or highlighting.
+
+        Current Resume Skills:
+        {', '.join(current_skills)}
+
+        Job Description:
+        {jd_text}
+
+        List the suggested skills, separated by commas.
+        """
+
+
+def parse_skills(text):
+    suggested_skills_raw = text.strip()
+    return [s.strip() for s in suggested_skills_raw.split(',') if s.strip()]
+
+
+# 4. JD vs Resume Matcher Analysis
+def build_match_prompt(current_summary, current_experience_bullets, current_skills, jd_text):
+    return f"""
+        Analyze the alignment between the provided resume and job description.
+        Identify 2-3 key areas where the resume strongly matches the JD, and 2-3 areas where there might be a "keyword gap" or where the resume could be strengthened to better align.
+
+        Resume Content (Summary, Experience, Skills):
+        Summary: {current_summary}
+        Experience: {current_experience_bullets}
+        Skills: {', '.join(current_skills)}
+
+        Job Description:
+        {jd_text}
+
+        Provide your analysis in two distinct sections: "Strong Matches:" and "Areas for Improvement:".
+        Finally don't mention the key changes and why they were made. That is Irrelevant.
+        """
+
+
+def parse_match_analysis(text):
+    return clean_gemini_output(text)
+
+
+# The extracted fields each tailoring prompt is built from
+SECTION_FIELDS = {
+    'improved_summary': ('summary',),
+    'improved_bullets': ('experience',),
+    'suggested_skills': ('skills',),
+    'match_analysis': ('summary', 'experience', 'skills'),
+}
+
+# Value used for a tailoring section whose Gemini call failed.
+EMPTY_RESULTS = {
+    'improved_summary': '',
+    'improved_bullets': [],
+    'suggested_skills': [],
+    'match_analysis': '',
+}
+
+
+@dataclass
+class TailoringOptions:
+    """Per-request settings for the tailoring stage."""
+    match_mode: str = 'llm'            # 'local' replaces the Gemini match analysis with the keyword matcher
+    bullet_top_k: int = 0              # rewrite only the K bullets most relevant to the JD (0 rewrites all)
+    bullet_min_similarity: float = 0.0
+    compact_jd: bool = True            # strip boilerplate, repeated lines and extra whitespace from the JD in prompts
+    prompt_token_budget: int = 0       # cut the JD (least relevant lines first) so each prompt fits (0: no limit)
+
+    def prompt_settings(self):
+        """The settings that change what a prompt contains for the same inputs (part of its cache key)."""
+        return [self.compact_jd and COMPACTION_VERSION, self.prompt_token_budget]
+
+    def section_settings(self):
+        """
+        Per section, the settings its result depends on besides its inputs and the JD. Stored with
+        each result, so incremental re-tailoring only reuses sections made with the same settings.
+        Bullet selection (top-k, similarity) is left out: bullets are reused one by one.
+        """
+        prompt = self.prompt_settings()
+        return {'improved_summary': prompt, 'improved_bullets': prompt, 'suggested_skills': prompt,
+                'match_analysis': [self.match_mode, *prompt]}
+
+
+def section_cache_key(key, inputs, jd_text, options=None):
+    """Cache key of a tailored section: its extracted inputs, the JD and the prompt settings."""
+    return cache_key(key, inputs, jd_text, (options or TailoringOptions()).prompt_settings())
+
+
+@dataclass
+class TailoringPlan:
+    """
+    What the tailoring stage has to do for one (resume, JD) pair. `prompts` maps each section that
+    still needs Gemini to (prompt, parse, cache inputs); `local` holds sections already computed.
+    `rewrite_indices` are the experience bullets sent for rewriting (the rest pass through).
+    """
+    prompts: dict
+    local: dict = field(default_factory=dict)
+    stats: dict = field(default_factory=dict)
+    merge_bullets: Callable = list
+    rewrite_indices: list = field(default_factory=list)
+
+
+def tailoring_inputs(extracted_resume_data):
+    """The extracted section each tailoring prompt depends on, used (with the JD) as its cache key."""
+    current_summary, current_experience_bullets, current_skills = flatten_resume(extracted_resume_data)
+    return {
+        'improved_summary': current_summary,
+        'improved_bullets': current_experience_bullets,
+        'suggested_skills': current_skills,
+        'match_analysis': [current_summary, current_experience_bullets, current_skills],
+    }
+
+
+def plan_tailoring(extracted_resume_data, jd_text, options=None, sections=SECTION_FIELDS):
+    """The tailoring plan for `sections` (all four by default)."""
+    options = options or TailoringOptions()
+    current_summary, current_experience_bullets, current_skills = flatten_resume(extracted_resume_data)
+    inputs = tailoring_inputs(extracted_resume_data)
+    plan = TailoringPlan(prompts={}, rewrite_indices=list(range(len(current_experience_bullets))))
+
+    # Ranking and the keyword matcher also see the JD without its boilerplate
+    relevant_jd = compact_jd(jd_text) if options.compact_jd else jd_text
+
+    if options.match_mode == 'local' and 'match_analysis' in sections:
+        result = match_resume(resume_text_from_extracted(extracted_resume_data), relevant_jd)
+        plan.local['match_analysis'] = format_match_analysis(result)
+
+    # Only the bullets most relevant to the JD go to Gemini; the rest pass through unchanged
+    bullets_to_rewrite = current_experience_bullets
+    if options.bullet_top_k and current_experience_bullets and 'improved_bullets' in sections:
+        selected, report = rank_bullets(current_experience_bullets, relevant_jd,
+                                        options.bullet_top_k, options.bullet_min_similarity)
+        plan.stats['bullet_ranking'] = report
+        if len(selected) < len(current_experience_bullets):
+            plan.rewrite_indices = list(selected)
+            bullets_to_rewrite = [current_experience_bullets[i] for i in selected]
+            plan.merge_bullets = partial(merge_ranked_bullets, current_experience_bullets, selected)
+            inputs['improved_bullets'] = [current_experience_bullets, selected]
+            if not selected:
+                plan.local['improved_bullets'] = plan.merge_bullets([])
+
+    # Each prompt builder takes the JD last
+    builders = {
+        'improved_summary': (partial(build_summary_prompt, current_summary), parse_summary),
+        'improved_bullets': (partial(build_bullets_prompt, bullets_to_rewrite),
+                             lambda text: plan.merge_bullets(parse_bullets(text))),
+        'suggested_skills': (partial(build_skills_prompt, current_skills), parse_skills),
+        'match_analysis': (partial(build_match_prompt, current_summary, current_experience_bullets, current_skills),
+                           parse_match_analysis),
+    }
+    compaction = {}
+    for key, (build, parse) in builders.items():
+        if key in sections and key not in plan.local:
+            prompt, compaction[key] = prepare_prompt(build, jd_text, options.compact_jd, options.prompt_token_budget)
+            plan.prompts[key] = (prompt, parse, inputs[key])
+    if compaction:
+        plan.stats['prompt_compaction'] = compaction
+    return plan
+
+
+# --- Concurrent fan-out ---
+
+_executors = {}
+_executor_lock = threading.Lock()
+
+
+def get_executor(max_workers, name='gemini', scheduler=None):
+    """
+    Process-wide named thread pool, created on first use. The 'gemini' pool runs interactive
+    tailoring calls and 'gemini-batch' the batch ones, so batch work never queues ahead of
+    interactive calls; their sizes cap concurrent Gemini calls. With a scheduler, tasks waiting
+    for a worker count toward its queue depth.
+    """
+    executor = _executors.get(name)
+    if executor is None:
+        with _executor_lock:
+            executor = _executors.get(name)
+            if executor is None:
+                if scheduler is not None:
+                    executor = SchedulerExecutor(max_workers, scheduler, thread_name_prefix=name)
+                else:
+                    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+                _executors[name] = executor
+    return executor
+
+
+def generate_and_parse(model, prompt, parse, stage):
+    with llm_stage(stage):
+        response = model.generate_content(prompt)
+    return parse(response.text)
+
+
+class _SectionCalls:
+    """The tailoring calls of one request: sections found in the cache are filled in, the rest run on the executor."""
+
+    def __init__(self, model, jd_text, executor, cache, options=None):
+        self.model = model
+        self.jd_text = jd_text
+        self.options = options
+        self.executor = executor
+        self.cache = cache
+        self.results, self.errors = {}, {}
+        self._futures, self._keys = {}, {}
+
+    def start(self, plan):
+        self.results.update(plan.local)
+        for key, (prompt, parse, inputs) in plan.prompts.items():
+            if self.cache is not None:
+                self._keys[key] = section_cache_key(key, inputs, self.jd_text, self.options)
+                cached = self.cache.get(self._keys[key])
+                if cached is not MISS:
+                    self.results[key] = cached
+                    continue
+            # copy_context() carries the request ID into the worker thread's log lines
+            self._futures[key] = self.executor.submit(copy_context().run, generate_and_parse, self.model, prompt,
+                                                      parse, key)
+
+    def cancel(self):
+        for future in self._futures.values():
+            future.cancel()
+
+    def finish(self):
+        for key, future in self._futures.items():
+            try:
+                self.results[key] = future.result()
+            except Exception as e:
+                self.errors[key] = str(e)
+                self.results[key] = copy.copy(EMPTY_RESULTS[key])
+                continue
+            if self.cache is not None:
+                self.cache.set(self._keys[key], self.results[key])
+        return self.results, self.errors
+
+
+def run_tailoring(model, extracted_resume_data, jd_text, executor, cache=None, options=None):
+    """
+    Issue the four tailoring calls in parallel once extraction is done.
+    Returns (results, errors, stats); a failed call leaves its section at the EMPTY_RESULTS
+    value and records the error message instead of failing the other sections.
+    Sections found in the cache are returned without calling Gemini.
+    """
+    plan = plan_tailoring(extracted_resume_data, jd_text, options)
+    calls = _SectionCalls(model, jd_text, executor, cache, options)
+    calls.start(plan)
+    results, errors = calls.finish()
+    return results, errors, plan.stats
+
+
+def _stream_extraction(model, prompt, on_field):
+    """Stream the extraction call, passing each top-level field to on_field as it completes. Returns the full text."""
+    parser = StreamingJSONParser()
+    with llm_stage('extraction'):
+        for chunk in model.generate_content(prompt, stream=True):
+            for name, value in parser.feed(chunk.text):
+                on_field(name, value)
+    return parser.text
+
+
+def run_pipelined(model, raw_resume_text, jd_text, executor, cache=None, options=None,
+                  local_parser_min_confidence=None):
+    """
+    extract_resume followed by run_tailoring, overlapped: the extraction response is streamed
+    and each tailoring call starts as soon as the fields its prompt needs are complete (the
+    summary call once "summary" arrives, the skills call once "skills" closes) rather than after
+    the whole response. Returns (extracted_resume_data, results, errors, stats); raises
+    ExtractionError if no JSON object can be recovered from the extraction response.
+    """
+    extracted_resume_data = _extraction_without_gemini(raw_resume_text, cache, local_parser_min_confidence)
+    if extracted_resume_data is not MISS:
+        return (extracted_resume_data, *run_tailoring(model, extracted_resume_data, jd_text, executor, cache, options))
+
+    options = options or TailoringOptions()
+    calls = _SectionCalls(model, jd_text, executor, cache, options)
+    stats, fields, used = {}, {}, {}
+    # The keyword matcher reads the whole resume, so a local match analysis waits for the full extraction
+    waiting = {key: needed for key, needed in SECTION_FIELDS.items()
+               if not (key == 'match_analysis' and options.match_mode == 'local')}
+
+    def start(extracted, keys):
+        plan = plan_tailoring(extracted, jd_text, options, keys)
+        for name, stat in plan.stats.items():
+            stats.setdefault(name, {}).update(stat)
+        calls.start(plan)
+        for key in keys:
+            used[key] = {name: extracted.get(name) for name in SECTION_FIELDS[key]}
+
+    def on_field(name, value):
+        fields[name] = value
+        ready = [key for key, needed in waiting.items() if all(field in fields for field in needed)]
+        for key in ready:
+            del waiting[key]
+        if ready:
+            start(fields, ready)
+
+    prompt = build_extraction_prompt(raw_resume_text)
+    try:
+        try:
+            text = _stream_extraction(model, prompt, on_field)
+        except Exception as e:
+            # Streamed calls are not retried, so fall back to the regular call before giving up
+            logger.warning(f"Streamed extraction failed, retrying without streaming: {e}")
+            with llm_stage('extraction'):
+                text = model.generate_content(prompt).text
+        extracted_resume_data = _parse_extraction_response(text)
+    except Exception:
+        calls.cancel()
+        raise
+    if cache is not None:
+        cache.set(cache_key('extraction', raw_resume_text), extracted_resume_data)
+
+    # Sections started from streamed fields that the final parse disagrees with are redone
+    stale = [key for key, values in used.items()
+             if values != {name: extracted_resume_data.get(name) for name in SECTION_FIELDS[key]}]
+    stats['pipelined_sections'] = [key for key in used if key not in stale]
+    remaining = stale + [key for key in SECTION_FIELDS if key not in used]
+    if remaining:
+        start(extracted_resume_data, remaining)
+    results, errors = calls.finish()
+    return extracted_resume_data, results, errors, stats
+
+
+# --- Batch matching: one resume against many JDs ---
+
+def run_batch(model, extracted_resume_data, jd_texts, executor, batch_executor, max_in_flight, cache=None,
+              options=None):
+    """
+    Tailor one extracted resume against every JD, yielding (index, results, errors, stats) in completion order.
+    At most max_in_flight JDs are scheduled at once; the next JD is only submitted once an earlier
+    one finishes, so a 100-JD batch never floods the Gemini pool ahead of interactive requests.
+    Closing the generator (e.g. when a streaming client disconnects) stops scheduling JDs; the
+    ones already running finish, but nothing more is sent to Gemini.
+    """
+    slots = threading.BoundedSemaphore(max_in_flight)
+    done = queue.Queue()
+    cancelled = threading.Event()
+    context = copy_context()
+
+    def run(index, jd_text):
+        if cancelled.is_set():
+            slots.release()
+            return
+        try:
+            results, errors, stats = run_tailoring(model, extracted_resume_data, jd_text, executor, cache, options)
+        except Exception as e:
+            results, errors, stats = copy.deepcopy(EMPTY_RESULTS), {key: str(e) for key in EMPTY_RESULTS}, {}
+        finally:
+            slots.release()
+        done.put((index, results, errors, stats))
+
+    def submit_all():
+        for index, jd_text in enumerate(jd_texts):
+            if cancelled.is_set():
+                return
+            slots.acquire()  # Backpressure: wait for a free slot before scheduling the next JD
+            if cancelled.is_set():
+                slots.release()
+                return
+            batch_executor.submit(context.copy().run, run, index, jd_text)
+
+    feeder = threading.Thread(target=submit_all, daemon=True)
+    feeder.start()
+    try:
+        for _ in jd_texts:
+            yield done.get()
+    finally:
+        cancelled.set()
+
+
+# --- Streaming fan-out ---
+
+def _stream_bullets(model, prompt, emit):
+    """Stream the bullet rewrite, emitting each bullet as soon as its line is complete."""
+    buffer = ''
+    lines = []
+    emitted = []
+    for chunk in model.generate_content(prompt, stream=True):
+        buffer += chunk.text
+        *complete, buffer = buffer.split('\n')
+        for line in complete:
+            lines.append(line)
+            if line.strip().startswith('*'):
+                emitted.append(line.strip())
+                emit(line.strip())
+    lines.append(buffer)
+    if buffer.strip().startswith('*'):
+        emitted.append(buffer.strip())
+        emit(buffer.strip())
+
+    if emitted:
+        return emitted
+    # Same fallback as parse_bullets when Gemini doesn't use asterisks
+    fallback = parse_bullets('\n'.join(lines))
+    for bullet in fallback:
+        emit(bullet)
+    return fallback
+
+
+def stream_tailoring(model, extracted_resume_data, jd_text, executor, cache=None, options=None):
+    """
+    Like run_tailoring, but yields (event, data) pairs as each section finishes:
+    one 'bullet' event per rewritten bullet while the bullet call streams, then one event per
+    completed section (named after its response field), or an 'error' event if its call failed.
+    Stage statistics (e.g. 'bullet_ranking') are yielded first as their own events.
+    """
+    plan = plan_tailoring(extracted_resume_data, jd_text, options)
+    events = queue.Queue()
+
+    def run(key, prompt, parse, section_key):
+        try:
+            if key == 'improved_bullets':
+                with llm_stage(key):
+                    rewritten = _stream_bullets(model, prompt, lambda bullet: events.put(('bullet', bullet)))
+                value = plan.merge_bullets(rewritten)
+            else:
+                value = generate_and_parse(model, prompt, parse, key)
+        except Exception as e:
+            events.put(('error', {'section': key, 'error': str(e)}))
+            return
+        if cache is not None:
+            cache.set(section_key, value)
+        events.put((key, value))
+
+    for name, stat in plan.stats.items():
+        yield name, stat
+    for key, value in plan.local.items():
+        yield key, value
+
+    pending = 0
+    for key, (prompt, parse, inputs) in plan.prompts.items():
+        section_key = section_cache_key(key, inputs, jd_text, options)
+        cached = cache.get(section_key) if cache is not None else MISS
+        if cached is not MISS:
+            if key == 'improved_bullets':
+                for bullet in cached:
+                    yield 'bullet', bullet
+            yield key, cached
+            continue
+        executor.submit(copy_context().run, run, key, prompt, parse, section_key)
+        pending += 1
+
+    while pending:
+        event, data = events.get()
+        if event != 'bullet':
+            pending -= 1
+        yield event, data
+
+
+# --- Consolidated (single-call) mode ---
+
+def build_consolidated_prompt(raw_resume_text, jd_text):
+    return f"""
+        You are an expert resume writer and career coach. Using the resume text and job description below, produce:
+
+        1. extracted_resume_data: the resume's summary, experience (title, company, duration, responsibilities),
+           education (degree, university, year), skills, achievements and contact info (name, email, phone, linkedin).
+           If a section is not found, use an empty string or empty list as appropriate.
+        2. improved_summary: the resume summary rewritten concisely and powerfully for this job description.
+        3. improved_bullets: *each* experience responsibility rewritten to highlight achievements and skills relevant
+           to the job description, using strong action verbs and quantifiable results where possible.
+        4. suggested_skills: 3-5 crucial technical or soft skills prominent in the job description but missing or
+           under-represented in the resume.
+        5. match_analysis: 2-3 key areas where the resume strongly matches the JD, and 2-3 areas where there might be
+           a "keyword gap", in two sections titled "Strong Matches:" and "Areas for Improvement:".
+
+        Resume Text:
+        {raw_resume_text}
+
+        Job Description:
+        {jd_text}
+        """
+
+
+CONSOLIDATED_GENERATION_CONFIG = genai.GenerationConfig(
+    response_mime_type='application/json',
+    response_schema=ConsolidatedResult,
+)
+
+
+def _cached_consolidated(raw_resume_text, jd_text, cache, options):
+    extracted_resume_data = cache.get(cache_key('extraction', raw_resume_text))
+    if extracted_resume_data is MISS:
+        return None
+    result = {'extracted_resume_data': extracted_resume_data}
+    for key, section_input in tailoring_inputs(extracted_resume_data).items():
+        result[key] = cache.get(section_cache_key(key, section_input, jd_text, options))
+        if result[key] is MISS:
+            return None
+    return result
+
+
+def run_consolidated(model, raw_resume_text, jd_text, cache=None, options=None):
+    """
+    Ask Gemini once, with a JSON response schema, for extraction plus every tailored section.
+    Raises ExtractionError or pydantic.ValidationError when the output does not match the schema.
+    Only the prompt's JD compaction settings of `options` apply.
+    """
+    options = options or TailoringOptions()
+    if cache is not None:
+        cached = _cached_consolidated(raw_resume_text, jd_text, cache, options)
+        if cached is not None:
+            return cached
+
+    prompt, compaction = prepare_prompt(partial(build_consolidated_prompt, compact_whitespace(raw_resume_text)),
+                                        jd_text, options.compact_jd, options.prompt_token_budget)
+    with llm_stage('consolidated'):
+        response = model.generate_content(prompt, generation_config=CONSOLIDATED_GENERATION_CONFIG)
+    try:
+        result = ConsolidatedResult.model_validate_json(response.text).model_dump()
+    except ValidationError as e:
+        # Tolerate a markdown fence around otherwise valid JSON before giving up
+        try:
+            result = ConsolidatedResult.model_validate(parse_extraction(response.text)).model_dump()
+        except json.JSONDecodeError:
+            LLM_JSON_PARSE_FAILURES.labels('consolidated').inc()
+            raise ExtractionError(str(e), response.text) from e
+    result['match_analysis'] = clean_gemini_output(result['match_analysis'])
+
+    # Seed the per-section cache so multi-call requests for the same inputs can reuse this result
+    if cache is not None:
+        extracted_resume_data = result['extracted_resume_data']
+        cache.set(cache_key('extraction', raw_resume_text), extracted_resume_data)
+        for key, section_input in tailoring_inputs(extracted_resume_data).items():
+            cache.set(section_cache_key(key, section_input, jd_text, options), result[key])
+    result['stats'] = {'prompt_compaction': {'consolidated': compaction}}
+    return result
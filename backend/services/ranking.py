@@ -0,0 +1,106 @@
+# backend/services/ranking.py
+
+# Relevance ranking of experience bullets against a JD, so only the most relevant bullets
+# are sent to Gemini for rewriting and the rest pass through unchanged.
+
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from services.matcher import tokenize
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+# Dimensionality of the hashed bag-of-words fallback used when en_core_web_md is unavailable
+HASHED_DIMENSIONS = 1024
+
+
+def _load_nlp():
+    """en_core_web_md, used only for its static word vectors; None when not installed."""
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                try:
+                    import spacy
+                    _nlp = spacy.load('en_core_web_md')
+                except (ImportError, OSError):
+                    _nlp = False
+    return _nlp or None
+
+
+def embed(texts):
+    """One row per text: the mean spaCy word vector, or a hashed bag of lemmas as a fallback."""
+    nlp = _load_nlp()
+    if nlp is not None:
+        # Doc.vector only needs the tokenizer and the vocab vectors, not the rest of the pipeline
+        return np.array([doc.vector for doc in nlp.tokenizer.pipe(texts, batch_size=256)], dtype=np.float32)
+
+    vectors = np.zeros((len(texts), HASHED_DIMENSIONS), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for token in tokenize(text):
+            vectors[row, zlib.crc32(token.encode('utf-8')) % HASHED_DIMENSIONS] += 1.0
+    return vectors
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def split_sentences(text):
+    """JD sentences/lines with at least three words (drops headings and stray fragments)."""
+    parts = re.split(r'[\n.;•]+', text)
+    return [part.strip() for part in parts if len(part.split()) >= 3]
+
+
+def estimate_tokens(text):
+    """Rough Gemini token estimate (about four characters per token for English)."""
+    return (len(text) + 3) // 4
+
+
+def rank_bullets(bullets, jd_text, top_k, min_similarity=0.0):
+    """
+    Pick the bullets worth rewriting: the top_k by best cosine similarity to any JD sentence,
+    excluding those below min_similarity. Returns (selected indices in original order, report).
+    """
+    started = time.perf_counter()
+    jd_sentences = split_sentences(jd_text) or [jd_text]
+
+    vectors = _normalize_rows(embed(list(bullets) + jd_sentences))
+    similarity = vectors[:len(bullets)] @ vectors[len(bullets):].T
+    scores = similarity.max(axis=1)
+
+    ranked = np.argsort(-scores, kind='stable')[:top_k]
+    selected = sorted(int(i) for i in ranked if scores[i] >= min_similarity)
+
+    chosen = set(selected)
+    skipped = [bullet for i, bullet in enumerate(bullets) if i not in chosen]
+    report = {
+        "total_bullets": len(bullets),
+        "rewritten": len(selected),
+        "passed_through": len(skipped),
+        "ranking_ms": round((time.perf_counter() - started) * 1000, 2),
+        "estimated_tokens_saved": sum(estimate_tokens(f"- {bullet}\n") for bullet in skipped),
+    }
+    return selected, report
+
+
+def merge_ranked_bullets(bullets, selected, rewritten):
+    """
+    Put the rewritten bullets back in their original positions, passing the others through unchanged.
+    If Gemini returned a different number of bullets than it was given, keep its bullets first.
+    """
+    chosen = set(selected)
+    passthrough = {i: f"* {bullet}" for i, bullet in enumerate(bullets) if i not in chosen}
+    if len(rewritten) != len(selected):
+        return list(rewritten) + [passthrough[i] for i in sorted(passthrough)]
+
+    merged = dict(passthrough)
+    merged.update(zip(selected, rewritten))
+    return [merged[i] for i in range(len(bullets))]
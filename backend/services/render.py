@@ -0,0 +1,250 @@
+# backend/services/render.py
+
+# DOCX/PDF rendering of a tailored resume. Styles and base documents are built once per
+# template at import time instead of on every export, and renders are deterministic (no
+# timestamps or random IDs), so identical content always yields identical bytes and can be
+# cached and served with a content-hash ETag. The render functions are plain top-level
+# functions of picklable arguments, so they can also run in a process pool.
+
+import hashlib
+import io
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Inches, Pt
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import ListFlowable, ListItem, Paragraph, SimpleDocTemplate, Spacer
+
+FORMATS = {
+    'docx': ('application/vnd.openxmlformats-officedocument.wordprocessingml.document', 'tailored_resume.docx'),
+    'pdf': ('application/pdf', 'tailored_resume.pdf'),
+}
+
+# The result fields that end up in the rendered document
+RENDER_FIELDS = ('extracted_resume_data', 'improved_summary', 'improved_bullets', 'suggested_skills')
+
+
+@dataclass(frozen=True)
+class Template:
+    name_size: int
+    heading_size: int
+    body_size: int
+    margin_inches: float
+    section_gap_inches: float
+    # DOCX keeps Word's default text and heading sizes unless these are set
+    docx_body_size: Optional[int] = None
+    docx_heading_size: Optional[int] = None
+
+
+TEMPLATES = {
+    'classic': Template(name_size=20, heading_size=14, body_size=10, margin_inches=0.75, section_gap_inches=0.15),
+    'compact': Template(name_size=16, heading_size=12, body_size=9, margin_inches=0.5, section_gap_inches=0.08,
+                        docx_body_size=9, docx_heading_size=12),
+}
+DEFAULT_TEMPLATE = 'classic'
+
+
+def render_key(export_format, template, content):
+    """Canonical hash of everything that determines the rendered bytes."""
+    payload = json.dumps([export_format, template, {field: content.get(field) for field in RENDER_FIELDS}],
+                         sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _document_parts(content):
+    """The pieces both formats lay out, with the same defaults export_resume always used."""
+    extracted = content.get('extracted_resume_data') or {}
+    contact = extracted.get('contact_info') or {}
+    skills = extracted.get('skills') or []
+    return {
+        'name': contact.get('name', 'Applicant Name'),
+        'contact': [part for part in (contact.get('email', ''), contact.get('phone', '')) if part],
+        'linkedin': contact.get('linkedin', ''),
+        'summary': content.get('improved_summary') or '',
+        'bullets': content.get('improved_bullets') or [],
+        'education': extracted.get('education') or [],
+        # Original skills first, then suggestions; de-duplicated in a stable order
+        'skills': list(dict.fromkeys(skills + (content.get('suggested_skills') or []))) if skills else [],
+        'achievements': extracted.get('achievements') or [],
+    }
+
+
+# --- DOCX ---
+
+def _docx_base(template):
+    """An empty document with margins and font sizes applied, saved once and reopened per render."""
+    document = Document()
+    for section in document.sections:
+        section.top_margin = Inches(template.margin_inches)
+        section.bottom_margin = Inches(template.margin_inches)
+        section.left_margin = Inches(template.margin_inches)
+        section.right_margin = Inches(template.margin_inches)
+    if template.docx_body_size:
+        document.styles['Normal'].font.size = Pt(template.docx_body_size)
+    if template.docx_heading_size:
+        document.styles['Heading 2'].font.size = Pt(template.docx_heading_size)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+_DOCX_BASES = {name: _docx_base(template) for name, template in TEMPLATES.items()}
+
+
+def render_docx(content, template=DEFAULT_TEMPLATE):
+    parts = _document_parts(content)
+    document = Document(io.BytesIO(_DOCX_BASES[template]))
+
+    # 1. Contact Info (Header-like)
+    header_para = document.add_paragraph()
+    header_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    runner = header_para.add_run(parts['name'])
+    runner.bold = True
+    runner.font.size = Pt(TEMPLATES[template].name_size)
+
+    contact_info_para = document.add_paragraph()
+    contact_info_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    contact_info_para.add_run(" | ".join(parts['contact'] + ([parts['linkedin']] if parts['linkedin'] else [])))
+
+    document.add_paragraph().add_run().add_break()
+
+    # 2. Summary
+    if parts['summary']:
+        document.add_heading('Summary', level=2)
+        document.add_paragraph(parts['summary'])
+        document.add_paragraph().add_run().add_break()
+
+    # 3. Experience
+    if parts['bullets']:
+        document.add_heading('Experience', level=2)
+        for bullet in parts['bullets']:
+            p = document.add_paragraph(style='List Bullet')
+            p.add_run(bullet.lstrip('* ').strip())
+        document.add_paragraph().add_run().add_break()
+
+    # 4. Education (from original extracted data)
+    if parts['education']:
+        document.add_heading('Education', level=2)
+        for edu in parts['education']:
+            edu_para = document.add_paragraph()
+            edu_para.add_run(f"{edu.get('degree', '')}").bold = True
+            edu_para.add_run(f", {edu.get('university', '')}")
+            if edu.get('year'):
+                edu_para.add_run(f", {edu.get('year', '')}")
+        document.add_paragraph().add_run().add_break()
+
+    # 5. Skills (original skills blended with the suggested ones)
+    if parts['skills']:
+        document.add_heading('Skills', level=2)
+        document.add_paragraph(", ".join(parts['skills']))
+        document.add_paragraph().add_run().add_break()
+
+    # 6. Achievements (from original extracted data, if present)
+    if parts['achievements']:
+        document.add_heading('Achievements', level=2)
+        for achievement in parts['achievements']:
+            p = document.add_paragraph(style='List Bullet')
+            p.add_run(achievement.strip())
+        document.add_paragraph().add_run().add_break()
+
+    byte_io = io.BytesIO()
+    document.save(byte_io)
+    return byte_io.getvalue()
+
+
+# --- PDF ---
+
+def _pdf_styles(template):
+    styles = getSampleStyleSheet()
+    body_leading = template.body_size + 2
+    return {
+        'name': ParagraphStyle('NameStyle', parent=styles['h1'], fontName='Helvetica-Bold',
+                               fontSize=template.name_size, leading=template.name_size + 4,
+                               alignment=TA_CENTER, spaceAfter=6),
+        'contact': ParagraphStyle('ContactStyle', parent=styles['Normal'], fontName='Helvetica',
+                                  fontSize=template.body_size, leading=body_leading,
+                                  alignment=TA_CENTER, spaceAfter=12),
+        'heading': ParagraphStyle('SectionHeading', parent=styles['h2'], fontName='Helvetica-Bold',
+                                  fontSize=template.heading_size, leading=template.heading_size + 2,
+                                  alignment=TA_LEFT, spaceAfter=8, spaceBefore=12),
+        'body': ParagraphStyle('BodyText', parent=styles['Normal'], fontName='Helvetica',
+                               fontSize=template.body_size, leading=body_leading,
+                               alignment=TA_LEFT, spaceAfter=6),
+    }
+
+
+_PDF_STYLES = {name: _pdf_styles(template) for name, template in TEMPLATES.items()}
+
+
+def render_pdf(content, template=DEFAULT_TEMPLATE):
+    parts = _document_parts(content)
+    styles = _PDF_STYLES[template]
+    margin = TEMPLATES[template].margin_inches * inch
+    gap = TEMPLATES[template].section_gap_inches * inch
+
+    byte_io = io.BytesIO()
+    # invariant: no creation timestamp or random document ID, so the same content gives the same bytes
+    doc = SimpleDocTemplate(byte_io, pagesize=letter, leftMargin=margin, rightMargin=margin,
+                            topMargin=margin, bottomMargin=margin, invariant=True)
+    story = []
+
+    # 1. Contact Info (Header-like)
+    story.append(Paragraph(parts['name'], styles['name']))
+    contact_parts = list(parts['contact'])
+    if parts['linkedin']:
+        contact_parts.append(f"<link href='{parts['linkedin']}'>{parts['linkedin']}</link>")
+    story.append(Paragraph(" | ".join(contact_parts), styles['contact']))
+    story.append(Spacer(1, gap))
+
+    # 2. Summary
+    if parts['summary']:
+        story.append(Paragraph("SUMMARY", styles['heading']))
+        story.append(Paragraph(parts['summary'], styles['body']))
+        story.append(Spacer(1, gap))
+
+    # 3. Experience
+    if parts['bullets']:
+        story.append(Paragraph("EXPERIENCE", styles['heading']))
+        bullet_items = [ListItem(Paragraph(bullet.lstrip('* ').strip(), styles['body'])) for bullet in parts['bullets']]
+        story.append(ListFlowable(bullet_items, bulletType='bullet', start='bullet', leftIndent=0.2*inch))
+        story.append(Spacer(1, gap))
+
+    # 4. Education
+    if parts['education']:
+        story.append(Paragraph("EDUCATION", styles['heading']))
+        for edu in parts['education']:
+            edu_text = f"<b>{edu.get('degree', '')}</b>, {edu.get('university', '')}"
+            if edu.get('year'):
+                edu_text += f", {edu.get('year', '')}"
+            story.append(Paragraph(edu_text, styles['body']))
+        story.append(Spacer(1, gap))
+
+    # 5. Skills
+    if parts['skills']:
+        story.append(Paragraph("SKILLS", styles['heading']))
+        story.append(Paragraph(", ".join(parts['skills']), styles['body']))
+        story.append(Spacer(1, gap))
+
+    # 6. Achievements (from original extracted data, if present)
+    if parts['achievements']:
+        story.append(Paragraph("ACHIEVEMENTS", styles['heading']))
+        bullet_items = [ListItem(Paragraph(ach.strip(), styles['body'])) for ach in parts['achievements']]
+        story.append(ListFlowable(bullet_items, bulletType='bullet', start='bullet', leftIndent=0.2*inch))
+        story.append(Spacer(1, gap))
+
+    doc.build(story)
+    return byte_io.getvalue()
+
+
+RENDERERS = {'docx': render_docx, 'pdf': render_pdf}
+
+
+def render_resume(export_format, template, content):
+    """Rendered document bytes for one of FORMATS and TEMPLATES."""
+    return RENDERERS[export_format](content, template)
@@ -0,0 +1,93 @@
+# backend/services/results.py
+
+# Server-side copies of improve results, so clients can export a result by its ID (plus a
+# small diff of their edits) instead of posting the whole extracted resume back, or re-tailor
+# incrementally from it (services/incremental.py).
+
+import uuid
+
+from services.cache import MISS, LRUCache, MongoCache, SQLiteCache, TieredCache
+
+# The parts of an improve response that export needs
+RESULT_FIELDS = ('extracted_resume_data', 'improved_summary', 'improved_bullets', 'suggested_skills',
+                 'match_analysis')
+
+
+def save_result(store, response, resume_text=None, jd_text=None, options=None):
+    """
+    Store the exportable parts of an improve response, plus the texts and tailoring options it
+    was made from (used to diff a later incremental improve against it); returns the new result ID.
+    """
+    result_id = uuid.uuid4().hex
+    result = {field: response.get(field) for field in RESULT_FIELDS}
+    result['inputs'] = {'resume_text': resume_text, 'jd_text': jd_text,
+                        'settings': options.section_settings() if options is not None else None}
+    store.set(f"result:{result_id}", result)
+    return result_id
+
+
+def load_result(store, result_id):
+    """The stored result (shared, do not mutate), or None if it is unknown or expired."""
+    result = store.get(f"result:{result_id}")
+    return None if result is MISS else result
+
+
+def _merge(base, patch):
+    merged = dict(base or {})
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def apply_edits(result, edits):
+    """
+    A copy of `result` with the user's edits applied. Top-level fields are replaced, except:
+    `extracted_resume_data` is merged recursively (e.g. {"contact_info": {"phone": ...}}), and
+    `improved_bullets` may be a {"<index>": text or null} map to change or drop single bullets.
+    Raises ValueError for edits that do not fit the result.
+    """
+    unknown = set(edits) - set(RESULT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields in edits: {', '.join(sorted(unknown))}.")
+
+    edited = dict(result)
+    for field, value in edits.items():
+        if field == 'extracted_resume_data':
+            if not isinstance(value, dict):
+                raise ValueError("extracted_resume_data edits must be an object.")
+            edited[field] = _merge(result.get(field), value)
+        elif field == 'improved_bullets' and isinstance(value, dict):
+            bullets = list(result.get(field) or [])
+            for index, text in value.items():
+                if not str(index).isdigit() or int(index) >= len(bullets):
+                    raise ValueError(f"No improved bullet at index {index}.")
+                bullets[int(index)] = text
+            edited[field] = [bullet for bullet in bullets if bullet is not None]
+        else:
+            edited[field] = value
+    return edited
+
+
+def build_result_store(config):
+    """Result storage described by RESULT_STORE: an in-process LRU in front of mongo or sqlite."""
+    memory = LRUCache(max_entries=config['RESULT_CACHE_MAX_ENTRIES'], ttl=config['RESULT_TTL_SECONDS'],
+                      max_bytes=config['RESULT_CACHE_MAX_BYTES'])
+    kind = config['RESULT_STORE']
+    if kind == 'mongo':
+        import pymongo
+        persistent = MongoCache(pymongo.MongoClient(config['MONGO_URI']).get_default_database()['results'],
+                                ttl=config['RESULT_TTL_SECONDS'])
+    elif kind == 'mongomock':
+        import mongomock
+        persistent = MongoCache(mongomock.MongoClient()['resume_improver_db']['results'],
+                                ttl=config['RESULT_TTL_SECONDS'])
+    elif kind == 'sqlite':
+        persistent = SQLiteCache(config['RESULT_SQLITE_PATH'], ttl=config['RESULT_TTL_SECONDS'])
+    elif kind == 'memory':
+        persistent = None
+    else:
+        raise ValueError(f"Unsupported RESULT_STORE {kind!r}; use 'mongo', 'mongomock', 'sqlite' or 'memory'.")
+    return TieredCache(memory, persistent)
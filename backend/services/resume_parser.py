@@ -0,0 +1,237 @@
+# backend/services/resume_parser.py
+
+# Deterministic fast-path parser for cleanly formatted resumes. Produces the same structure as
+# the Gemini extraction prompt, plus a confidence score used to decide whether Gemini is needed.
+
+import re
+
+SECTION_HEADINGS = {
+    'summary': ('summary', 'professional summary', 'profile', 'professional profile', 'objective',
+                'career objective', 'about me', 'about'),
+    'experience': ('experience', 'work experience', 'professional experience', 'employment',
+                   'employment history', 'work history', 'career history', 'relevant experience'),
+    'education': ('education', 'academic background', 'education and training', 'academics',
+                  'qualifications', 'educational background'),
+    'skills': ('skills', 'technical skills', 'core skills', 'key skills', 'core competencies',
+               'competencies', 'skills and tools', 'technologies', 'tools and technologies'),
+    'achievements': ('achievements', 'awards', 'accomplishments', 'honors', 'honours',
+                     'awards and achievements', 'key achievements'),
+    # Recognised so their lines are not attributed to the previous section
+    'other': ('projects', 'certifications', 'certificates', 'publications', 'languages', 'interests',
+              'hobbies', 'volunteering', 'volunteer experience', 'references', 'activities'),
+}
+_HEADING_LOOKUP = {name: section for section, names in SECTION_HEADINGS.items() for name in names}
+
+EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+PHONE_RE = re.compile(r'\+?\(?\d[\d\s().-]{7,}\d')
+LINKEDIN_RE = re.compile(r'(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/in/[\w-]+/?', re.IGNORECASE)
+
+_MONTH = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?'
+_DATE = rf'(?:{_MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}})'
+DATE_RANGE_RE = re.compile(rf'({_DATE})\s*(?:-|–|—|to)\s*({_DATE}|present|current|now|today)', re.IGNORECASE)
+YEAR_RE = re.compile(r'\b(?:19|20)\d{2}\b')
+
+BULLET_RE = re.compile(r'^\s*(?:[•●▪◦‣∙·*\-–—]|\d{1,2}[.)])\s+')
+DEGREE_RE = re.compile(
+    r"\b(?:bachelor|master|doctor|associate|diploma|ph\.?\s?d|mba|b\.?\s?s\.?c?|m\.?\s?s\.?c?|b\.?\s?a|m\.?\s?a|"
+    r"b\.?\s?tech|m\.?\s?tech|b\.?\s?e|m\.?\s?e|b\.?\s?eng|m\.?\s?eng|b\.?\s?ed|m\.?\s?ed|bba|bca|mca)\b\.?",
+    re.IGNORECASE,
+)
+INSTITUTION_RE = re.compile(r'\b(?:university|college|institute|school|academy|polytechnic)\b', re.IGNORECASE)
+# State/country codes ("MD", "UK") mark the parts before them as a location, not part of a name
+REGION_CODE_RE = re.compile(r'^[A-Z]{2,3}$')
+# Credentials after a name: "Jane Doe, RN", "John Smith, PhD"
+POSTNOMINAL_RE = re.compile(r',\s*[A-Z][A-Za-z.]{1,5}(?:,\s*[A-Z][A-Za-z.]{1,5})*$')
+_SEPARATORS_RE = re.compile(r'\s+(?:\||@|at|-|–|—)\s+|,\s+')
+
+
+def _heading(line):
+    """Section name if the line is a heading like 'WORK EXPERIENCE' or 'Skills:', else None."""
+    candidate = line.strip().strip(':').strip()
+    if not candidate or len(candidate) > 40:
+        return None
+    return _HEADING_LOOKUP.get(re.sub(r'\s+', ' ', candidate.replace('&', 'and')).lower())
+
+
+def _strip_bullet(line):
+    return BULLET_RE.sub('', line).strip()
+
+
+def _split_sections(lines):
+    sections = {'header': []}
+    current = 'header'
+    for line in lines:
+        section = _heading(line)
+        if section:
+            current = section
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return sections
+
+
+def _parse_contact(text, header_lines):
+    email = EMAIL_RE.search(text)
+    linkedin = LINKEDIN_RE.search(text)
+    phone = None
+    for match in PHONE_RE.finditer(text):
+        # Skip date ranges like "2019 - 2021" that look like phone numbers
+        if 9 <= len(re.sub(r'\D', '', match.group())) <= 15:
+            phone = match
+            break
+
+    name = ''
+    for line in header_lines[:5]:
+        line = POSTNOMINAL_RE.sub('', line.strip())
+        words = line.split()
+        if (2 <= len(words) <= 4 and not EMAIL_RE.search(line) and not any(ch.isdigit() for ch in line)
+                and all(word[0].isupper() for word in words if word[0].isalpha())):
+            name = line.strip()
+            break
+
+    return {
+        "name": name,
+        "email": email.group() if email else '',
+        "phone": phone.group().strip() if phone else '',
+        "linkedin": linkedin.group() if linkedin else '',
+    }
+
+
+def _split_title_company(header):
+    parts = [part.strip(' ,|') for part in _SEPARATORS_RE.split(header) if part and part.strip(' ,|')]
+    if not parts:
+        return '', ''
+    if len(parts) > 3 and REGION_CODE_RE.match(parts[-1]):
+        parts = parts[:-2]  # "Lincoln High School, Portland, OR": a city and state, not the company
+    return parts[0], ', '.join(parts[1:])
+
+
+def _parse_experience(lines):
+    """Returns (entries, number of lines that could not be attributed to any entry)."""
+    entries = []
+    pending_header = []
+    current = None
+    dropped = 0
+    for line in lines:
+        stripped = line.strip()
+        date_match = DATE_RANGE_RE.search(line)
+        if date_match:
+            header_text = (line[:date_match.start()] + line[date_match.end():]).strip(' ,|()–—-')
+            header_text = ' | '.join(pending_header + ([header_text] if header_text else []))
+            title, company = _split_title_company(header_text)
+            current = {"title": title, "company": company, "duration": date_match.group().strip(),
+                       "responsibilities": []}
+            entries.append(current)
+            pending_header = []
+        elif BULLET_RE.match(line) and current is not None:
+            current["responsibilities"].append(_strip_bullet(line))
+        elif current is not None and current["responsibilities"] and (stripped[:1].islower() or line[:1].isspace()):
+            # Wrapped continuation of the previous bullet
+            current["responsibilities"][-1] += ' ' + stripped
+        else:
+            pending_header.append(stripped)
+            if len(pending_header) > 2:
+                # Free-text lines under a role are responsibilities, not the next role's header
+                if current is not None:
+                    current["responsibilities"].append(pending_header.pop(0))
+                else:
+                    pending_header.pop(0)
+                    dropped += 1
+    if current is not None:
+        current["responsibilities"].extend(pending_header)
+    else:
+        dropped += len(pending_header)
+    return entries, dropped
+
+
+def _is_campus(parts, index):
+    """Whether parts[index] continues the institution name before it rather than starting a location."""
+    if index >= len(parts):
+        return False
+    part = parts[index]
+    if YEAR_RE.search(part) or DEGREE_RE.search(part) or INSTITUTION_RE.search(part) or REGION_CODE_RE.match(part):
+        return False
+    if len(part.split()) > 3 or not all(word[0].isupper() for word in part.split()):
+        return False
+    # "Johns Hopkins University, Baltimore, MD" is a city and state
+    return not (index + 1 < len(parts) and REGION_CODE_RE.match(parts[index + 1]))
+
+
+def _parse_education(lines):
+    entries = []
+    current = None
+    for line in lines:
+        text = _strip_bullet(line)
+        degree = DEGREE_RE.search(text)
+        institution = INSTITUTION_RE.search(text)
+        if degree or (institution and (current is None or current["university"])):
+            current = {"degree": '', "university": '', "year": ''}
+            entries.append(current)
+        if current is None:
+            continue
+        parts = [part.strip() for part in re.split(r',|\||–|—|\s-\s', text) if part.strip()]
+        for index, part in enumerate(parts):
+            if YEAR_RE.search(part) and not current["year"]:
+                current["year"] = YEAR_RE.findall(part)[-1]
+            elif INSTITUTION_RE.search(part) and not current["university"]:
+                current["university"] = YEAR_RE.sub('', part).strip(' ()')
+                if _is_campus(parts, index + 1):
+                    # "University of California, Berkeley": the campus belongs to the name
+                    current["university"] += ', ' + parts[index + 1]
+            elif DEGREE_RE.search(part) and not current["degree"]:
+                current["degree"] = part
+    return entries
+
+
+def _parse_skills(lines):
+    skills = []
+    for line in lines:
+        text = _strip_bullet(line)
+        if ':' in text:
+            text = text.split(':', 1)[1]  # "Languages: Python, Go" -> "Python, Go"
+        for skill in re.split(r'[,;|•·]', text):
+            skill = skill.strip(' .')
+            if skill and len(skill) <= 50 and skill not in skills:
+                skills.append(skill)
+    return skills
+
+
+def parse_resume(text):
+    """
+    Parse resume text into the extraction JSON structure.
+    Returns (data, confidence) where confidence in [0, 1] reflects how many sections were
+    confidently recognised; low-confidence results should go to Gemini instead.
+    """
+    lines = [line.rstrip() for line in text.replace('\r', '').split('\n') if line.strip()]
+    sections = _split_sections(lines)
+
+    summary_lines = sections.get('summary', [])
+    experience, dropped_lines = _parse_experience(sections.get('experience', []))
+    education = _parse_education(sections.get('education', []))
+    skills = _parse_skills(sections.get('skills', []))
+    achievements = [_strip_bullet(line) for line in sections.get('achievements', [])]
+    contact_info = _parse_contact('\n'.join(sections['header'] + summary_lines), sections['header'] or lines)
+
+    data = {
+        "summary": ' '.join(line.strip() for line in summary_lines),
+        "experience": experience,
+        "education": education,
+        "skills": skills,
+        "achievements": achievements,
+        "contact_info": contact_info,
+    }
+
+    # Each signal is a structural feature a well-formatted resume should have
+    experience_lines = len(sections.get('experience', []))
+    signals = [
+        (0.10, bool(contact_info["email"] or contact_info["phone"])),
+        (0.10, bool(contact_info["name"])),
+        (0.10, bool(data["summary"])),
+        (0.25, bool(experience) and all(entry["title"] for entry in experience)),
+        (0.15, bool(experience) and all(entry["responsibilities"] for entry in experience)),
+        (0.10, bool(experience_lines) and dropped_lines <= 0.2 * experience_lines),
+        (0.10, bool(education) and all(entry["degree"] or entry["university"] for entry in education)),
+        (0.10, bool(skills)),
+    ]
+    confidence = round(sum(weight for weight, ok in signals if ok), 2)
+    return data, confidence
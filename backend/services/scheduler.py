@@ -0,0 +1,221 @@
+# backend/services/scheduler.py
+
+# Process-wide admission control for Gemini calls: token buckets for the RPM/TPM quota, a
+# priority queue so interactive requests go ahead of batch work, queue-depth limits that turn
+# overload into a 429, and singleflight coalescing of identical in-flight prompts. Calls still
+# waiting for a worker in a SchedulerExecutor pool count toward the queue depth too.
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+INTERACTIVE = 'interactive'
+BATCH = 'batch'
+PRIORITIES = {INTERACTIVE: 0, BATCH: 1}
+
+
+class SchedulerOverloaded(Exception):
+    """Too many Gemini calls are already queued; the caller should retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Too many AI requests in progress; retry in {retry_after:.0f}s.")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Refills at `rate` units per second up to `capacity`. Not thread-safe; the scheduler holds the lock."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._level = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount):
+        """Seconds until `amount` units are available (0 if they are available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self._level >= amount:
+            return 0.0
+        return (amount - self._level) / self.rate
+
+    def consume(self, amount):
+        self._refill()
+        self._level -= min(amount, self.capacity)
+
+
+class Scheduler:
+    """
+    Callers block in acquire() until both the request and the token bucket allow their call.
+    Waiters are served strictly by priority, then arrival order. A caller is rejected with
+    SchedulerOverloaded when its priority's queue-depth limit is already reached; the depth
+    counts both callers waiting here and tasks waiting for a worker in a SchedulerExecutor.
+    """
+
+    def __init__(self, requests_per_minute=0, tokens_per_minute=0, max_queue_depth=None):
+        # A rate of 0 disables that bucket
+        self._buckets = []
+        if requests_per_minute:
+            self._requests = TokenBucket(requests_per_minute / 60.0, max(1, requests_per_minute // 6))
+            self._buckets.append(('requests', self._requests))
+        if tokens_per_minute:
+            self._tokens = TokenBucket(tokens_per_minute / 60.0, max(1, tokens_per_minute // 6))
+            self._buckets.append(('tokens', self._tokens))
+        self.requests_per_minute = requests_per_minute
+        # {priority name: deepest queue that still admits callers of that priority}
+        self.max_queue_depth = max_queue_depth or {}
+        self._queue = []
+        self._held = 0  # Tasks submitted to a SchedulerExecutor that have not started yet
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self.counters = {'admitted': 0, 'rejected': 0, 'waited': 0}
+
+    def _retry_after(self):
+        if self.requests_per_minute:
+            return max(1.0, self._depth() * 60.0 / self.requests_per_minute)
+        return 1.0
+
+    def _depth(self):
+        return len(self._queue) + self._held
+
+    def _check_depth(self, priority):
+        limit = self.max_queue_depth.get(priority)
+        if limit is not None and self._depth() >= limit:
+            self.counters['rejected'] += 1
+            raise SchedulerOverloaded(self._retry_after())
+
+    def check_capacity(self, priority=INTERACTIVE):
+        """Raise SchedulerOverloaded if a new caller of this priority would be rejected."""
+        with self._cond:
+            self._check_depth(priority)
+
+    def hold(self):
+        with self._cond:
+            self._held += 1
+
+    def release_hold(self):
+        with self._cond:
+            self._held -= 1
+
+    def _wait_time(self, estimated_tokens):
+        waits = [0.0]
+        for name, bucket in self._buckets:
+            waits.append(bucket.wait_time(1 if name == 'requests' else estimated_tokens))
+        return max(waits)
+
+    def acquire(self, estimated_tokens=0, priority=INTERACTIVE):
+        with self._cond:
+            # The depth limit applies even when no rate limit is configured
+            self._check_depth(priority)
+            if not self._buckets:
+                self.counters['admitted'] += 1
+                return
+
+            entry = (PRIORITIES[priority], next(self._sequence))
+            heapq.heappush(self._queue, entry)
+            waited = False
+            try:
+                while True:
+                    if self._queue[0] == entry:
+                        delay = self._wait_time(estimated_tokens)
+                        if delay == 0:
+                            for name, bucket in self._buckets:
+                                bucket.consume(1 if name == 'requests' else estimated_tokens)
+                            break
+                        waited = True
+                        self._cond.wait(timeout=delay)
+                    else:
+                        waited = True
+                        self._cond.wait()
+            finally:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+            self.counters['admitted'] += 1
+            if waited:
+                self.counters['waited'] += 1
+
+    def stats(self):
+        with self._cond:
+            return {**self.counters, 'queued': len(self._queue), 'waiting_for_worker': self._held}
+
+
+class _Hold:
+    """One task's place in the scheduler's queue depth, given up once when it starts or is cancelled."""
+
+    def __init__(self, scheduler):
+        self._scheduler = scheduler
+        self._lock = threading.Lock()
+        self._held = True
+        scheduler.hold()
+
+    def release(self, future=None):
+        with self._lock:
+            if not self._held:
+                return
+            self._held = False
+        self._scheduler.release_hold()
+
+    def run(self, fn, *args, **kwargs):
+        self.release()
+        return fn(*args, **kwargs)
+
+
+class SchedulerExecutor(ThreadPoolExecutor):
+    """
+    Thread pool for Gemini calls whose queued tasks count toward the scheduler's queue depth,
+    so a backlog in the pool turns new requests away with a 429 like a backlog of callers does.
+    """
+
+    def __init__(self, max_workers, scheduler, thread_name_prefix=''):
+        super().__init__(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self.scheduler = scheduler
+
+    def submit(self, fn, /, *args, **kwargs):
+        hold = _Hold(self.scheduler)
+        try:
+            future = super().submit(hold.run, fn, *args, **kwargs)
+        except BaseException:
+            hold.release()
+            raise
+        future.add_done_callback(hold.release)
+        return future
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one execution of fn and its result (or error)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
@@ -0,0 +1,44 @@
+# backend/services/schemas.py
+
+# Typed shapes of the Gemini structured output. These double as the `response_schema`
+# sent to Gemini, so fields deliberately have no defaults (Gemini's Schema has no "default").
+
+from pydantic import BaseModel
+
+
+class ExperienceEntry(BaseModel):
+    title: str
+    company: str
+    duration: str
+    responsibilities: list[str]
+
+
+class EducationEntry(BaseModel):
+    degree: str
+    university: str
+    year: str
+
+
+class ContactInfo(BaseModel):
+    name: str
+    email: str
+    phone: str
+    linkedin: str
+
+
+class ExtractedResume(BaseModel):
+    summary: str
+    experience: list[ExperienceEntry]
+    education: list[EducationEntry]
+    skills: list[str]
+    achievements: list[str]
+    contact_info: ContactInfo
+
+
+class ConsolidatedResult(BaseModel):
+    """Extraction plus every tailored section, produced by a single Gemini call."""
+    extracted_resume_data: ExtractedResume
+    improved_summary: str
+    improved_bullets: list[str]
+    suggested_skills: list[str]
+    match_analysis: str
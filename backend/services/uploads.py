@@ -0,0 +1,48 @@
+# backend/services/uploads.py
+
+# Extracted text of uploaded files, keyed by the SHA-256 of the raw bytes. The same resume is
+# uploaded again and again (retries, new tailoring sessions, several recruiters); with this
+# cache only the first upload is parsed, and clients that kept the hash can send it instead
+# of the file.
+
+import hashlib
+import re
+
+from services.cache import MISS, LRUCache, SQLiteCache, TieredCache
+
+_HASH = re.compile(r'[0-9a-f]{64}')
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def valid_hash(value):
+    return isinstance(value, str) and _HASH.fullmatch(value) is not None
+
+
+def _key(digest):
+    return f"upload:{digest}"
+
+
+def load_upload(cache, digest):
+    """The cached extraction for a content hash ({"file_type", "filename", "text", ...}), or None."""
+    entry = cache.get(_key(digest))
+    return None if entry is MISS else entry
+
+
+def save_upload(cache, digest, entry):
+    cache.set(_key(digest), entry)
+
+
+def build_upload_cache(config):
+    """An in-process LRU bounded by entries and bytes, in front of an optional sqlite file."""
+    memory = LRUCache(
+        max_entries=config['UPLOAD_CACHE_MAX_ENTRIES'],
+        ttl=config['UPLOAD_CACHE_TTL_SECONDS'],
+        max_bytes=config['UPLOAD_CACHE_MAX_BYTES'],
+    )
+    persistent = None
+    if config.get('UPLOAD_CACHE_SQLITE_PATH'):
+        persistent = SQLiteCache(config['UPLOAD_CACHE_SQLITE_PATH'], ttl=config['UPLOAD_CACHE_TTL_SECONDS'])
+    return TieredCache(memory, persistent)
@@ -0,0 +1,62 @@
+# backend/tests/test_compaction.py
+
+# The token budget may only cut the JD so far: tailoring a long resume against a JD cut down
+# to its title would return rewrites that ignore the job entirely.
+
+from functools import partial
+
+from services.compaction import MIN_JD_SHARE, prepare_prompt
+from services.pipeline import build_bullets_prompt
+from services.ranking import estimate_tokens
+
+JD = """Senior Backend Engineer
+
+About Us:
+We are a fast-growing fintech company on a mission to make payments simple for everyone.
+
+Responsibilities:
+- Design and operate distributed services in Python and Go
+- Own the reliability of the payments platform and its on-call rotation
+- Mentor engineers and lead design reviews
+
+Requirements:
+- 5+ years building backend systems at scale
+- Experience with Kubernetes, Kafka and PostgreSQL
+- Strong observability practice with Prometheus and Grafana
+
+Benefits:
+- Unlimited PTO and a home office stipend
+"""
+BUDGET = 4000
+
+
+def _bullets(count):
+    return [f"Shipped feature {i} of the internal tooling platform, cutting manual work for the operations team"
+            for i in range(count)]
+
+
+def test_short_resume_prompt_fits_budget():
+    prompt, report = prepare_prompt(partial(build_bullets_prompt, _bullets(5)), JD, token_budget=BUDGET)
+    assert report['prompt_tokens'] <= BUDGET
+    assert 'Kubernetes, Kafka and PostgreSQL' in prompt
+    assert 'Unlimited PTO' not in prompt
+
+
+def test_long_resume_keeps_jd_requirements():
+    build = partial(build_bullets_prompt, _bullets(180))
+    assert estimate_tokens(build('')) > BUDGET
+    prompt, _ = prepare_prompt(build, JD, token_budget=BUDGET)
+    jd = prompt.split('Job Description:', 1)[1]
+    assert 'Requirements:' in jd
+    assert 'Kubernetes, Kafka and PostgreSQL' in jd
+    assert 'Design and operate distributed services' in jd
+
+
+def test_long_jd_is_cut_to_its_minimum_share():
+    jd = JD + '\n'.join(f"- Nice to have: familiarity with internal system number {i} and its quirks"
+                        for i in range(400))
+    build = partial(build_bullets_prompt, _bullets(180))
+    prompt, _ = prepare_prompt(build, jd, token_budget=BUDGET)
+    kept = prompt.split('Job Description:', 1)[1]
+    assert estimate_tokens(kept) <= BUDGET * MIN_JD_SHARE + 50
+    assert 'Senior Backend Engineer' in kept
@@ -0,0 +1,53 @@
+# backend/tests/test_resume_parser.py
+
+# The rule-based parser only replaces Gemini extraction for resumes whose confidence reaches
+# LOCAL_PARSER_MIN_CONFIDENCE, so every resume it accepts must agree with the hand-labelled
+# reference extraction field by field: both the resumes the parser was tuned on
+# (benchmarks/corpus/resumes) and ones held out of tuning (benchmarks/corpus/heldout).
+
+import pytest
+
+from benchmarks.parser_benchmark import HELDOUT_DIR, load_corpus, score
+from config import Config
+from services.resume_parser import parse_resume
+
+TUNING = load_corpus()
+HELDOUT = load_corpus(HELDOUT_DIR)
+CORPUS = TUNING + HELDOUT
+MIN_FIELD_AGREEMENT = {
+    'contact': 1.0,
+    'summary': 0.9,
+    'experience': 1.0,
+    'bullets': 0.9,
+    'education': 1.0,
+    'skills': 0.9,
+}
+
+
+@pytest.mark.parametrize('name, text, reference', CORPUS, ids=[name for name, _, _ in CORPUS])
+def test_accepted_resumes_match_reference(name, text, reference):
+    parsed, confidence = parse_resume(text)
+    if confidence < Config.LOCAL_PARSER_MIN_CONFIDENCE:
+        pytest.skip(f"{name} goes to Gemini (confidence {confidence})")
+    scores = score(parsed, reference)
+    for field, minimum in MIN_FIELD_AGREEMENT.items():
+        assert scores[field] >= minimum, f"{field}: {scores[field]} < {minimum}"
+
+
+@pytest.mark.parametrize('corpus', [TUNING, HELDOUT], ids=['tuning', 'heldout'])
+def test_corpus_has_rejected_resumes(corpus):
+    # The gate has to turn something away, or the corpus says nothing about the threshold
+    confidences = [parse_resume(text)[1] for _, text, _ in corpus]
+    assert any(c < Config.LOCAL_PARSER_MIN_CONFIDENCE for c in confidences)
+    assert any(c >= Config.LOCAL_PARSER_MIN_CONFIDENCE for c in confidences)
+
+
+@pytest.mark.parametrize('line, university', [
+    ('B.S. Computer Science, University of California, Berkeley, 2017', 'University of California, Berkeley'),
+    ('Master of Science in Nursing, Johns Hopkins University, Baltimore, MD, 2019', 'Johns Hopkins University'),
+    ('MBA, Wharton School, 2016', 'Wharton School'),
+    ('Master of Science in Statistics - University of Pune - 2018', 'University of Pune'),
+])
+def test_education_keeps_full_institution_name(line, university):
+    parsed, _ = parse_resume(f"Jane Doe\njane@example.com\n\nEducation\n{line}\n")
+    assert parsed['education'][0]['university'] == university
@@ -23,8 +23,16 @@ interface ImprovementResults {
   match_analysis: string;
   extracted_resume_data: any; // Replace with specific type if known
   message: string;
+  result_id?: string; // Server-side copy of this result, so export does not re-post it
+  section_errors?: Record<string, string>; // Sections whose generation failed, by response field
 }
 
+const TAILORED_SECTIONS = ['improved_summary', 'improved_bullets', 'suggested_skills', 'match_analysis'];
+
+// Shown in place of a section whose generation failed; the other sections keep their results
+const SectionError: React.FC<{ message?: string }> = ({ message }) =>
+  message ? <p className="text-red-700 text-sm">Could not generate this section: {message}</p> : null;
+
 const Home: React.FC = () => {
   const [resumeFile, setResumeFile] = useState<File | null>(null);
   const [jdFile, setJdFile] = useState<File | null>(null);
@@ -133,7 +141,8 @@ const Home: React.FC = () => {
     setLoading(true);
     setError('');
     try {
-      const response = await fetch(`${BACKEND_URL}/api/improve/`, {
+      // Stream sections over Server-Sent Events so results render as soon as each one is ready
+      const response = await fetch(`${BACKEND_URL}/api/improve/stream`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -144,14 +153,61 @@ const Home: React.FC = () => {
         }),
       });
 
-      if (!response.ok) {
+      if (!response.ok || !response.body) {
         const errData: { error?: string } = await response.json();
         throw new Error(errData.error || 'Failed to get improvements.');
       }
 
-      const data: ImprovementResults = await response.json();
-      setImprovementResults(data);
-      setExtractedResumeData(data.extracted_resume_data);
+      setImprovementResults({
+        improved_summary: '',
+        improved_bullets: [],
+        suggested_skills: [],
+        match_analysis: '',
+        extracted_resume_data: null,
+        message: '',
+      });
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let streamError = '';
+      for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const messages = buffer.split('\n\n');
+        buffer = messages.pop() || '';
+        for (const message of messages) {
+          const eventLine = message.split('\n').find((line) => line.startsWith('event: '));
+          const dataLine = message.split('\n').find((line) => line.startsWith('data: '));
+          if (!eventLine || !dataLine) continue;
+          const event = eventLine.slice('event: '.length);
+          const payload = JSON.parse(dataLine.slice('data: '.length));
+
+          if (event === 'extracted_resume_data') {
+            setExtractedResumeData(payload);
+            setImprovementResults((prev) => prev && { ...prev, extracted_resume_data: payload });
+          } else if (event === 'bullet') {
+            setImprovementResults((prev) => prev && { ...prev, improved_bullets: [...prev.improved_bullets, payload] });
+          } else if (event === 'improved_bullets') {
+            setImprovementResults((prev) => prev && { ...prev, improved_bullets: payload });
+          } else if (event === 'improved_summary' || event === 'suggested_skills' || event === 'match_analysis') {
+            setImprovementResults((prev) => prev && { ...prev, [event]: payload });
+          } else if (event === 'done') {
+            setImprovementResults((prev) => prev && { ...prev, message: payload.message, result_id: payload.result_id });
+          } else if (event === 'error' && TAILORED_SECTIONS.includes(payload.section)) {
+            setImprovementResults((prev) => prev && {
+              ...prev,
+              section_errors: { ...prev.section_errors, [payload.section]: payload.error },
+            });
+          } else if (event === 'error') {
+            streamError = payload.error;
+          }
+        }
+      }
+      if (streamError) {
+        throw new Error(streamError);
+      }
     //   alert(data.message);
     } catch (err: unknown) {
       const errorMessage = err instanceof Error ? err.message : 'Unknown error';
@@ -171,7 +227,7 @@ const Home: React.FC = () => {
     setLoading(true);
     setError('');
     try {
-      const payload = {
+      const fullPayload = {
         format,
         original_extracted_data: extractedResumeData,
         improved_summary: improvementResults.improved_summary,
@@ -179,14 +235,22 @@ const Home: React.FC = () => {
         suggested_skills: improvementResults.suggested_skills,
         match_analysis: improvementResults.match_analysis,
       };
+      const postExport = (payload: object): Promise<Response> =>
+        fetch(`${BACKEND_URL}/api/export`, {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+          },
+          body: JSON.stringify(payload),
+        });
 
-      const response = await fetch(`${BACKEND_URL}/api/export`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify(payload),
-      });
+      // Export by ID when the server has the result; re-post everything only if it has expired
+      let response = improvementResults.result_id
+        ? await postExport({ format, result_id: improvementResults.result_id })
+        : await postExport(fullPayload);
+      if (response.status === 404 && improvementResults.result_id) {
+        response = await postExport(fullPayload);
+      }
 
       if (!response.ok) {
         const errData: { error?: string } = await response.json();
@@ -360,10 +424,12 @@ const Home: React.FC = () => {
             <div className="space-y-8">
               <div>
                 <h4 className="font-bold text-green-700 text-lg">Improved Summary</h4>
+                <SectionError message={improvementResults.section_errors?.improved_summary} />
                 <p className="text-gray-800 leading-relaxed">{improvementResults.improved_summary}</p>
               </div>
               <div>
                 <h4 className="font-bold text-green-700 text-lg">Improved Bullet Points</h4>
+                <SectionError message={improvementResults.section_errors?.improved_bullets} />
                 <ul className="list-disc list-inside text-gray-800 space-y-3">
                   {improvementResults.improved_bullets.map((bullet: string, index: number) => (
                     <li key={index} className="leading-relaxed">{bullet}</li>
@@ -372,10 +438,12 @@ const Home: React.FC = () => {
               </div>
               <div>
                 <h4 className="font-bold text-green-700 text-lg">Suggested Skills</h4>
+                <SectionError message={improvementResults.section_errors?.suggested_skills} />
                 <p className="text-gray-800">{improvementResults.suggested_skills.join(', ')}</p>
               </div>
               <div>
                 <h4 className="font-bold text-green-700 text-lg">Match Analysis</h4>
+                <SectionError message={improvementResults.section_errors?.match_analysis} />
                 <pre className="whitespace-pre-wrap text-sm text-gray-800 bg-green-100 p-4 rounded-lg">
                   {improvementResults.match_analysis}
                 </pre>